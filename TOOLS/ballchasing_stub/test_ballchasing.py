@@ -0,0 +1,163 @@
+import os
+import sys
+import tempfile
+import time
+import unittest
+
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "bcManager")))
+
+from ballchasing import BallchasingClient
+
+# Runs bcManager's BallchasingClient against a local stub of the ballchasing API.
+# Run with: python -m pytest TOOLS/ballchasing_stub
+
+AUTH_TOKEN = "stub-token"
+REPLAY_SIZE = 300 * 1024    # Larger than a download chunk, so downloads are written in several chunks
+
+
+class StubBallchasing:
+    """Local stand-in for the ballchasing API. Each route answers with the queued statuses in order, then 200."""
+
+    def __init__(self):
+        self.statuses = {}      # Path -> statuses to answer with before succeeding
+        self.retry_after = {}   # Path -> Retry-After header sent with error responses
+        self.hits = {}          # Path -> requests received
+        self.uploads = []       # Multipart fields of each successful upload
+        self.replay = os.urandom(REPLAY_SIZE)
+
+        self.app = web.Application()
+        self.app.router.add_get("/replays", self.replays)
+        self.app.router.add_get("/replays/{replay_id}/file", self.replay_file)
+        self.app.router.add_post("/v2/upload", self.upload)
+        self.app.router.add_post("/groups", self.create_group)
+
+    def fail_with(self, path, *statuses, retry_after=None):
+        self.statuses[path] = list(statuses)
+        if retry_after is not None:
+            self.retry_after[path] = retry_after
+
+    def _error(self, request):
+        self.hits[request.path] = self.hits.get(request.path, 0) + 1
+        assert request.headers["Authorization"] == AUTH_TOKEN
+        statuses = self.statuses.get(request.path)
+        if statuses:
+            headers = {}
+            if request.path in self.retry_after:
+                headers["Retry-After"] = str(self.retry_after[request.path])
+            return web.json_response({"error": "stub error"}, status=statuses.pop(0), headers=headers)
+        return None
+
+    async def replays(self, request):
+        return self._error(request) or web.json_response({"count": 1, "list": [{"id": "replay-1"}]})
+
+    async def replay_file(self, request):
+        return self._error(request) or web.Response(body=self.replay, content_type="application/octet-stream")
+
+    async def create_group(self, request):
+        return self._error(request) or web.json_response({"id": "group-1"}, status=201)
+
+    async def upload(self, request):
+        error = self._error(request)
+        fields = {}
+        reader = await request.multipart()
+        async for part in reader:
+            fields[part.name] = (part.filename, await part.read())
+        if error:
+            return error
+        self.uploads.append(fields)
+        return web.json_response({"id": "replay-1", "location": "https://ballchasing.com/replay/replay-1"}, status=201)
+
+
+class BallchasingClientTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.stub = StubBallchasing()
+        self.server = TestServer(self.stub.app)
+        await self.server.start_server()
+        self.client = BallchasingClient(base_url=str(self.server.make_url("")).rstrip("/"), max_retries=2, backoff=0.05)
+
+    async def asyncTearDown(self):
+        await self.client.close()
+        await self.server.close()
+
+    #region retries
+    async def test_rate_limited_request_waits_for_retry_after(self):
+        self.stub.fail_with("/replays", 429, 429, retry_after=0.1)
+        start = time.perf_counter()
+        r = await self.client.get("/replays", AUTH_TOKEN, ["count=1"])
+        self.assertEqual(r.status_code, 200)
+        self.assertEqual(r.json()["list"][0]["id"], "replay-1")
+        self.assertEqual(self.stub.hits["/replays"], 3)
+        self.assertGreaterEqual(time.perf_counter() - start, 0.2)
+
+    async def test_rate_limited_request_backs_off_exponentially(self):
+        self.stub.fail_with("/replays", 429, 429)
+        start = time.perf_counter()
+        r = await self.client.get("/replays", AUTH_TOKEN)
+        self.assertEqual(r.status_code, 200)
+        self.assertGreaterEqual(time.perf_counter() - start, 0.05 + 0.1)
+
+    async def test_retries_stop_at_limit(self):
+        self.stub.fail_with("/replays", 503, 503, 503, 503, retry_after=0)
+        r = await self.client.get("/replays", AUTH_TOKEN)
+        self.assertEqual(r.status_code, 503)
+        self.assertEqual(self.stub.hits["/replays"], 3)
+
+    async def test_post_is_not_retried_on_server_error(self):
+        self.stub.fail_with("/groups", 502, retry_after=0)
+        r = await self.client.post("/groups", AUTH_TOKEN, json={"name": "Match Day 01"})
+        self.assertEqual(r.status_code, 502)
+        self.assertEqual(self.stub.hits["/groups"], 1)
+
+    async def test_post_is_retried_when_rate_limited(self):
+        self.stub.fail_with("/groups", 429, retry_after=0)
+        r = await self.client.post("/groups", AUTH_TOKEN, json={"name": "Match Day 01"})
+        self.assertEqual(r.status_code, 201)
+        self.assertEqual(self.stub.hits["/groups"], 2)
+    #endregion
+
+    #region transfers
+    async def test_download_streams_replay_to_file(self):
+        self.stub.fail_with("/replays/replay-1/file", 429, retry_after=0)
+        with tempfile.NamedTemporaryFile(suffix=".replay") as replay_file:
+            replay_file.write(b"left over from an earlier attempt")
+            r = await self.client.download("/replays/replay-1/file", AUTH_TOKEN, replay_file)
+            self.assertEqual(r.status_code, 200)
+            self.assertEqual(r.content, b"")
+            replay_file.seek(0)
+            self.assertEqual(replay_file.read(), self.stub.replay)
+
+    async def test_upload_sends_multipart_file(self):
+        self.stub.fail_with("/v2/upload", 429, retry_after=0)
+        with tempfile.NamedTemporaryFile(suffix=".replay") as replay_file:
+            replay_file.write(self.stub.replay)
+            replay_file.flush()
+            r = await self.client.post("/v2/upload", AUTH_TOKEN, ["visibility=public", "group=group-1"],
+                files={"file": replay_file})
+        self.assertEqual(r.status_code, 201)
+        self.assertEqual(self.stub.hits["/v2/upload"], 2)
+        self.assertEqual(len(self.stub.uploads), 1)
+        filename, content = self.stub.uploads[0]["file"]
+        self.assertTrue(filename.endswith(".replay"))
+        self.assertEqual(content, self.stub.replay)   # The retried upload sends the whole file again
+    #endregion
+
+    #region teardown
+    async def test_next_client_waits_for_stopped_session_to_close(self):
+        await self.client.get("/replays", AUTH_TOKEN)
+        session = self.client._session
+        self.client.stop()
+        next_client = BallchasingClient(base_url=self.client.base_url)
+        try:
+            r = await next_client.get("/replays", AUTH_TOKEN)
+            self.assertEqual(r.status_code, 200)
+            self.assertTrue(session.closed)
+        finally:
+            await next_client.close()
+    #endregion
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,281 @@
+import argparse
+import asyncio
+import math
+import os
+import random
+import sys
+import time
+import types
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+import sixMans.sixMans as sixmans_module
+from sixMans.game import Game
+from sixMans.scores import ScoreJournal
+from sixMans.sixMans import QTS_METHODS, SixMans
+from sixMans.strings import Strings
+
+import config
+from fakes import FakeBot, FakeConfig, FakeContext, FakeGuild, FakeReactionPayload
+
+# Drives the sixMans cog against fake Discord objects and an in-memory Config:
+# joins/leaves, queue pops through each team selection method, score reports, leaderboards and team balancing.
+
+VOTE_EMOJI = chr(0x1F3B2)   # Vote for random teams
+SELECTION_TIMEOUT = 10      # How long to wait for team selection to finish after the last reaction (seconds)
+
+
+class Timings:
+    def __init__(self):
+        self.samples = {}   # Operation -> [duration in ms]
+
+    def record(self, operation, start):
+        self.samples.setdefault(operation, []).append((time.perf_counter() - start) * 1000)
+
+    def report(self):
+        print("{:<28} {:>7} {:>10} {:>10} {:>10} {:>10}".format("Operation", "Count", "ops/s", "p50 ms", "p95 ms", "p99 ms"))
+        for operation, samples in self.samples.items():
+            ordered = sorted(samples)
+            total = sum(ordered) / 1000
+            ops = len(ordered) / total if total else float("inf")
+            print("{:<28} {:>7} {:>10.1f} {:>10.2f} {:>10.2f} {:>10.2f}".format(
+                operation, len(ordered), ops, _percentile(ordered, 50), _percentile(ordered, 95), _percentile(ordered, 99)))
+
+
+def _percentile(sorted_values, percentile):
+    rank = max(1, math.ceil(percentile / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+#region setup
+async def build_guild(bot, settings):
+    guild = FakeGuild(bot, "Bench Guild")
+    bot.guilds.append(guild)
+    category = guild.add_category("Six Mans")
+    channels = [await guild.create_text_channel("queue-{}".format(i), category=category) for i in range(settings.queue_count)]
+    players = [guild.add_member("player{}".format(i)) for i in range(settings.player_count)]
+    return guild, category, channels, players
+
+
+def populate_history(fake_config, guild, category, channels, players, settings):
+    """Writes queues, player stats and `history_scores` journal rows straight into the fake Config."""
+    journal = ScoreJournal(fake_config)
+    data = fake_config.guild(guild)._data
+    data["CategoryChannel"] = category.id
+    data["ScoreSchema"] = sixmans_module.SCORE_SCHEMA
+
+    queues = {}
+    for i, channel in enumerate(channels):
+        queues[str(random.getrandbits(40))] = {
+            "Name": "Queue {}".format(i),
+            "Channels": [channel.id],
+            "Points": dict(settings.queue_points),
+            "Players": {},
+            "GamesPlayed": 0,
+            "TeamSelection": Strings.RANDOM_TS,
+            "MaxSize": 6,
+            "ActiveJoinLog": {}
+        }
+
+    now = int(time.time())
+    oldest = now - settings.history_days * 24 * 60 * 60
+    segments = set()
+    game_count = math.ceil(settings.history_scores / 6)
+    for game_i in range(game_count):
+        queue_id = random.choice(list(queues.keys()))
+        q_data = queues[queue_id]
+        q_data["GamesPlayed"] += 1
+        data["GamesPlayed"] += 1
+        game_id = random.getrandbits(64)
+        timestamp = oldest + (now - oldest) * game_i // game_count
+        segment = journal._segment(timestamp)
+        segments.add(segment)
+        rows = []
+        for player_i, player in enumerate(random.sample(players, 6)):
+            win = int(player_i < 3)
+            points = q_data["Points"][Strings.PP_PLAY_KEY] + win * q_data["Points"][Strings.PP_WIN_KEY]
+            rows.append(journal._to_row({
+                "Game": game_id,
+                "Queue": int(queue_id),
+                "Player": player.id,
+                "Win": win,
+                "Points": points,
+                "Timestamp": timestamp
+            }))
+            for stats in (data["Players"], q_data["Players"]):
+                player_stats = stats.setdefault(str(player.id), {
+                    Strings.PLAYER_POINTS_KEY: 0,
+                    Strings.PLAYER_GP_KEY: 0,
+                    Strings.PLAYER_WINS_KEY: 0
+                })
+                player_stats[Strings.PLAYER_POINTS_KEY] += points
+                player_stats[Strings.PLAYER_GP_KEY] += 1
+                player_stats[Strings.PLAYER_WINS_KEY] += win
+        data["ScoreJournal"].setdefault(segment, {})[str(game_id)] = rows
+
+    data["ScoreSegments"] = sorted(segments)
+    data["Queues"] = queues
+#endregion
+
+
+#region team selection
+async def react(cog, game, member, emoji):
+    game.info_message.react(member, emoji)
+    await cog.on_raw_reaction_add(FakeReactionPayload(game.info_message, member, emoji))
+
+
+async def drive_team_selection(cog, game):
+    """Reacts to the game's info message the way its players would until teams are set."""
+    picks = 0
+    while game.state == Strings.TEAM_SELECTION_GS and picks < 4 * len(game.players):
+        picks += 1
+        mode = game.teamSelection.lower()
+        if mode == Strings.VOTE_TS.lower():
+            voted = {user for reaction in game.info_message.reactions for user in reaction._users}
+            voter = next((player for player in game.players if player not in voted), None)
+            if not voter:
+                break
+            await react(cog, game, voter, VOTE_EMOJI)
+        elif mode == Strings.CAPTAINS_TS.lower() and game.react_player_picks:
+            pick_i = len(game.blue) + len(game.orange) - 2
+            pick = ['blue', 'orange', 'orange', 'blue'][pick_i % 4]
+            captain = game.captains[0] if pick == 'blue' else game.captains[1]
+            await react(cog, game, captain, chr(int(next(iter(game.react_player_picks)), 16)))
+        elif mode == Strings.SELF_PICKING_TS.lower():
+            unpicked = [player for player in game.players if player not in game.blue and player not in game.orange]
+            if not unpicked:
+                break
+            emoji = Strings.ORANGE_REACT if len(game.orange) <= len(game.blue) else Strings.BLUE_REACT
+            await react(cog, game, unpicked[0], chr(emoji))
+        else:
+            break
+
+    # Team selection may finish in the background
+    deadline = time.perf_counter() + SELECTION_TIMEOUT
+    while game.state == Strings.TEAM_SELECTION_GS and time.perf_counter() < deadline:
+        await asyncio.sleep(0.001)
+#endregion
+
+
+#region load
+async def run_games(cog, bot, guild, players, timings, settings):
+    queues = list(cog.queues[guild])
+    idle = list(players)
+    random.shuffle(idle)
+    methods = list(QTS_METHODS)
+
+    for game_i in range(settings.games):
+        six_mans_queue = queues[game_i % len(queues)]
+        channel = six_mans_queue.channels[0]
+        six_mans_queue.teamSelection = methods[game_i % len(methods)]
+
+        game = None
+        while not game:
+            player = idle.pop()
+            ctx = FakeContext(bot, guild, channel, player)
+            full = len(six_mans_queue.queue.queue) + 1 >= six_mans_queue.maxSize
+            start = time.perf_counter()
+            await SixMans.queue.callback(cog, ctx)
+            timings.record("pop" if full else "join", start)
+            game = cog.index.get_player_game(player)
+
+            if not game and random.random() < settings.leave_rate:
+                leaver = random.choice(list(six_mans_queue.queue.queue))
+                start = time.perf_counter()
+                await SixMans.dequeue.callback(cog, FakeContext(bot, guild, channel, leaver))
+                timings.record("leave", start)
+                idle.insert(0, leaver)
+
+        start = time.perf_counter()
+        await drive_team_selection(cog, game)
+        timings.record("team selection ({})".format(six_mans_queue.teamSelection), start)
+
+        await game.report_winner("Blue")
+        start = time.perf_counter()
+        await cog._finish_game(guild, game, six_mans_queue, "Blue")
+        timings.record("report", start)
+        idle[0:0] = list(game.players)
+
+
+async def run_leaderboards(cog, bot, guild, players, timings, settings):
+    channel = guild.text_channels[0]
+    queue_names = [None] + [six_mans_queue.name for six_mans_queue in cog.queues[guild]]
+    for timeframe in ("overall", "day", "week", "month"):
+        command = getattr(SixMans, timeframe)
+        for queue_name in queue_names:
+            for _ in range(settings.leaderboard_runs):
+                ctx = FakeContext(bot, guild, channel, random.choice(players))
+                start = time.perf_counter()
+                await command.callback(cog, ctx, queue_name=queue_name)
+                timings.record("leaderboard {}{}".format(timeframe, "" if queue_name is None else " (queue)"), start)
+
+
+def run_balance(cog, guild, players, timings, settings):
+    six_mans_queue = cog.queues[guild][0]
+    for size in settings.balance_sizes:
+        for _ in range(settings.balance_runs):
+            game = Game(random.sample(players, size), six_mans_queue)
+            start = time.perf_counter()
+            game.get_balanced_teams()
+            timings.record("balance {} players".format(size), start)
+#endregion
+
+
+async def main(settings):
+    random.seed(settings.seed)
+    fake_config = FakeConfig()
+    fake_config.register_guild(**sixmans_module.defaults)
+    sixmans_module.Config = types.SimpleNamespace(get_conf=lambda *args, **kwargs: fake_config)
+    sixmans_module.CHANNEL_SLEEP_TIME = 0
+
+    bot = FakeBot(settings.api_latency)
+    guild, category, channels, players = await build_guild(bot, settings)
+    populate_history(fake_config, guild, category, channels, players, settings)
+    timings = Timings()
+
+    start = time.perf_counter()
+    cog = SixMans(bot)
+    while not cog.is_ready(guild):
+        await asyncio.sleep(0.001)
+    timings.record("preload", start)
+
+    api_calls = bot.http.calls
+    await run_games(cog, bot, guild, players, timings, settings)
+    game_api_calls = bot.http.calls - api_calls
+    await run_leaderboards(cog, bot, guild, players, timings, settings)
+    run_balance(cog, guild, players, timings, settings)
+
+    start = time.perf_counter()
+    await cog.persistence.flush()
+    timings.record("flush", start)
+
+    print("{} scores, {} players, {} queues, {}s API latency\n".format(
+        settings.history_scores, settings.player_count, settings.queue_count, settings.api_latency))
+    timings.report()
+    print("\nAPI calls per game: {:.1f}\n".format(game_api_calls / settings.games if settings.games else 0))
+
+    print("{:<28} {:>7} {:>10} {:>10} {:>10} {:>10}".format("Stage", "Count", "p50 ms", "p95 ms", "p99 ms", "API Calls"))
+    for stage, stats in cog.metrics.summary(guild).items():
+        print("{:<28} {:>7} {:>10.2f} {:>10.2f} {:>10.2f} {:>10.1f}".format(
+            stage, stats["Count"], stats["p50"], stats["p95"], stats["p99"], stats["API Calls"]))
+
+    cog.cog_unload()
+    await asyncio.sleep(0)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark the sixMans cog against fake Discord objects.")
+    parser.add_argument("--scores", type=int, dest="history_scores", default=config.history_scores)
+    parser.add_argument("--games", type=int, default=config.games)
+    parser.add_argument("--players", type=int, dest="player_count", default=config.player_count)
+    parser.add_argument("--queues", type=int, dest="queue_count", default=config.queue_count)
+    parser.add_argument("--api-latency", type=float, dest="api_latency", default=config.api_latency)
+    parser.add_argument("--seed", type=int, default=config.seed)
+    settings = parser.parse_args()
+    for key in ("queue_points", "history_days", "leave_rate", "leaderboard_runs", "balance_runs", "balance_sizes"):
+        setattr(settings, key, getattr(config, key))
+    return settings
+
+
+if __name__ == "__main__":
+    asyncio.run(main(parse_args()))
@@ -0,0 +1,23 @@
+
+# Benchmark Settings
+
+# Guild setup
+queue_count = 4
+player_count = 600
+queue_points = {"Play": 10, "Win": 15}
+
+# Score history loaded before the run (try 10000 up to 1000000)
+history_scores = 10000
+history_days = 60
+
+# Load
+games = 40                  # Games popped, played and reported across all queues
+leave_rate = 0.2            # Chance a queued player leaves after each join
+leaderboard_runs = 5        # Runs of each leaderboard timeframe, for the guild and for each queue
+balance_runs = 200          # get_balanced_teams calls per team size
+balance_sizes = [6, 8, 10]
+
+# Simulated Discord API latency per request (seconds)
+api_latency = 0.0
+
+seed = 1
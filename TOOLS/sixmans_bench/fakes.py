@@ -0,0 +1,395 @@
+import asyncio
+import datetime
+import itertools
+import json
+
+import discord
+
+# Lightweight stand-ins for the discord.py objects and Red Config used by the sixMans cog.
+# Every call that would hit the Discord API goes through FakeBot.http.request so it can be delayed
+# to simulate latency and counted.
+
+_ids = itertools.count(700000000000000000)
+
+def next_id():
+    return next(_ids)
+
+
+#region config
+class FakeValue:
+    def __init__(self, data: dict, key: str):
+        self._data = data
+        self._key = key
+
+    def __call__(self):
+        return self._get()
+
+    async def _get(self):
+        return _copy(self._data[self._key])
+
+    async def set(self, value):
+        self._data[self._key] = _copy(value)
+
+    async def get_raw(self, *keys, default=KeyError):
+        value = self._data[self._key]
+        try:
+            for key in keys:
+                value = value[str(key)]
+        except KeyError:
+            if default is KeyError:
+                raise
+            return default
+        return _copy(value)
+
+    async def set_raw(self, *keys, value):
+        parent = self._data
+        path = [self._key] + [str(key) for key in keys]
+        for key in path[:-1]:
+            parent = parent.setdefault(key, {})
+        parent[path[-1]] = _copy(value)
+
+    async def clear_raw(self, *keys):
+        parent = self._data
+        path = [self._key] + [str(key) for key in keys]
+        for key in path[:-1]:
+            parent = parent.get(key, {})
+        parent.pop(path[-1], None)
+
+
+class FakeGuildGroup:
+    def __init__(self, data: dict):
+        self._data = data
+
+    def __getattr__(self, key):
+        if key.startswith("_"):
+            raise AttributeError(key)
+        return FakeValue(self._data, key)
+
+    async def all(self):
+        return _copy(self._data)
+
+
+class FakeConfig:
+    """In-memory stand-in for Red's Config. Values are round-tripped through JSON like the JSON driver stores them."""
+
+    def __init__(self):
+        self.defaults = {}
+        self.guilds = {}
+
+    def register_guild(self, **defaults):
+        self.defaults.update(_copy(defaults))
+
+    def guild(self, guild):
+        if guild.id not in self.guilds:
+            self.guilds[guild.id] = _copy(self.defaults)
+        return FakeGuildGroup(self.guilds[guild.id])
+
+
+def _copy(value):
+    return json.loads(json.dumps(value))
+#endregion
+
+
+#region discord
+class FakeHTTP:
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.calls = 0
+
+    async def request(self, route, **kwargs):
+        self.calls += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+
+class FakeBot:
+    def __init__(self, api_latency=0.0):
+        self.http = FakeHTTP(api_latency)
+        self.guilds = []
+        self.user = FakeMember(None, "sixmans-bot", bot=True)
+
+    async def api(self, route):
+        await self.http.request(route)
+
+    async def wait_until_ready(self):
+        return
+
+    def get_guild(self, guild_id):
+        return next((guild for guild in self.guilds if guild.id == guild_id), None)
+
+    def get_channel(self, channel_id):
+        for guild in self.guilds:
+            channel = guild.get_channel(channel_id)
+            if channel:
+                return channel
+        return None
+
+    def get_user(self, user_id):
+        for guild in self.guilds:
+            member = guild.get_member(user_id)
+            if member:
+                return member
+        return None
+
+
+class FakeRole:
+    def __init__(self, guild, name):
+        self.id = next_id()
+        self.guild = guild
+        self.name = name
+        self.mention = "<@&{}>".format(self.id)
+
+
+class FakeMember:
+    def __init__(self, guild, name, bot=False):
+        self.id = next_id()
+        self.guild = guild
+        self.name = name
+        self.display_name = name
+        self.mention = "<@{}>".format(self.id)
+        self.bot = bot
+        self.voice = None
+        self.roles = []
+        self.avatar_url = ""
+
+    async def send(self, content=None, embed=None, **kwargs):
+        await self.guild.bot.api("POST /users/@me/channels")
+
+    async def move_to(self, channel):
+        await self.guild.bot.api("PATCH /guilds/{guild_id}/members/{user_id}")
+        if self.voice and self in self.voice.members:
+            self.voice.members.remove(self)
+        self.voice = channel
+        if channel:
+            channel.members.append(self)
+
+
+class FakeUsers:
+    def __init__(self, users):
+        self._users = users
+
+    async def flatten(self):
+        return list(self._users)
+
+
+class FakeReaction:
+    def __init__(self, message, emoji):
+        self.message = message
+        self.emoji = emoji
+        self._users = []
+
+    @property
+    def count(self):
+        return len(self._users)
+
+    def users(self):
+        return FakeUsers(self._users)
+
+    async def remove(self, user):
+        await self.message.channel.guild.bot.api("DELETE /channels/{channel_id}/messages/{message_id}/reactions/{emoji}/{user_id}")
+        if user in self._users:
+            self._users.remove(user)
+
+
+class FakeMessage:
+    def __init__(self, channel, author, content=None, embed=None):
+        self.id = next_id()
+        self.channel = channel
+        self.guild = channel.guild
+        self.author = author
+        self.content = content
+        self.embeds = [embed] if embed else []
+        self.reactions = []
+        self.mentions = []
+        self.created_at = datetime.datetime.utcnow()
+
+    def react(self, user, emoji):
+        """Adds a user's reaction locally, as Discord would before dispatching the reaction event."""
+        reaction = next((reaction for reaction in self.reactions if reaction.emoji == emoji), None)
+        if not reaction:
+            reaction = FakeReaction(self, emoji)
+            self.reactions.append(reaction)
+        if user not in reaction._users:
+            reaction._users.append(user)
+
+    async def add_reaction(self, emoji):
+        await self.guild.bot.api("PUT /channels/{channel_id}/messages/{message_id}/reactions/{emoji}/@me")
+        self.react(self.guild.bot.user, emoji)
+
+    async def remove_reaction(self, emoji, member):
+        await self.guild.bot.api("DELETE /channels/{channel_id}/messages/{message_id}/reactions/{emoji}/{user_id}")
+        for reaction in self.reactions:
+            if reaction.emoji == emoji and member in reaction._users:
+                reaction._users.remove(member)
+
+    async def clear_reaction(self, emoji):
+        await self.guild.bot.api("DELETE /channels/{channel_id}/messages/{message_id}/reactions/{emoji}")
+        self.reactions = [reaction for reaction in self.reactions if reaction.emoji != emoji]
+
+    async def clear_reactions(self):
+        await self.guild.bot.api("DELETE /channels/{channel_id}/messages/{message_id}/reactions")
+        self.reactions = []
+
+    async def edit(self, content=None, embed=None, **kwargs):
+        await self.guild.bot.api("PATCH /channels/{channel_id}/messages/{message_id}")
+        if content is not None:
+            self.content = content
+        if embed is not None:
+            self.embeds = [embed]
+
+    async def delete(self):
+        await self.guild.bot.api("DELETE /channels/{channel_id}/messages/{message_id}")
+        self.channel.messages.pop(self.id, None)
+
+
+class FakeGuildChannel:
+    def __init__(self, guild, name, category=None, overwrites=None):
+        self.id = next_id()
+        self.guild = guild
+        self.name = name
+        self.category = category
+        self.category_id = category.id if category else None
+        self.overwrites = dict(overwrites) if overwrites else {}
+        self.mention = "<#{}>".format(self.id)
+        self.created_at = datetime.datetime.utcnow() - datetime.timedelta(hours=1)
+
+    async def edit(self, name=None, overwrites=None, **kwargs):
+        await self.guild.bot.api("PATCH /channels/{channel_id}")
+        if name is not None:
+            self.name = name
+        if overwrites is not None:
+            self.overwrites = dict(overwrites)
+
+    async def set_permissions(self, target, overwrite=None, **kwargs):
+        await self.guild.bot.api("PUT /channels/{channel_id}/permissions/{overwrite_id}")
+        if overwrite is None:
+            self.overwrites.pop(target, None)
+        else:
+            self.overwrites[target] = overwrite
+
+    async def delete(self):
+        await self.guild.bot.api("DELETE /channels/{channel_id}")
+        self.guild.channels.pop(self.id, None)
+
+
+class FakeTextChannel(FakeGuildChannel):
+    def __init__(self, guild, name, category=None, overwrites=None):
+        super().__init__(guild, name, category, overwrites)
+        self.messages = {}
+
+    @property
+    def members(self):
+        return list(self.guild.members.values())
+
+    async def send(self, content=None, embed=None, file=None, **kwargs):
+        await self.guild.bot.api("POST /channels/{channel_id}/messages")
+        message = FakeMessage(self, self.guild.bot.user, content, embed)
+        self.messages[message.id] = message
+        return message
+
+    async def fetch_message(self, message_id):
+        await self.guild.bot.api("GET /channels/{channel_id}/messages/{message_id}")
+        return self.messages[message_id]
+
+    async def purge(self, limit=None):
+        await self.guild.bot.api("POST /channels/{channel_id}/messages/bulk-delete")
+        self.messages = {}
+
+    async def clone(self):
+        return await self.guild.create_text_channel(self.name, overwrites=self.overwrites, category=self.category)
+
+
+class FakeVoiceChannel(FakeGuildChannel):
+    def __init__(self, guild, name, category=None, overwrites=None):
+        super().__init__(guild, name, category, overwrites)
+        self.members = []
+
+
+class FakeCategoryChannel(FakeGuildChannel):
+    async def create_text_channel(self, name, overwrites=None, **kwargs):
+        return await self.guild.create_text_channel(name, overwrites=overwrites, category=self)
+
+    async def create_voice_channel(self, name, overwrites=None, **kwargs):
+        return await self.guild.create_voice_channel(name, overwrites=overwrites, category=self)
+
+
+class FakeGuild:
+    def __init__(self, bot, name):
+        self.id = next_id()
+        self.bot = bot
+        self.name = name
+        self.icon_url = ""
+        self.members = {}
+        self.channels = {}
+        self.roles = {}
+        self.default_role = FakeRole(self, "@everyone")
+        self.me = bot.user
+
+    @property
+    def categories(self):
+        return [channel for channel in self.channels.values() if isinstance(channel, FakeCategoryChannel)]
+
+    @property
+    def voice_channels(self):
+        return [channel for channel in self.channels.values() if isinstance(channel, FakeVoiceChannel)]
+
+    @property
+    def text_channels(self):
+        return [channel for channel in self.channels.values() if isinstance(channel, FakeTextChannel)]
+
+    def get_member(self, member_id):
+        return self.members.get(member_id)
+
+    def get_channel(self, channel_id):
+        return self.channels.get(channel_id)
+
+    def get_role(self, role_id):
+        return self.roles.get(role_id)
+
+    def add_member(self, name):
+        member = FakeMember(self, name)
+        self.members[member.id] = member
+        return member
+
+    def add_category(self, name):
+        category = FakeCategoryChannel(self, name)
+        self.channels[category.id] = category
+        return category
+
+    async def create_text_channel(self, name, overwrites=None, category=None, **kwargs):
+        await self.bot.api("POST /guilds/{guild_id}/channels")
+        channel = FakeTextChannel(self, name, category, overwrites)
+        self.channels[channel.id] = channel
+        return channel
+
+    async def create_voice_channel(self, name, overwrites=None, category=None, **kwargs):
+        await self.bot.api("POST /guilds/{guild_id}/channels")
+        channel = FakeVoiceChannel(self, name, category, overwrites)
+        self.channels[channel.id] = channel
+        return channel
+
+
+class FakeContext:
+    """Just enough of a command Context to call sixMans command callbacks directly."""
+
+    def __init__(self, bot, guild, channel, author, prefix="?"):
+        self.bot = bot
+        self.guild = guild
+        self.channel = channel
+        self.author = author
+        self.prefix = prefix
+        self.message = FakeMessage(channel, author)
+
+    async def send(self, content=None, embed=None, file=None, **kwargs):
+        return await self.channel.send(content, embed=embed, file=file)
+
+
+class FakeReactionPayload:
+    def __init__(self, message, member, emoji):
+        self.guild_id = message.guild.id
+        self.channel_id = message.channel.id
+        self.message_id = message.id
+        self.user_id = member.id
+        self.member = member
+        self.emoji = discord.PartialEmoji(name=emoji)
+#endregion
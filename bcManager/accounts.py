@@ -0,0 +1,108 @@
+import asyncio
+import logging
+
+from redbot.core import Config
+
+log = logging.getLogger("red.bcManager")
+
+class AccountIndex:
+    """In-memory index of the global `AccountRegister`, loaded once on first use.
+
+    Keeps each discord id's registered `[platform, identifier]` accounts and a reverse map of
+    `(platform, identifier)` to the discord id that registered it. Changes are saved for the changed
+    discord id only rather than rewriting the whole register, except for bulk imports which are written at once."""
+
+    def __init__(self, config: Config):
+        self.config = config
+        self.accounts = {}  # Discord id (str) -> [[platform, identifier], ...]
+        self.owners = {}    # (platform, identifier) -> discord id (str)
+        self._loaded = False
+        self._lock = asyncio.Lock()
+
+    async def load(self):
+        async with self._lock:
+            if self._loaded:
+                return
+            account_register = await self.config.AccountRegister()
+            self.accounts = {}
+            self.owners = {}
+            for discord_id, accounts in account_register.items():
+                member_accounts = self.accounts[discord_id] = []
+                for platform, identifier in accounts:
+                    # Platforms were saved as typed before they were stored in lowercase
+                    platform = platform.lower()
+                    if [platform, identifier] in member_accounts:
+                        continue
+                    member_accounts.append([platform, identifier])
+                    owner_id = self.owners.get((platform, identifier))
+                    if owner_id and owner_id != discord_id:
+                        log.warning("%s:%s is registered to both %s and %s, using %s", platform, identifier, owner_id, discord_id, discord_id)
+                    self.owners[(platform, identifier)] = discord_id
+            self._loaded = True
+
+    async def get_accounts(self, discord_id):
+        await self.load()
+        return list(self.accounts.get(str(discord_id), []))
+
+    async def get_platform_ids(self, discord_id, platform):
+        return [identifier for account_platform, identifier in await self.get_accounts(discord_id) if account_platform == platform]
+
+    async def get_owner(self, platform, identifier):
+        """Returns the discord id (str) that registered the account, if any."""
+        await self.load()
+        return self.owners.get((platform, identifier))
+
+    async def add(self, discord_id, platform, identifier):
+        """Registers the account. Raises ValueError if another discord id has already registered it."""
+        await self.load()
+        discord_id = str(discord_id)
+        async with self._lock:
+            self._add(discord_id, platform, identifier)
+            await self._save(discord_id)
+
+    async def add_many(self, new_accounts):
+        """Registers `{discord id: [[platform, identifier], ...]}` and writes the register once.
+        Returns the `[discord id, platform, identifier]` of each account skipped because another discord id has registered it."""
+        await self.load()
+        skipped = []
+        async with self._lock:
+            for discord_id, accounts in new_accounts.items():
+                for platform, identifier in accounts:
+                    try:
+                        self._add(str(discord_id), platform, identifier)
+                    except ValueError:
+                        skipped.append([str(discord_id), platform, identifier])
+            await self.config.AccountRegister.set(self.accounts)
+        return skipped
+
+    async def remove(self, discord_id, accounts):
+        await self.load()
+        discord_id = str(discord_id)
+        async with self._lock:
+            member_accounts = self.accounts.get(discord_id, [])
+            for account in accounts:
+                if account in member_accounts:
+                    member_accounts.remove(account)
+                if self.owners.get(tuple(account)) == discord_id:
+                    del self.owners[tuple(account)]
+            await self._save(discord_id)
+
+    async def clear(self, discord_id):
+        await self.remove(discord_id, await self.get_accounts(discord_id))
+
+    def _add(self, discord_id, platform, identifier):
+        owner_id = self.owners.get((platform, identifier))
+        if owner_id and owner_id != discord_id:
+            raise ValueError("{}:{} is already registered to {}".format(platform, identifier, owner_id))
+        member_accounts = self.accounts.setdefault(discord_id, [])
+        if [platform, identifier] not in member_accounts:
+            member_accounts.append([platform, identifier])
+        self.owners[(platform, identifier)] = discord_id
+
+    async def _save(self, discord_id):
+        accounts = self.accounts.get(discord_id)
+        if accounts:
+            await self.config.AccountRegister.set_raw(discord_id, value=accounts)
+        else:
+            self.accounts.pop(discord_id, None)
+            await self.config.AccountRegister.clear_raw(discord_id)
@@ -0,0 +1,138 @@
+import asyncio
+import json
+import os
+
+import aiohttp
+
+BALLCHASING_API = 'https://ballchasing.com/api'
+MAX_CONNECTIONS = 10        # Open connections kept to ballchasing
+KEEPALIVE_TIMEOUT = 60      # How long an idle connection is kept open (seconds)
+REQUEST_TIMEOUT = 60        # Total time allowed for a request, including reading the body (seconds)
+MAX_RETRIES = 3             # Retries for rate limited (429) responses, and for server errors (5xx) and timeouts on GET/PATCH
+RETRY_BACKOFF = 1           # Delay before the first retry (seconds), doubled for each retry after it
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+STOP_TASK = 'bcManager-close-ballchasing'  # Name of the task that closes a stopped client's session
+
+class BallchasingResponse:
+    """A ballchasing response, read in full (or streamed to a file) before its connection is released."""
+
+    def __init__(self, status_code, content, headers):
+        self.status_code = status_code
+        self.content = content
+        self.headers = headers
+
+    def json(self):
+        return json.loads(self.content)
+
+
+class BallchasingClient:
+    """Async client for the ballchasing API that reuses one pooled, keep-alive session for every request.
+
+    Requests that are rate limited or hit a server error are retried with exponential backoff,
+    honoring the `Retry-After` header when ballchasing sends one. POSTs (group creation and uploads)
+    are only retried when rate limited, since a server error or timeout may come after ballchasing
+    has already created the group or replay."""
+
+    def __init__(self, base_url=BALLCHASING_API, max_connections=MAX_CONNECTIONS, timeout=REQUEST_TIMEOUT,
+            max_retries=MAX_RETRIES, backoff=RETRY_BACKOFF):
+        self.base_url = base_url
+        self.max_connections = max_connections
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self._session = None
+
+    async def get(self, endpoint, auth_token, params=[]):
+        return await self.request('GET', endpoint, auth_token, params)
+
+    async def post(self, endpoint, auth_token, params=[], json=None, data=None, files=None):
+        return await self.request('POST', endpoint, auth_token, params, json=json, data=data, files=files)
+
+    async def patch(self, endpoint, auth_token, params=[], json=None, data=None):
+        return await self.request('PATCH', endpoint, auth_token, params, json=json, data=data)
+
+    async def download(self, endpoint, auth_token, file, params=[]):
+        """Streams a successful response's body into `file` in chunks instead of holding it in memory."""
+        return await self.request('GET', endpoint, auth_token, params, stream_to=file)
+
+    async def request(self, method, endpoint, auth_token, params=[], json=None, data=None, files=None, stream_to=None):
+        if not self._session:
+            await self.wait_for_stopped()
+        url = self.base_url + endpoint
+        params = '&'.join(params)
+        if params:
+            url += "?{}".format(params)
+
+        attempt = 0
+        while True:
+            uploads = []
+            try:
+                async with self._get_session().request(method, url, headers={'Authorization': auth_token or ''},
+                        json=json, data=self._body(data, files, uploads)) as r:
+                    if stream_to and r.status == 200:
+                        stream_to.seek(0)
+                        stream_to.truncate()
+                        async for chunk in r.content.iter_chunked(DOWNLOAD_CHUNK_SIZE):
+                            stream_to.write(chunk)
+                        stream_to.flush()
+                        return BallchasingResponse(r.status, b'', r.headers)
+                    content = await r.read()
+                    if not self._should_retry(method, r.status) or attempt >= self.max_retries:
+                        return BallchasingResponse(r.status, content, r.headers)
+                    delay = self._retry_delay(r.headers, attempt)
+            except (aiohttp.ClientConnectionError, aiohttp.ClientPayloadError, asyncio.TimeoutError):
+                if method == 'POST' or attempt >= self.max_retries:
+                    raise
+                delay = self._retry_delay({}, attempt)
+            finally:
+                for upload in uploads:
+                    upload.close()
+            attempt += 1
+            await asyncio.sleep(delay)
+
+    async def close(self):
+        if self._session and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    def stop(self):
+        """Closes the session in a task, for teardown that can't await it. The task is found by its name so the
+        client that replaces this one after a cog reload waits for it before opening its own session."""
+        return asyncio.create_task(self.close(), name=STOP_TASK)
+
+    @staticmethod
+    async def wait_for_stopped():
+        stop_tasks = [task for task in asyncio.all_tasks() if task.get_name() == STOP_TASK]
+        if stop_tasks:
+            await asyncio.gather(*stop_tasks, return_exceptions=True)
+
+    def _get_session(self):
+        if not self._session or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=self.max_connections, keepalive_timeout=KEEPALIVE_TIMEOUT)
+            self._session = aiohttp.ClientSession(connector=connector, timeout=aiohttp.ClientTimeout(total=self.timeout))
+        return self._session
+
+    def _body(self, data, files, uploads):
+        if not files:
+            return data
+        # Rebuilt for every attempt so a retried upload sends the whole file again
+        form = aiohttp.FormData()
+        for key, value in (data or {}).items():
+            form.add_field(key, str(value))
+        for key, file in files.items():
+            file.flush()
+            # aiohttp streams the file from disk and closes it once sent, so give it a handle of its own
+            # and leave the caller's file open for a retry
+            upload = open(file.name, 'rb')
+            uploads.append(upload)
+            form.add_field(key, upload, filename=os.path.basename(file.name))
+        return form
+
+    def _should_retry(self, method, status):
+        return status == 429 or (status >= 500 and method != 'POST')
+
+    def _retry_delay(self, headers, attempt):
+        try:
+            return max(float(headers['Retry-After']), 0)
+        except (KeyError, ValueError):
+            return self.backoff * 2 ** attempt
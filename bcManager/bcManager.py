@@ -1,14 +1,21 @@
 from .config import config
-import requests
+from .ballchasing import BallchasingClient
+from .cache import BallchasingCache
+from .accounts import AccountIndex
 import tempfile
 import os
 import json
+import csv
+import io
+import functools
 import discord
 import asyncio
+import logging
 
 from redbot.core import Config
 from redbot.core import commands
 from redbot.core import checks
+from redbot.core.data_manager import cog_data_path
 from redbot.core.utils.predicates import ReactionPredicate
 from redbot.core.utils.menus import start_adding_reactions
 from datetime import datetime, timezone
@@ -22,6 +29,27 @@ defaults = {
 }
 global_defaults = {"AccountRegister": {}}
 verify_timeout = 30
+log = logging.getLogger("red.bcManager")
+valid_platforms = ['steam', 'xbox', 'ps4', 'ps5', 'epic']
+
+class _TransferProgress:
+    def __init__(self, total):
+        self.total = total
+        self.downloaded = 0
+        self.uploaded = 0
+        self.renamed = 0
+        self.done = False
+
+    def summary(self):
+        status = ":white_check_mark:" if self.done else ":signal_strength:"
+        return "{} Transferring replays -- downloaded **{}/{}**, uploaded **{}/{}**, renamed **{}/{}**".format(
+            status, self.downloaded, self.total, self.uploaded, self.total, self.renamed, self.total)
+
+class _StaleGroup(Exception):
+    """Raised when ballchasing rejects a request for a group that may have been deleted since its id was cached."""
+    def __init__(self, group_id):
+        super().__init__(group_id)
+        self.group_id = group_id
 
 class BCManager(commands.Cog):
     """Manages aspects of Ballchasing Integrations with RSC"""
@@ -32,6 +60,15 @@ class BCManager(commands.Cog):
         self.config.register_global(**global_defaults)
         self.team_manager_cog = bot.get_cog("TeamManager")
         self.match_cog = bot.get_cog("Match")
+        self.ballchasing = BallchasingClient()
+        self.bc_cache = BallchasingCache(str(cog_data_path(self) / "ballchasing_cache.json"))
+        self.token_steam_ids = {}   # Auth token -> steam id of the ballchasing account it belongs to
+        self.account_index = AccountIndex(self.config)
+
+    def cog_unload(self):
+        """Closes the ballchasing session and saves cached responses when the cog shuts down."""
+        self.ballchasing.stop()
+        self.bc_cache.save()
     
     @commands.command(aliases=['bcr', 'bcpull'])
     @commands.guild_only()
@@ -101,17 +138,82 @@ class BCManager(commands.Cog):
         # Find or create ballchasing subgroup
         match_subgroup_id = await self._get_replay_destination(ctx, match)
 
-        # Download and upload replays
-        tmp_replay_files = await self._download_replays(ctx, replay_ids)
-        uploaded_ids = await self._upload_replays(ctx, match_subgroup_id, tmp_replay_files)
-        # await ctx.send("replays in subgroup: {}".format(", ".join(uploaded_ids)))
-        
-        renamed = await self._rename_replays(ctx, uploaded_ids)
+        # Download, upload and rename replays
+        match_subgroup_id, renamed = await self._transfer_replays(ctx, match_subgroup_id, replay_ids,
+            resolve_group=functools.partial(self._get_replay_destination, ctx, match))
 
         embed.description = "Match summary:\n{}\n\nView the ballchasing group: https://ballchasing.com/group/{}\n\n:white_check_mark: Done".format(summary, match_subgroup_id)
         embed.set_thumbnail(url=emoji_url)
         await bc_status_msg.edit(embed=embed)
         
+    @commands.command(aliases=['bcrAll', 'bcpullAll'])
+    @commands.guild_only()
+    @checks.admin_or_permissions(manage_guild=True)
+    async def bcreportAll(self, ctx, match_day=None):
+        """Finds match games for every match scheduled on the match day across all tiers, and adds them to the correct Ballchasing subgroups.
+        Uses the current match day if none is given.
+        """
+        if not match_day:
+            match_day = await self.match_cog._match_day(ctx)
+        schedule = await self.match_cog._schedule(ctx)
+        matches = []
+        for tier, tier_schedule in schedule.items():
+            for match in tier_schedule.get(str(match_day), []):
+                matches.append((tier, match))
+
+        if not matches:
+            await ctx.send(":x: No matches are scheduled for match day {}.".format(match_day))
+            return False
+        status_msg = await ctx.send(":signal_strength: Searching https://ballchasing.com for the replays of **{}** match day {} matches...".format(len(matches), match_day))
+
+        # Resolve the rosters and the tier and match day groups once for all matches
+        auth_token = await self._get_auth_token(ctx.guild)
+        bc_group_owner = await self._get_steam_id_from_token(ctx, auth_token)
+        top_level_group = await self._get_top_level_group(ctx)
+        rosters = await self._get_roster_snapshot(ctx, set(team for tier, match in matches for team in [match['home'], match['away']]))
+        limiter = asyncio.Semaphore(config.request_concurrency)     # Shared by every ballchasing request made for the match day
+        match_day_groups = {}
+        for tier in sorted(set(tier for tier, match in matches)):
+            try:
+                tier_group = await self._get_tier_subgroup_name(ctx, tier)
+            except KeyError:
+                match_day_groups[tier] = None   # No rank set for the tier
+                continue
+            ordered_subgroups = [
+                tier_group,
+                "Match Day {}".format(str(match_day).zfill(2))
+            ]
+            match_day_groups[tier] = await self._get_group_path(ctx, top_level_group, ordered_subgroups, bc_group_owner, auth_token, limiter=limiter)
+
+        # Report matches concurrently
+        match_slots = asyncio.Semaphore(config.batch_concurrency)
+
+        async def report(tier, match):
+            async with match_slots:
+                try:
+                    return await self._report_scheduled_match(ctx, match, match_day_groups[tier], rosters, bc_group_owner, auth_token, limiter)
+                except Exception as e:
+                    return "failed", str(e)
+
+        results = await asyncio.gather(*[report(tier, match) for tier, match in matches])
+
+        # Summarize
+        sections = {"uploaded": [], "missing": [], "already uploaded": [], "failed": []}
+        for (tier, match), (result, details) in zip(matches, results):
+            line = "**{}** {} vs {}".format(tier, match['home'], match['away'])
+            if details:
+                line += " -- {}".format(details)
+            sections[result].append(line)
+
+        await status_msg.edit(content=":white_check_mark: Match day {} replays: **{}** uploaded, **{}** missing, **{}** already uploaded, **{}** failed.".format(
+            match_day, len(sections["uploaded"]), len(sections["missing"]), len(sections["already uploaded"]), len(sections["failed"])))
+        summary = []
+        for result, lines in sections.items():
+            if lines:
+                summary.append("__{}__".format(result.title()))
+                summary += lines
+        await self._send_lines(ctx, summary)
+
     @commands.command(aliases=['setAuthKey'])
     @commands.guild_only()
     @checks.admin_or_permissions(manage_guild=True)
@@ -187,10 +289,19 @@ class BCManager(commands.Cog):
         """
 
         # Check platform
-        if platform.lower() not in ['steam', 'xbox', 'ps4', 'ps5', 'epic']:
+        platform = platform.lower()
+        if platform not in valid_platforms:
             await ctx.send(":x: \"{}\" is an invalid platform".format(platform))
             return False
 
+        owner_id = await self.account_index.get_owner(platform, identifier)
+        if owner_id == str(ctx.message.author.id):
+            await ctx.send(":x: You have already registered this account.")
+            return False
+        if owner_id:
+            await ctx.send(":x: This account has already been registered by another member.")
+            return False
+
         # Validate account -- check for public ballchasing appearances
         valid_account = await self._validate_account(ctx, platform, identifier)
         if valid_account:
@@ -208,15 +319,12 @@ class BCManager(commands.Cog):
         if not await self._react_prompt(ctx, prompt, nvm_message):
             return False
         
-        account_register = await self._get_account_register()
-        pid = str(ctx.message.author.id)
-        if pid in account_register:
-            account_register[pid].append([platform, identifier])
-        else:
-            account_register[pid] = [[platform, identifier]]
-
         # Register account
-        await self._save_account_register(account_register)
+        try:
+            await self.account_index.add(ctx.message.author.id, platform, identifier)
+        except ValueError:
+            await ctx.send(":x: This account has already been registered by another member.")
+            return False
         await ctx.send("Done")
     
     @commands.command(aliases=['rmaccount', 'removeAccount'])
@@ -224,13 +332,11 @@ class BCManager(commands.Cog):
     async def unregisterAccount(self, ctx, platform, identifier=None):
         """Removes one or more registered accounts."""
         remove_accs = []
-        account_register = await self._get_account_register()
         member = ctx.message.author
-        if str(member.id) in account_register:
-            for account in account_register[str(member.id)]:
-                if account[0] == platform:
-                    if not identifier or account[1] == identifier:
-                        remove_accs.append(account)
+        for account in await self._get_member_accounts(member):
+            if account[0] == platform.lower():
+                if not identifier or account[1] == identifier:
+                    remove_accs.append(account)
         
         if not remove_accs:
             await ctx.send(":x: No matching account has been found.")
@@ -240,29 +346,22 @@ class BCManager(commands.Cog):
         if not await self._react_prompt(ctx, prompt, "No accounts have been removed."):
             return False
         
-        count = 0
-        for acc in remove_accs:
-            account_register[str(member.id)].remove(acc)
-            count += 1
-        
-        await self._save_account_register(account_register)
-        await ctx.send(":white_check_mark: Removed **{}** account(s).".format(count))
+        await self.account_index.remove(member.id, remove_accs)
+        await ctx.send(":white_check_mark: Removed **{}** account(s).".format(len(remove_accs)))
 
     @commands.command(aliases=['rmaccounts', 'clearaccounts', 'clearAccounts'])
     @commands.guild_only()
     async def unregisterAccounts(self, ctx):
         """Unlinks registered account for ballchasing requests."""
-        account_register = await self._get_account_register(ctx.guild)
-        discord_id = str(ctx.message.author.id)
-        if discord_id in account_register:
-            count = len(account_register[discord_id])
-            accounts = await self._get_all_accounts(ctx, ctx.message.author)
+        member = ctx.message.author
+        accounts = await self._get_member_accounts(member)
+        if accounts:
             prompt = "React to confirm removal of the following accounts ({}):\n - ".format(len(accounts)) + "\n - ".join("{}: {}".format(acc[0], acc[1]) for acc in accounts)
             if not await self._react_prompt(ctx, prompt, "No accounts have been removed."):
                 return False
             
-            del account_register[discord_id]
-            await ctx.send(":white_check_mark: Removed **{}** account(s).".format(count))
+            await self.account_index.clear(member.id)
+            await ctx.send(":white_check_mark: Removed **{}** account(s).".format(len(accounts)))
         else:
             await ctx.send("No account found.")
 
@@ -279,12 +378,98 @@ class BCManager(commands.Cog):
         show_accounts = "{}, you have registered the following accounts:\n - ".format(member.mention) + "\n - ".join("{}: {}".format(acc[0], acc[1]) for acc in accounts)
         await ctx.send(show_accounts)
 
-    @commands.command()
+    @commands.command(aliases=['importAccounts'])
     @commands.guild_only()
     @checks.admin_or_permissions(manage_guild=True)
     async def massAddAccounts(self, ctx):
-        """Adds accounts in bulk -- This is not supported yet"""
-        pass
+        """Registers accounts in bulk from an attached CSV file with one `discord_id,platform,identifier` row per account
+
+        Each account is validated against ballchasing like `[p]registerAccount`, and a report with the result of every row is sent back.
+        """
+        if not ctx.message.attachments:
+            await ctx.send(":x: Please attach a CSV file of `discord_id,platform,identifier` rows.")
+            return False
+        try:
+            content = (await ctx.message.attachments[0].read()).decode('utf-8-sig')
+        except (discord.HTTPException, UnicodeDecodeError):
+            await ctx.send(":x: The attached file could not be read.")
+            return False
+
+        reader = csv.reader(io.StringIO(content))
+        rows = []
+        for row in reader:
+            cells = [cell.strip() for cell in row] + ['', '', '']
+            if any(cells):
+                rows.append([reader.line_num, cells[0].strip('<@!>'), cells[1].lower(), cells[2]])
+        if rows and rows[0][0] == 1 and not rows[0][1].isdigit():
+            rows.pop(0)     # Header
+        if not rows:
+            await ctx.send(":x: No accounts found in the attached file.")
+            return False
+
+        # Check rows and skip accounts that are already registered before asking ballchasing
+        results = {}    # Row index -> [result, username]
+        to_validate = []
+        seen = set()
+        for index, (line_num, discord_id, platform, identifier) in enumerate(rows):
+            if not discord_id.isdigit() or platform not in valid_platforms or not identifier:
+                results[index] = ["invalid row", ""]
+            elif not ctx.guild.get_member(int(discord_id)):
+                results[index] = ["member not found", ""]
+            elif (platform, identifier) in seen:
+                results[index] = ["duplicate row", ""]
+            else:
+                seen.add((platform, identifier))
+                owner_id = await self.account_index.get_owner(platform, identifier)
+                if owner_id == discord_id:
+                    results[index] = ["already registered", ""]
+                elif owner_id:
+                    results[index] = ["registered to another member", ""]
+                else:
+                    to_validate.append(index)
+
+        status_message = await ctx.send(":signal_strength: Validating **{}** account(s)...".format(len(to_validate)))
+        new_accounts = {}
+        budget = asyncio.Semaphore(config.validation_concurrency)
+
+        async def validate(index):
+            line_num, discord_id, platform, identifier = rows[index]
+            async with budget:
+                try:
+                    valid_account = await self._validate_account(ctx, platform, identifier)
+                except Exception:
+                    results[index] = ["validation failed", ""]
+                    return
+            if valid_account:
+                results[index] = ["registered", valid_account[0]]
+                new_accounts.setdefault(discord_id, []).append([platform, identifier])
+            else:
+                results[index] = ["no replays found", ""]
+
+        await asyncio.gather(*(validate(index) for index in to_validate))
+        if new_accounts:
+            # Accounts registered by someone else while this import was validating are left with their owner
+            skipped = await self.account_index.add_many(new_accounts)
+            for index in to_validate:
+                line_num, discord_id, platform, identifier = rows[index]
+                if [discord_id, platform, identifier] in skipped:
+                    results[index] = ["registered to another member", results[index][1]]
+
+        report = io.StringIO()
+        writer = csv.writer(report)
+        writer.writerow(['row', 'discord_id', 'platform', 'identifier', 'result', 'username'])
+        counts = {}
+        for index, (line_num, discord_id, platform, identifier) in enumerate(rows):
+            result, username = results[index]
+            writer.writerow([line_num, discord_id, platform, identifier, result, username])
+            counts[result] = counts.get(result, 0) + 1
+
+        registered = counts.pop("registered", 0)
+        summary = ":white_check_mark: Registered **{}** of **{}** account(s).".format(registered, len(rows))
+        if counts:
+            summary += "\n" + "\n".join(" - {}: **{}**".format(result, count) for result, count in counts.items())
+        await status_message.edit(content=summary)
+        await ctx.send(file=discord.File(io.BytesIO(report.getvalue().encode()), filename="account_import_{}.csv".format(ctx.guild.id)))
     
     @commands.command()
     @commands.guild_only()
@@ -299,41 +484,29 @@ class BCManager(commands.Cog):
     #     member = message.author
 
 
-    async def _bc_get_request(self, ctx, endpoint, params=[], auth_token=None):
+    async def _bc_get_request(self, ctx, endpoint, params=[], auth_token=None, limiter=None):
         if not auth_token:
             auth_token = await self._get_auth_token(ctx.guild)
-        
-        url = 'https://ballchasing.com/api'
-        url += endpoint
-        params = '&'.join(params)
-        if params:
-            url += "?{}".format(params)
-        
-        return requests.get(url, headers={'Authorization': auth_token})
+        return await self._bc_limited(limiter, self.ballchasing.get(endpoint, auth_token, params))
 
-    async def _bc_post_request(self, ctx, endpoint, params=[], auth_token=None, json=None, data=None, files=None):
+    async def _bc_post_request(self, ctx, endpoint, params=[], auth_token=None, json=None, data=None, files=None, limiter=None):
         if not auth_token:
             auth_token = await self._get_auth_token(ctx.guild)
-        
-        url = 'https://ballchasing.com/api'
-        url += endpoint
-        params = '&'.join(params)
-        if params:
-            url += "?{}".format(params)
-        
-        return requests.post(url, headers={'Authorization': auth_token}, json=json, data=data, files=files)
+        return await self._bc_limited(limiter, self.ballchasing.post(endpoint, auth_token, params, json=json, data=data, files=files))
 
-    async def _bc_patch_request(self, ctx, endpoint, params=[], auth_token=None, json=None, data=None):
+    async def _bc_patch_request(self, ctx, endpoint, params=[], auth_token=None, json=None, data=None, limiter=None):
         if not auth_token:
             auth_token = await self._get_auth_token(ctx.guild)
+        if endpoint.startswith('/groups/'):
+            self.bc_cache.invalidate_group(endpoint.split('/')[2])
+        return await self._bc_limited(limiter, self.ballchasing.patch(endpoint, auth_token, params, json=json, data=data))
 
-        url = 'https://ballchasing.com/api'
-        url += endpoint
-        params = '&'.join(params)
-        if params:
-            url += "?{}".format(params)
-        
-        return requests.patch(url, headers={'Authorization': auth_token}, json=json, data=data)
+    async def _bc_limited(self, limiter, request):
+        """Awaits the ballchasing request, holding one of the limiter's slots if a limiter is shared between requests."""
+        if not limiter:
+            return await request
+        async with limiter:
+            return await request
 
     async def _react_prompt(self, ctx, prompt, if_not_msg=None, embed:discord.Embed=None):
         user = ctx.message.author
@@ -381,23 +554,44 @@ class BCManager(commands.Cog):
             return False
 
     async def _get_steam_ids(self, guild, discord_id):
-        discord_id = str(discord_id)
-        steam_accounts = []
-        account_register = await self._get_account_register()
-        if discord_id in account_register:
-            for account in account_register[discord_id]:
-                if account[0] == 'steam':
-                    steam_accounts.append(account[1])
-        return steam_accounts
+        return await self.account_index.get_platform_ids(discord_id, 'steam')
     
     async def _get_member_accounts(self, member):
-        accs = []
-        account_register = await self._get_account_register()
-        discord_id = str(member.id)
-        if discord_id in account_register:
-            for account in account_register[discord_id]:
-                accs.append(account)
-        return accs
+        return await self.account_index.get_accounts(member.id)
+
+    async def _get_home_color(self, ctx, match, replay, teams):
+        """Returns the home team's color if the replay is one of the match's games, or None.
+        Replays are matched by their team names, or else when every player on each side is a registered member of one of the match's teams."""
+        if self.is_match_replay(match, replay):
+            return 'blue' if self.get_replay_teams(replay)['blue']['name'].lower() in match['home'].lower() else 'orange'
+        if not self.is_full_replay(replay):
+            return None
+
+        members = await self._get_replay_members(ctx.guild, replay)
+        for team_color in ['blue', 'orange']:
+            # A player without a registered account could be anyone, such as in a scrim against another team
+            if not members[team_color] or len(members[team_color]) != len(replay[team_color].get('players', [])):
+                return None
+        blue, orange = set(members['blue']), set(members['orange'])
+        home, away = set(teams['home']), set(teams['away'])
+        if blue <= home and orange <= away:
+            return 'blue'
+        if blue <= away and orange <= home:
+            return 'orange'
+        return None
+
+    async def _get_replay_members(self, guild, replay):
+        """Returns the guild members on each side of a replay, found by their registered accounts."""
+        members = {}
+        for team_color in ['blue', 'orange']:
+            members[team_color] = []
+            for player in replay[team_color].get('players', []):
+                player_id = player.get('id', {})
+                discord_id = await self.account_index.get_owner(player_id.get('platform'), player_id.get('id'))
+                member = guild.get_member(int(discord_id)) if discord_id else None
+                if member:
+                    members[team_color].append(member)
+        return members
     
     async def _validate_account(self, ctx, platform, identifier):
         auth_token = config.auth_token
@@ -455,9 +649,12 @@ class BCManager(commands.Cog):
     async def _get_steam_id_from_token(self, ctx, auth_token=None):
         if not auth_token:
             auth_token = await self._get_auth_token(ctx.guild)
-        r = await self._bc_get_request(ctx, "")
+        if auth_token in self.token_steam_ids:
+            return self.token_steam_ids[auth_token]
+        r = await self._bc_get_request(ctx, "", auth_token=auth_token)
         if r.status_code == 200:
-            return r.json()['steam_id']
+            self.token_steam_ids[auth_token] = r.json()['steam_id']
+            return self.token_steam_ids[auth_token]
         return None
 
     def get_player_id(discord_id):
@@ -466,11 +663,9 @@ class BCManager(commands.Cog):
         return player_id
 
     async def _get_uploader_id(self, ctx, discord_id):
-        account_register = await self._get_account_register()
-        if ctx.member.id in account_register:
-            if account_register[discord_id][0] != 'steam':
-                return account_register[discord_id][1]
-        return None
+        # Ballchasing identifies group owners and uploaders by steam id
+        steam_ids = await self._get_steam_ids(ctx.guild, discord_id)
+        return steam_ids[0] if steam_ids else None
 
     def is_full_replay(self, replay_data):
         if replay_data['duration'] < 300:
@@ -510,7 +705,7 @@ class BCManager(commands.Cog):
         match = await self.match_cog.get_match_from_day_team(ctx, match_day, team)
         return match
 
-    async def _get_replay_destination(self, ctx, match, top_level_group=None, group_owner_discord_id=None):
+    async def _get_replay_destination(self, ctx, match, top_level_group=None, group_owner_discord_id=None, limiter=None):
         
         auth_token = await self._get_auth_token(ctx.guild)
 
@@ -527,68 +722,70 @@ class BCManager(commands.Cog):
         ordered_subgroups = [
             tier_group,
             "Match Day {}".format(str(match['matchDay']).zfill(2)),
-            "{home} vs {away}".format(home=match['home'].title(), away=match['away'].title())
-        ]
-
-        endpoint = '/groups'
-        
-        params = [
-            # 'player-id={}'.format(bcc_acc_rsc),
-            'creator={}'.format(bc_group_owner),
-            'group={}'.format(top_level_group)
+            self._match_group_name(match)
         ]
+        return await self._get_group_path(ctx, top_level_group, ordered_subgroups, bc_group_owner, auth_token, limiter=limiter)
 
-        r = await self._bc_get_request(ctx, endpoint, params, auth_token)
-        data = r.json()
-
-        # Dynamically create sub-group
-        current_subgroup_id = top_level_group
-        next_subgroup_id = None
+    async def _get_group_path(self, ctx, parent_id, ordered_subgroups, bc_group_owner, auth_token, retry_stale=True, limiter=None):
+        """Finds or creates each subgroup below the parent group in turn, returning the last subgroup's id.
+        If a subgroup can't be created because a group found on the way has been deleted, it is evicted from the cache
+        and the path is resolved again once."""
+        current_subgroup_id = parent_id
         for next_group_name in ordered_subgroups:
-            if next_subgroup_id:
-                current_subgroup_id = next_subgroup_id
-            next_subgroup_id = None 
-
-            # Check if next subgroup exists
-            if 'list' in data:
-                for data_subgroup in data['list']:
-                    if data_subgroup['name'] == next_group_name:
-                        next_subgroup_id = data_subgroup['id']
-                        break
-            
-            # Prepare & Execute  Next request:
-            # ## Next subgroup found: request its contents
-            if next_subgroup_id:
-                params = [
-                    'creator={}'.format(bc_group_owner),
-                    'group={}'.format(next_subgroup_id)
-                ]
-
-                r = await self._bc_get_request(ctx, endpoint, params, auth_token)
-                data = r.json()
+            next_subgroup_id = await self._find_subgroup(ctx, current_subgroup_id, next_group_name, bc_group_owner, auth_token, limiter)
 
             # ## Creating next sub-group
-            else:
+            if not next_subgroup_id:
                 payload = {
                     'name': next_group_name,
                     'parent': current_subgroup_id,
                     'player_identification': config.player_identification,
                     'team_identification': config.team_identification
                 }
-                r = await self._bc_post_request(ctx, endpoint, auth_token=auth_token, json=payload)
-                data = r.json()
+                r = await self._bc_post_request(ctx, '/groups', auth_token=auth_token, json=payload, limiter=limiter)
+                if r.status_code in (400, 404) and current_subgroup_id != parent_id and retry_stale:
+                    self.bc_cache.invalidate_group(current_subgroup_id)
+                    return await self._get_group_path(ctx, parent_id, ordered_subgroups, bc_group_owner, auth_token, retry_stale=False, limiter=limiter)
                 
                 try:
-                    next_subgroup_id = data['id']
+                    next_subgroup_id = r.json()['id']
                 except:
                     await ctx.send(":x: Error creating Ballchasing group: {}".format(next_group_name))
                     return False
+                self.bc_cache.set_group(current_subgroup_id, next_group_name, next_subgroup_id)
+
+            current_subgroup_id = next_subgroup_id
             
-        return next_subgroup_id
+        return current_subgroup_id
 
-    async def _find_match_replays(self, ctx, member, match):
+    async def _find_subgroup(self, ctx, parent_id, name, bc_group_owner, auth_token, limiter=None):
+        """Returns the id of the parent group's subgroup with the given name, or None if it doesn't exist.
+        Every subgroup listed in the lookup is cached so the rest of the group tree is resolved without requests."""
+        subgroup_id = self.bc_cache.get_group(parent_id, name)
+        if subgroup_id:
+            return subgroup_id
+
+        params = [
+            'creator={}'.format(bc_group_owner),
+            'group={}'.format(parent_id)
+        ]
+        r = await self._bc_get_request(ctx, '/groups', params, auth_token, limiter)
+        if r.status_code in (400, 404):
+            self.bc_cache.invalidate_group(parent_id)   # The parent group may have been deleted
+        if r.status_code != 200:
+            return None
+
+        listed = set()
+        for data_subgroup in r.json().get('list', []):
+            if data_subgroup['name'] not in listed:
+                listed.add(data_subgroup['name'])
+                self.bc_cache.set_group(parent_id, data_subgroup['name'], data_subgroup['id'])
+                if data_subgroup['name'] == name:
+                    subgroup_id = data_subgroup['id']
+        return subgroup_id
+
+    async def _find_match_replays(self, ctx, member, match, teams=None, limiter=None):
         # search for appearances in private matches
-        endpoint = "/replays"
         sort = 'replay-date' # 'created
         sort_dir = 'desc' # 'asc'
         count = config.search_count
@@ -615,147 +812,328 @@ class BCManager(commands.Cog):
         ]
 
         auth_token = await self._get_auth_token(ctx.guild)
-        all_players = await self._get_all_match_players(ctx, match)
+        if teams is None:
+            teams = await self._get_match_teams(ctx, match)
+        all_players = teams['home'] + teams['away']
         
         # Search invoker's replay uploads first
         if member in all_players:
             all_players.remove(member)
             all_players.insert(0, member)
         
-        # Search all players in game for replays until match is found
+        uploaders = []
         for player in all_players:
             for steam_id in await self._get_steam_ids(ctx.guild, player.id):
-                uploaded_by_param='uploader={}'.format(steam_id)
-                params.append(uploaded_by_param)
-
-                r = await self._bc_get_request(ctx, endpoint, params=params, auth_token=auth_token)
-                data = r.json()
-                params.remove(uploaded_by_param)
-
-                # checks for correct replays
-                home_wins = 0
-                away_wins = 0
-                replay_ids = []
-                for replay in data['list']:
-                    if self.is_match_replay(match, replay):
-                        replay_ids.append(replay['id'])
-                        if replay['blue']['name'].lower() in match['home'].lower():
-                            home = 'blue'
-                            away = 'orange'
-                        else:
-                            home = 'orange'
-                            away = 'blue'
-                        
-                        home_goals = replay[home]['goals'] if 'goals' in replay[home] else 0
-                        away_goals = replay[away]['goals'] if 'goals' in replay[away] else 0
-                        if home_goals > away_goals:
-                            home_wins += 1
-                        else:
-                            away_wins += 1
-
-                series_summary = "**{home_team}** {home_wins} - {away_wins} **{away_team}**".format(
-                    home_team = match['home'],
-                    home_wins = home_wins,
-                    away_wins = away_wins,
-                    away_team = match['away']
-                )
-                winner = None
-                if home_wins > away_wins:
-                    winner = match['home']
-                elif home_wins < away_wins:
-                    winner = match['away']
-
-                if replay_ids:
-                    return replay_ids, series_summary, winner
-        return None
+                if steam_id not in uploaders:
+                    uploaders.append(steam_id)
+        if not uploaders:
+            return None
+
+        # Search every player's uploads at once, within the request limit
+        if not limiter:
+            limiter = asyncio.Semaphore(config.search_concurrency)
+        searches = [asyncio.create_task(self._search_uploader_replays(ctx, steam_id, params, auth_token, limiter)) for steam_id in uploaders]
+        results = [None] * len(searches)
+        home_colors = {}    # Replay id -> the home team's color in the replay
+        try:
+            for search in asyncio.as_completed(searches):
+                try:
+                    steam_id, replays = await search
+                except Exception:
+                    continue
+                match_replays = []
+                for replay in replays:
+                    home_color = await self._get_home_color(ctx, match, replay, teams)
+                    if home_color:
+                        home_colors[replay['id']] = home_color
+                        match_replays.append(replay)
+                results[uploaders.index(steam_id)] = match_replays
+
+                # Stop searching once the uploads found so far hold the whole series
+                if len(self._merge_replays(results)) >= config.series_length:
+                    break
+        finally:
+            for search in searches:
+                search.cancel()
+
+        match_replays = self._merge_replays(results)
+        if not match_replays:
+            return None
+        
+        replay_ids = [replay['id'] for replay in match_replays]
+        series_summary, winner = self._summarize_series(match, match_replays, home_colors)
+        return replay_ids, series_summary, winner
+
+    async def _search_uploader_replays(self, ctx, steam_id, params, auth_token, limiter):
+        endpoint = "/replays"
+        search_window = '&'.join(params)
+        replays = self.bc_cache.get_replays(steam_id, search_window)
+        if replays is not None:
+            return steam_id, replays
+
+        r = await self._bc_get_request(ctx, endpoint, params=params + ['uploader={}'.format(steam_id)], auth_token=auth_token, limiter=limiter)
+        if r.status_code != 200:
+            return steam_id, []
+        replays = r.json()['list']
+        self.bc_cache.set_replays(steam_id, search_window, replays)
+        return steam_id, replays
+
+    def _merge_replays(self, results):
+        """Combines each uploader's match replays, newest first. A game uploaded by more than one player is only
+        kept once, from the first uploader in search order."""
+        replays = {}
+        for uploader_replays in results:
+            for replay in uploader_replays or []:
+                replays.setdefault(replay.get('rocket_league_id', replay['id']), replay)
+        return sorted(replays.values(), key=lambda replay: replay.get('date', ''), reverse=True)
+
+    def _summarize_series(self, match, replays, home_colors):
+        home_wins = 0
+        away_wins = 0
+        for replay in replays:
+            home = home_colors[replay['id']]
+            away = 'orange' if home == 'blue' else 'blue'
+            
+            home_goals = replay[home]['goals'] if 'goals' in replay[home] else 0
+            away_goals = replay[away]['goals'] if 'goals' in replay[away] else 0
+            if home_goals > away_goals:
+                home_wins += 1
+            else:
+                away_wins += 1
+
+        series_summary = "**{home_team}** {home_wins} - {away_wins} **{away_team}**".format(
+            home_team = match['home'],
+            home_wins = home_wins,
+            away_wins = away_wins,
+            away_team = match['away']
+        )
+        winner = None
+        if home_wins > away_wins:
+            winner = match['home']
+        elif home_wins < away_wins:
+            winner = match['away']
+        return series_summary, winner
     
-    async def _download_replays(self, ctx, replay_ids):
+    async def _transfer_replays(self, ctx, subgroup_id, replay_ids, report_progress=True, resolve_group=None, limiter=None):
+        """Copies the replays into the subgroup, oldest first as Game 1, 2, ... Each replay moves through the
+        download, upload and rename stages on its own, so one replay can upload while the next downloads.
+        Progress is posted to the channel.
+
+        If ballchasing rejects an upload because the subgroup was deleted, its cached id is evicted and
+        `resolve_group` is awaited once to find or recreate it. Returns the subgroup's id and the ids of the
+        replays that were uploaded and renamed. Every request holds a slot of `limiter` when one is given."""
         auth_token = await self._get_auth_token(ctx.guild)
-        tmp_replay_files = []
-        this_game = 1
-        for replay_id in replay_ids[::-1]:
-            endpoint = "/replays/{}/file".format(replay_id)
-            r = await self._bc_get_request(ctx, endpoint, auth_token=auth_token)
-            
-            # replay_filename = "Game {}.replay".format(this_game)
-            replay_filename = "{}.replay".format(replay_id)
-            
-            tf = tempfile.NamedTemporaryFile()
-            tf.name += ".replay"
-            tf.write(r.content)
-            tmp_replay_files.append(tf)
-            this_game += 1
+        replay_ids = replay_ids[::-1]
+        progress = _TransferProgress(len(replay_ids))
+        progress_task = asyncio.create_task(self._report_transfer_progress(ctx, progress)) if report_progress else None
+        stages = {stage: asyncio.Semaphore(config.transfer_concurrency) for stage in ('download', 'upload', 'rename')}
+        group = {'id': subgroup_id, 'resolved': not resolve_group}
+        group_lock = asyncio.Lock()
+
+        async def resolve_stale_group(stale_group_id):
+            async with group_lock:
+                if group['id'] == stale_group_id and not group['resolved']:
+                    self.bc_cache.invalidate_group(stale_group_id)
+                    group['id'] = await resolve_group()
+                    group['resolved'] = True
+                return group['id']
+
+        async def upload(replay_file):
+            if not group['id']:
+                return None     # The subgroup couldn't be found or recreated
+            try:
+                return await self._upload_replay(ctx, group['id'], replay_file, auth_token, raise_stale=not group['resolved'], limiter=limiter)
+            except _StaleGroup as e:
+                subgroup_id = await resolve_stale_group(e.group_id)
+                if not subgroup_id:
+                    return None
+                return await self._upload_replay(ctx, subgroup_id, replay_file, auth_token, limiter=limiter)
+
+        async def transfer(game_number, replay_id):
+            with tempfile.NamedTemporaryFile(suffix=".replay") as replay_file:
+                async with stages['download']:
+                    downloaded = await self._download_replay(ctx, replay_id, replay_file, auth_token, limiter)
+                if not downloaded:
+                    return None
+                progress.downloaded += 1
+
+                async with stages['upload']:
+                    uploaded_id = await upload(replay_file)
+            if not uploaded_id:
+                return None
+            progress.uploaded += 1
+
+            async with stages['rename']:
+                renamed = await self._rename_replay(ctx, uploaded_id, game_number, auth_token, limiter)
+            if not renamed:
+                return None
+            progress.renamed += 1
+            return uploaded_id
 
-        return tmp_replay_files
+        try:
+            results = await asyncio.gather(*[transfer(game_number, replay_id) for game_number, replay_id in enumerate(replay_ids, 1)],
+                return_exceptions=True)
+        finally:
+            progress.done = True
+            if progress_task:
+                try:
+                    await progress_task
+                except Exception:
+                    log.exception("Failed to report replay transfer progress")
+
+        uploaded_ids = []
+        for replay_id, result in zip(replay_ids, results):
+            if isinstance(result, Exception):
+                # Reported as not uploaded, like replays whose requests were rejected
+                log.error("Failed to transfer replay %s", replay_id, exc_info=result)
+                await ctx.send(":x: Error transferring replay {}.".format(replay_id))
+            elif result:
+                uploaded_ids.append(result)
+        return group['id'], uploaded_ids
+
+    async def _report_transfer_progress(self, ctx, progress):
+        progress_msg = await ctx.send(progress.summary())
+        shown = progress.summary()
+        while not progress.done:
+            await asyncio.sleep(config.progress_interval)
+            if progress.summary() != shown:
+                shown = progress.summary()
+                await progress_msg.edit(content=shown)
+        if progress.summary() != shown:
+            await progress_msg.edit(content=progress.summary())
+
+    async def _download_replay(self, ctx, replay_id, replay_file, auth_token, limiter=None):
+        endpoint = "/replays/{}/file".format(replay_id)
+        r = await self._bc_limited(limiter, self.ballchasing.download(endpoint, auth_token, replay_file))
+        if r.status_code != 200:
+            await ctx.send(":x: {} error downloading replay {}.".format(r.status_code, replay_id))
+            return False
+        return True
 
-    async def _upload_replays(self, ctx, subgroup_id, files_to_upload):
+    async def _upload_replay(self, ctx, subgroup_id, replay_file, auth_token, raise_stale=False, limiter=None):
         endpoint = "/v2/upload"
         params = [
             'visibility={}'.format(config.visibility),
             'group={}'.format(subgroup_id)
         ]
-        auth_token = await self._get_auth_token(ctx.guild)
-
-        replay_ids_in_group = []
-        for replay_file in files_to_upload:
-            replay_file.seek(0)
-            files = {'file': replay_file}
+        files = {'file': replay_file}
+        r = await self._bc_post_request(ctx, endpoint, params, auth_token=auth_token, files=files, limiter=limiter)
+    
+        status_code = r.status_code
+        if status_code in (400, 404) and raise_stale:
+            raise _StaleGroup(subgroup_id)
+        data = {}
 
-            r = await self._bc_post_request(ctx, endpoint, params, auth_token=auth_token, files=files)
-        
-            status_code = r.status_code
+        try:
             data = r.json()
-
-            try:
-                if status_code == 201:
-                    replay_ids_in_group.append(data['id'])
-                elif status_code == 409:
-                    payload = {
-                        'group': subgroup_id
-                    }
-                    r = await self._bc_patch_request(ctx, '/replays/{}'.format(data['id']), auth_token=auth_token, json=payload)
-                    if r.status_code == 204:
-                        replay_ids_in_group.append(data['id'])
-                    else:
-                        await ctx.send(":x: {} error: {}".format(r.status_code, r.json()['error']))
-            except:
-                await ctx.send(":x: {} error: {}".format(status_code, data['error']))
-        
-        return replay_ids_in_group
+            if status_code == 201:
+                return data['id']
+            elif status_code == 409:
+                payload = {
+                    'group': subgroup_id
+                }
+                r = await self._bc_patch_request(ctx, '/replays/{}'.format(data['id']), auth_token=auth_token, json=payload, limiter=limiter)
+                if r.status_code == 204:
+                    return data['id']
+                else:
+                    await ctx.send(":x: {} error: {}".format(r.status_code, r.json()['error']))
+        except:
+            error = data.get('error') if isinstance(data, dict) else None
+            await ctx.send(":x: {} error: {}".format(status_code, error or "the replay could not be uploaded"))
+        return None
         
-    async def _rename_replays(self, ctx, uploaded_replays_ids):
-        auth_token = await self._get_auth_token(ctx.guild)
-        renamed = []
+    async def _rename_replay(self, ctx, replay_id, game_number, auth_token, limiter=None):
+        endpoint = '/replays/{}'.format(replay_id)
+        payload = {
+            'title': 'Game {}'.format(game_number)
+        }
+        r = await self._bc_patch_request(ctx, endpoint, auth_token=auth_token, json=payload, limiter=limiter)
+        status_code = r.status_code
 
-        game_number = 1
-        for replay_id in uploaded_replays_ids:
-            endpoint = '/replays/{}'.format(replay_id)
-            payload = {
-                'title': 'Game {}'.format(game_number)
-            }
-            r = await self._bc_patch_request(ctx, endpoint, auth_token=auth_token, json=payload)
-            status_code = r.status_code
+        if status_code == 204:
+            return True
+        await ctx.send(":x: {} error.".format(status_code))
+        return False
 
-            if status_code == 204:
-                renamed.append(replay_id)            
-            else:
-                await ctx.send(":x: {} error.".format(status_code))
+    async def _report_scheduled_match(self, ctx, match, match_day_group_id, rosters, bc_group_owner, auth_token, limiter):
+        """Uploads one match's replays for bcreportAll. Returns the result ("uploaded", "missing", "already uploaded" or "failed") and details."""
+        if not match_day_group_id:
+            return "failed", "Error creating Ballchasing group"
+
+        match_group_name = self._match_group_name(match)
+        match_group_id = await self._find_subgroup(ctx, match_day_group_id, match_group_name, bc_group_owner, auth_token, limiter)
+        if match_group_id:
+            r = await self._bc_get_request(ctx, '/replays', ['group={}'.format(match_group_id), 'count=1'], auth_token, limiter)
+            if r.status_code == 200 and r.json()['list']:
+                return "already uploaded", None
+            if r.status_code in (400, 404):
+                self.bc_cache.invalidate_group(match_group_id)  # Deleted since it was cached
+                match_group_id = None
+
+        teams = {'home': rosters.get(match['home'], []), 'away': rosters.get(match['away'], [])}
+        replays_found = await self._find_match_replays(ctx, None, match, teams=teams, limiter=limiter)
+        if not replays_found:
+            return "missing", None
+        replay_ids, summary, winner = replays_found
 
-            game_number += 1
-        return renamed
+        # Resolved from the top level group, so a match day group deleted since it was cached is found again
+        resolve_group = functools.partial(self._get_replay_destination, ctx, match, limiter=limiter)
+        if not match_group_id:
+            match_group_id = await resolve_group()
+            if not match_group_id:
+                return "failed", "Error creating Ballchasing group"
+        match_group_id, renamed = await self._transfer_replays(ctx, match_group_id, replay_ids, report_progress=False,
+            resolve_group=resolve_group, limiter=limiter)
+        if not match_group_id:
+            return "failed", "Error creating Ballchasing group"
+        return "uploaded", "{} ({}/{} replays) https://ballchasing.com/group/{}".format(summary, len(renamed), len(replay_ids), match_group_id)
+
+    async def _get_roster_snapshot(self, ctx, team_names):
+        """Returns the members of each team, found with a single pass over the guild's members."""
+        team_roles = {}
+        for team_name in team_names:
+            try:
+                team_roles[await self.team_manager_cog._roles_for_team(ctx, team_name)] = team_name
+            except LookupError:
+                pass
+
+        rosters = {team_name: [] for team_name in team_names}
+        franchise_roles = set(franchise_role for franchise_role, tier_role in team_roles)
+        tier_roles = set(tier_role for franchise_role, tier_role in team_roles)
+        for member in ctx.guild.members:
+            member_franchises = franchise_roles.intersection(member.roles)
+            if not member_franchises:
+                continue
+            for tier_role in tier_roles.intersection(member.roles):
+                for franchise_role in member_franchises:
+                    team_name = team_roles.get((franchise_role, tier_role))
+                    if team_name:
+                        rosters[team_name].append(member)
+        return rosters
+
+    def _match_group_name(self, match):
+        return "{home} vs {away}".format(home=match['home'].title(), away=match['away'].title())
+
+    async def _send_lines(self, ctx, lines):
+        message = ""
+        for line in lines:
+            if len(message) + len(line) + 1 > 2000:
+                await ctx.send(message)
+                message = ""
+            message += line + "\n"
+        if message:
+            await ctx.send(message)
 
     async def _get_tier_subgroup_name(self, ctx, tier):
         tier_num = (await self._get_tier_ranks(ctx))[tier]
         return '{}{}'.format(tier_num, tier)
 
-    async def _get_all_match_players(self, ctx, match):
-        players = []
+    async def _get_match_teams(self, ctx, match):
+        teams = {}
         for team in ['home', 'away']:
             franchise_role, tier_role = await self.team_manager_cog._roles_for_team(ctx, match[team])
-            team_members = self.team_manager_cog.members_from_team(ctx, franchise_role, tier_role)
-            for player in team_members:
-                players.append(player)
-        return players
+            teams[team] = list(self.team_manager_cog.members_from_team(ctx, franchise_role, tier_role))
+        return teams
 
 # json db
 
@@ -779,11 +1157,3 @@ class BCManager(commands.Cog):
     async def _save_tier_ranks(self, ctx, tier_ranks):
         await self.config.guild(ctx.guild).TierRanks.set(tier_ranks)
         return True
-
-    async def _get_account_register(self):
-        return await self.config.AccountRegister()
-    
-    async def _save_account_register(self, account_register):
-        await self.config.AccountRegister.set(account_register)
-
-    
\ No newline at end of file
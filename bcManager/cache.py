@@ -0,0 +1,90 @@
+import asyncio
+import json
+import os
+import time
+
+GROUP_TTL = 7 * 24 * 60 * 60        # Ballchasing group ids, which only change if a group is deleted (seconds)
+REPLAY_SEARCH_TTL = 5 * 60          # Replay search results, which change as players upload (seconds)
+SAVE_DELAY = 5                      # Changes made within this many seconds are written to disk together
+
+class BallchasingCache:
+    """On-disk cache of ballchasing responses with a time to live for each entry.
+
+    Subgroup ids are kept by `(parent group, name)` and replay searches by `(uploader, search window)`.
+    Entries are stored as `{key: [expires_at, value]}` in a JSON file and written shortly after they change."""
+
+    def __init__(self, path):
+        self.path = path
+        self._entries = self._load()
+        self._save_task = None
+
+    #region groups
+    def get_group(self, parent, name):
+        return self._get(self._group_key(parent, name))
+
+    def set_group(self, parent, name, group_id):
+        self._set(self._group_key(parent, name), group_id, GROUP_TTL)
+
+    def invalidate_group(self, group_id):
+        """Drops the cached ids of the group and of its subgroups, for when the group is changed or removed."""
+        prefix = self._group_key(group_id, "")
+        for key, (expires_at, value) in list(self._entries.items()):
+            if key.startswith(prefix) or (key.startswith("group:") and value == group_id):
+                del self._entries[key]
+        self._schedule_save()
+    #endregion
+
+    #region replay searches
+    def get_replays(self, uploader, window):
+        return self._get(self._replays_key(uploader, window))
+
+    def set_replays(self, uploader, window, replays):
+        self._set(self._replays_key(uploader, window), replays, REPLAY_SEARCH_TTL)
+    #endregion
+
+    def save(self):
+        if self._save_task:
+            self._save_task.cancel()
+            self._save_task = None
+        now = time.time()
+        self._entries = {key: entry for key, entry in self._entries.items() if entry[0] > now}
+        tmp_path = "{}.tmp".format(self.path)
+        with open(tmp_path, "w") as f:
+            json.dump(self._entries, f)
+        os.replace(tmp_path, self.path)
+
+    def _get(self, key):
+        entry = self._entries.get(key)
+        if not entry:
+            return None
+        expires_at, value = entry
+        if expires_at <= time.time():
+            del self._entries[key]
+            return None
+        return value
+
+    def _set(self, key, value, ttl):
+        self._entries[key] = [time.time() + ttl, value]
+        self._schedule_save()
+
+    def _schedule_save(self):
+        if not self._save_task or self._save_task.done():
+            self._save_task = asyncio.create_task(self._save_later())
+
+    async def _save_later(self):
+        await asyncio.sleep(SAVE_DELAY)
+        self._save_task = None
+        self.save()
+
+    def _load(self):
+        try:
+            with open(self.path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _group_key(self, parent, name):
+        return "group:{}:{}".format(parent, name)
+
+    def _replays_key(self, uploader, window):
+        return "replays:{}:{}".format(uploader, window)
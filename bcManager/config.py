@@ -7,6 +7,13 @@ class config:
     auth_token = None
     top_level_group = None
     search_count = 10
+    search_concurrency = 4                                      # Replay searches sent to ballchasing at once
+    series_length = 4                                           # Games in a match series -- replay searches stop once this many are found
+    transfer_concurrency = 2                                    # Replays downloaded, uploaded and renamed at once (per stage)
+    progress_interval = 2                                       # Seconds between replay transfer progress updates
+    batch_concurrency = 4                                       # Matches reported at once by bcreportAll
+    request_concurrency = 4                                     # Ballchasing requests in flight at once across all of bcreportAll's matches
+    validation_concurrency = 4                                  # Accounts validated against ballchasing at once by massAddAccounts
     visibility = 'public'
     team_identification = 'by-player-clusters'                  # setting -- Alternative: 'by-distinct-players'
     player_identification = 'by-id'                             # setting -- Alternative 'by-name'
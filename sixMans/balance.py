@@ -0,0 +1,62 @@
+import random
+from itertools import combinations
+
+EXACT_BALANCE_MAX_PLAYERS = 16  # Largest game searched exhaustively (6435 splits with the first player fixed)
+SCORE_PRECISION = 6             # Decimal places used when comparing team balance
+
+def balance_teams(player_scores: dict):
+    """Splits the players into two even teams with total scores as close as possible.
+
+    Games up to `EXACT_BALANCE_MAX_PLAYERS` are searched exhaustively, larger ones use a greedy split
+    improved by swapping players. Returns the blue team and its balance score (the distance of a team's
+    total from half of all players' scores)."""
+    players = list(player_scores.keys())
+    half_total = sum(player_scores.values()) / 2
+    if len(players) <= EXACT_BALANCE_MAX_PLAYERS:
+        team = _exact_split(players, player_scores, half_total)
+    else:
+        team = _swap_split(players, player_scores)
+
+    balance_score = round(abs(half_total - sum(player_scores[player] for player in team)), SCORE_PRECISION)
+    # Either half of the split works as the blue team
+    if random.random() < 0.5:
+        team = [player for player in players if player not in team]
+    return team, balance_score
+
+def _exact_split(players, player_scores, half_total):
+    # Fixing the first player on one team visits each split once instead of once per team colour.
+    # Ties are resolved by reservoir sampling so no list of tied teams needs to be kept
+    first, others = players[0], players[1:]
+    best_team = None
+    best_diff = None
+    ties = 0
+    for teammates in combinations(others, len(players)//2 - 1):
+        team_score = player_scores[first] + sum(player_scores[player] for player in teammates)
+        diff = round(abs(half_total - team_score), SCORE_PRECISION)
+        if best_diff is None or diff < best_diff:
+            best_team, best_diff, ties = teammates, diff, 1
+        elif diff == best_diff:
+            ties += 1
+            if random.randrange(ties) == 0:
+                best_team = teammates
+    return [first] + list(best_team)
+
+def _swap_split(players, player_scores):
+    # Alternate players from strongest to weakest, then keep making the single swap that most reduces
+    # the difference between the team totals until no swap helps
+    ranked = sorted(players, key=lambda player: player_scores[player], reverse=True)
+    team_a, team_b = ranked[0::2], ranked[1::2]
+    diff = sum(player_scores[p] for p in team_a) - sum(player_scores[p] for p in team_b)
+    while True:
+        best_swap = None
+        best_diff = abs(diff)
+        for i, a in enumerate(team_a):
+            for j, b in enumerate(team_b):
+                new_diff = abs(diff - 2 * (player_scores[a] - player_scores[b]))
+                if round(new_diff, SCORE_PRECISION) < round(best_diff, SCORE_PRECISION):
+                    best_swap, best_diff = (i, j), new_diff
+        if not best_swap:
+            return team_a
+        i, j = best_swap
+        diff -= 2 * (player_scores[team_a[i]] - player_scores[team_b[j]])
+        team_a[i], team_b[j] = team_b[j], team_a[i]
@@ -3,13 +3,23 @@ import struct
 from typing import List
 import uuid
 import asyncio
+import datetime
+import functools
+import logging
 import operator
 import discord
-from itertools import combinations
 
+from .balance import balance_teams
+from .metrics import count_api_call
+from .scheduler import PRIORITY_CHANNEL, PRIORITY_COSMETIC, PRIORITY_MESSAGE, PRIORITY_REACTION
 from .strings import Strings
 from .queue import SixMansQueue
+from .voice import move_members
 
+log = logging.getLogger("red.sixMans")
+
+
+EMBED_DEBOUNCE = 1  # Team selection changes made within this many seconds are shown with a single info message edit
 
 SELECTION_MODES  = {
     0x1F3B2: Strings.RANDOM_TS,         # game_die
@@ -28,7 +38,8 @@ class Game:
             info_message: discord.Message=None,
             use_reactions=True,
             observers=None,
-            prefix="?"):
+            prefix="?",
+            scheduler=None):
         self.id = uuid.uuid4().int
         self.players = set(players)
         self.captains = []
@@ -49,7 +60,17 @@ class Game:
         self.textChannel = text_channel
         self.voiceChannels = voice_channels #List of voice channels: [Blue, Orange, General]
         self.info_message = info_message
+        self.saved_info_message_id = None   # Info message id of a game restored from Config, until the message is fetched
+        self.needs_restore = False
+        self.restore_task = None
         self.observers = observers if observers else []
+        self.scheduler = scheduler
+        self.started_at = None          # When the game's channels were created or claimed from the lobby pool (UTC)
+        self.votes = {}                 # Player -> hex code of their team selection vote
+        self.team_reactions = {}        # Player -> hex code of their self picking team reaction
+        self._render_embed = None       # Builds the embed for the next debounced info message edit
+        self._render_task = None
+        self._rendering = False
 
         # attatch listeners to game
         for observer in self.observers:
@@ -68,41 +89,55 @@ class Game:
                 pass
 
 # Team Management
-    async def create_game_channels(self, category=None):
+    async def create_game_channels(self, category=None, lobby: List[discord.abc.GuildChannel]=None):
+        """Creates the game's text and voice channels, or takes over a pre-created lobby set of
+        `[text_channel, blue_vc, orange_vc, general_vc]` if one is given."""
         if not category:
             category = self.queue.category
         guild = self.queue.guild
-        # sync permissions on channel creation, and edit overwrites (@everyone) immediately after
+        self.started_at = datetime.datetime.utcnow()
         code = str(self.id)[-3:]
-        self.textChannel = await guild.create_text_channel(
-            "{} {} {} Mans".format(code, self.queue.name, self.queue.maxSize), 
-            permissions_synced=True,
-            category=category
-        )
-        await self.textChannel.set_permissions(guild.default_role, view_channel=False, read_messages=False)
+        text_name = "{} {} {} Mans".format(code, self.queue.name, self.queue.maxSize)
+        general_name = "{} | {} General VC".format(code, self.queue.name)
+        blue_name = "{} | {} Blue Team".format(code, self.queue.name)
+        orange_name = "{} | {} Orange Team".format(code, self.queue.name)
+
+        # Build all permission overwrites up front (starting from the category's, as a synced channel would)
+        # so each channel is created with its final permissions in a single request
+        category_overwrites = dict(category.overwrites) if category else {}
+        text_overwrites = dict(category_overwrites)
+        text_overwrites[guild.default_role] = discord.PermissionOverwrite(view_channel=False, read_messages=False)
         for player in self.players:
-            await self.textChannel.set_permissions(player, read_messages=True)
-		
-        # create a general VC lobby for all players in a session
-        general_vc = await guild.create_voice_channel("{} | {} General VC".format(code, self.queue.name), permissions_synced=True, category=category)
-        await general_vc.set_permissions(guild.default_role, connect=False)
-
-        blue_vc = await guild.create_voice_channel("{} | {} Blue Team".format(code, self.queue.name), permissions_synced=True, category=category)
-        await blue_vc.set_permissions(guild.default_role, connect=False)
-        oran_vc = await guild.create_voice_channel("{} | {} Orange Team".format(code, self.queue.name), permissions_synced=True, category=category)
-        await oran_vc.set_permissions(guild.default_role, connect=False)
-        
+            text_overwrites[player] = discord.PermissionOverwrite(read_messages=True)
+        voice_overwrites = dict(category_overwrites)
+        voice_overwrites[guild.default_role] = discord.PermissionOverwrite(connect=False)
+
         # manually add helper role perms if one is set
         if self.helper_role:
-            await self.textChannel.set_permissions(self.helper_role, view_channel=True, read_messages=True)
-            await general_vc.set_permissions(self.helper_role, connect=True, move_members=True)
-            await blue_vc.set_permissions(self.helper_role, connect=True, move_members=True)
-            await oran_vc.set_permissions(self.helper_role, connect=True, move_members=True)
-        
+            text_overwrites[self.helper_role] = discord.PermissionOverwrite(view_channel=True, read_messages=True)
+            voice_overwrites[self.helper_role] = discord.PermissionOverwrite(connect=True, move_members=True)
+
+        if lobby:
+            # rename the pooled channels and grant the players access
+            self.textChannel, blue_vc, oran_vc, general_vc = lobby
+            await asyncio.gather(
+                self._request(PRIORITY_CHANNEL, functools.partial(self.textChannel.edit, name=text_name, overwrites=text_overwrites)),
+                self._request(PRIORITY_CHANNEL, functools.partial(general_vc.edit, name=general_name, overwrites=voice_overwrites)),
+                self._request(PRIORITY_CHANNEL, functools.partial(blue_vc.edit, name=blue_name, overwrites=voice_overwrites)),
+                self._request(PRIORITY_CHANNEL, functools.partial(oran_vc.edit, name=orange_name, overwrites=voice_overwrites))
+            )
+        else:
+            # create the text channel and a general VC lobby for all players in a session along with the team VCs
+            self.textChannel, general_vc, blue_vc, oran_vc = await asyncio.gather(
+                self._request(PRIORITY_CHANNEL, functools.partial(guild.create_text_channel, text_name, overwrites=text_overwrites, category=category)),
+                self._request(PRIORITY_CHANNEL, functools.partial(guild.create_voice_channel, general_name, overwrites=voice_overwrites, category=category)),
+                self._request(PRIORITY_CHANNEL, functools.partial(guild.create_voice_channel, blue_name, overwrites=voice_overwrites, category=category)),
+                self._request(PRIORITY_CHANNEL, functools.partial(guild.create_voice_channel, orange_name, overwrites=voice_overwrites, category=category))
+            )
         self.voiceChannels = [blue_vc, oran_vc, general_vc]
 
         # Mentions all players
-        await self.textChannel.send(', '.join(player.mention for player in self.players))
+        await self._send(', '.join(player.mention for player in self.players))
 
     def add_to_blue(self, player):
         if player in self.orange:
@@ -119,35 +154,47 @@ class Game:
         self.orange.add(player)
 
     async def update_player_perms(self):
+        """Grants each team connect access to their voice channels with one overwrite edit per channel, then
+        moves players into their team channel if automove is enabled. Returns the moves that failed."""
         blue_vc, orange_vc, general_vc = self.voiceChannels
-        
-        for player in self.orange:
-            await general_vc.set_permissions(player, connect=True)
-            await blue_vc.set_permissions(player, connect=False)
-            await orange_vc.set_permissions(player, connect=True)
+        general_overwrites = dict(general_vc.overwrites)
+        blue_overwrites = dict(blue_vc.overwrites)
+        orange_overwrites = dict(orange_vc.overwrites)
 
-            if self.automove:
-                try:
-                    await player.move_to(orange_vc)
-                except:
-                    pass
+        for player in self.orange:
+            general_overwrites[player] = discord.PermissionOverwrite(connect=True)
+            blue_overwrites[player] = discord.PermissionOverwrite(connect=False)
+            orange_overwrites[player] = discord.PermissionOverwrite(connect=True)
 
         for player in self.blue:
-            await general_vc.set_permissions(player, connect=True)
-            await blue_vc.set_permissions(player, connect=True)
-            await orange_vc.set_permissions(player, connect=False)
+            general_overwrites[player] = discord.PermissionOverwrite(connect=True)
+            blue_overwrites[player] = discord.PermissionOverwrite(connect=True)
+            orange_overwrites[player] = discord.PermissionOverwrite(connect=False)
+
+        await asyncio.gather(
+            self._request(PRIORITY_CHANNEL, functools.partial(general_vc.edit, overwrites=general_overwrites)),
+            self._request(PRIORITY_CHANNEL, functools.partial(blue_vc.edit, overwrites=blue_overwrites)),
+            self._request(PRIORITY_CHANNEL, functools.partial(orange_vc.edit, overwrites=orange_overwrites))
+        )
 
-            if self.automove:
-                try:
-                    await player.move_to(blue_vc)
-                except:
-                    pass
+        if not self.automove:
+            return []
+        moves = [(player, orange_vc) for player in self.orange] + [(player, blue_vc) for player in self.blue]
+        failed_moves = await move_members(moves)
+
+        # Players who aren't connected to voice can't be moved, so only mention the ones who were
+        not_moved = [member for member, channel, error in failed_moves if member.voice]
+        if not_moved:
+            await self._send(":x: Couldn't move {} to their team voice channel. Use the `{}moveMe` command to try again."
+                .format(", ".join(member.mention for member in not_moved), self.prefix))
+        return failed_moves
 
 # Team Selection
     async def vote_team_selection(self, helper_role=None):
+        self.votes = {}
         # Mentions all players
         embed = self._get_vote_embed()
-        self.info_message = await self.textChannel.send(embed=embed)
+        self.info_message = await self._send(embed=embed)
         reacts = [hex(key) for key in SELECTION_MODES.keys()]
         await self._add_reactions(reacts, self.info_message)
 
@@ -174,7 +221,7 @@ class Game:
         
         # Get player pick embed
         embed = self._get_captains_embed('blue')
-        self.info_message = await self.textChannel.send(embed=embed)
+        self.info_message = await self._send(embed=embed)
         
         await self._add_reactions(self.react_player_picks.keys(), self.info_message)
 
@@ -193,15 +240,14 @@ class Game:
         await self._notify(Strings.ONGOING_GS)
 
     async def self_picking_teams(self):
+        self.team_reactions = {}
         embed = self._get_spt_embed()
-        self.info_message = await self.textChannel.send(embed=embed)
+        self.info_message = await self._send(embed=embed)
         await self._add_reactions([Strings.ORANGE_REACT, Strings.BLUE_REACT], self.info_message)
 
     async def pick_balanced_teams(self):
-        balanced_teams, balance_score = self.get_balanced_teams()
+        blue, balance_score = self.get_balanced_teams()
         self.balance_score = balance_score
-        # Pick random balanced team
-        blue = random.choice(balanced_teams)
         orange = []
         for player in self.players:
             if player not in blue:
@@ -219,12 +265,13 @@ class Game:
    
     async def shuffle_players(self):
         await self.pick_random_teams()
-        await self.info_message.add_reaction(Strings.SHUFFLE_REACT)
+        await self._request(PRIORITY_REACTION, functools.partial(self.info_message.add_reaction, Strings.SHUFFLE_REACT))
 
 # Team Selection helpers
     async def process_team_selection_method(self, team_selection=None):
         if not team_selection:
             team_selection = self.teamSelection
+        await self._cancel_render()
         self.full_player_reset()
         team_selection = team_selection.lower()
         helper_role = self.helper_role
@@ -250,26 +297,19 @@ class Game:
 
     async def process_captains_pick(self, emoji, user):
         teams_complete = False
-        pick_i = len(self.blue)+len(self.orange)-2
-        pick_order = ['blue', 'orange', 'orange', 'blue']
-        pick = pick_order[pick_i%len(pick_order)]
+        pick = self._captains_pick()
         captain_picking = self.captains[0] if pick == 'blue' else self.captains[1]
         
         if user != captain_picking:
-            self.info_message = await self.textChannel.fetch_message(self.info_message.id)
-            for this_react in self.info_message.reactions:
-                this_react:discord.Reaction
-                reacted_members = await this_react.users().flatten()
-                if user in reacted_members:
-                    try:
-                        await this_react.remove(user)
-                    except:
-                        pass
+            try:
+                await self._remove_reaction(emoji, user)
+            except:
+                pass
             return False
         
         # get player from reaction
         player_picked = self._get_player_from_reaction_emoji(ord(emoji))
-        await self.info_message.clear_reaction(emoji)
+        await self._request(PRIORITY_REACTION, functools.partial(self.info_message.clear_reaction, emoji))
         
         # add to correct team, update teams embed
         self.blue.add(player_picked) if pick == 'blue' else self.orange.add(player_picked)
@@ -277,19 +317,18 @@ class Game:
         # automatically process last pick
         picks_remaining = list(self.react_player_picks.keys())
         if len(picks_remaining) > 1:
-            embed = self._get_captains_embed(pick_order[pick_i+1])
-            await self.info_message.edit(embed=embed)
+            self._render_info_message(lambda: self._get_captains_embed(self._captains_pick()))
         
         elif len(picks_remaining) == 1:
             last_pick = 'blue' if len(self.orange) > len(self.blue) else 'orange'
             last_pick_key = picks_remaining[0]
             last_player = self.react_player_picks[last_pick_key]
             del self.react_player_picks[last_pick_key]
-            await self.info_message.clear_reactions()
+            await self._request(PRIORITY_REACTION, self.info_message.clear_reactions)
             self.blue.add(last_player) if last_pick == 'blue' else self.orange.add(last_player)
             teams_complete = True
             embed = self._get_captains_embed(None, guild=last_player.guild)
-            await self.info_message.edit(embed=embed)
+            await self._show_info_message(embed)
         
         if teams_complete:
             for player in self.blue:
@@ -304,20 +343,14 @@ class Game:
         return teams_complete
     
     async def process_self_picking_teams(self, emoji, user, added=True):
-        self.info_message = await self.textChannel.fetch_message(self.info_message.id)
         if self.state != Strings.TEAM_SELECTION_GS:
             return False
         
         if user not in set(list(self.blue) + list(self.orange) + list(self.players)):
             try:
                 if ord(emoji) in [Strings.ORANGE_REACT, Strings.BLUE_REACT]:
-                    self.info_message = await self.textChannel.fetch_message(self.info_message.id)
-                    for reaction in self.info_message.reactions:
-                        reacted_members = await reaction.users().flatten()
-                        if reaction.emoji == emoji and user in reacted_members:
-                            await reaction.remove(user)
-                            break
-            except TypeError:
+                    await self._remove_reaction(emoji, user)
+            except (TypeError, discord.HTTPException):
                 pass 
             return
 
@@ -325,30 +358,23 @@ class Game:
             if ord(emoji) == Strings.ORANGE_REACT:
                 if len(self.orange) < self.queue.maxSize//2:
                     self.add_to_orange(user)
-                # Remove opposite color reaction
-                for react in self.info_message.reactions:
-                    if ord(react.emoji) == Strings.BLUE_REACT:
-                        reacted_members = await react.users().flatten()
-                        if user in reacted_members:
-                            try:
-                                await react.remove(user)
-                            except:
-                                pass
+                opposite_react = Strings.BLUE_REACT
             elif ord(emoji) == Strings.BLUE_REACT:
                 if len(self.blue) < self.queue.maxSize//2:
                     self.add_to_blue(user)
-                # Remove opposite color reaction
-                for react in self.info_message.reactions:
-                    if ord(react.emoji) == Strings.ORANGE_REACT:
-                        reacted_members = await react.users().flatten()
-                        if user in reacted_members:
-                            try:
-                                await react.remove(user)
-                            except:
-                                pass
+                opposite_react = Strings.ORANGE_REACT
             else:
                 return
+            # Remove opposite color reaction
+            if self.team_reactions.get(user) == opposite_react:
+                try:
+                    await self._remove_reaction(self._get_pick_reaction(opposite_react), user)
+                except:
+                    pass
+            self.team_reactions[user] = ord(emoji)
         else:
+            if self.team_reactions.get(user) == ord(emoji):
+                del self.team_reactions[user]
             if ord(emoji) == Strings.ORANGE_REACT:
                 if user in self.orange:
                     self.orange.remove(user)
@@ -359,7 +385,6 @@ class Game:
                     self.players.add(user)
 
         embed = self._get_spt_embed()
-        await self.info_message.edit(embed=embed)
         
         # Check if Teams are determined
         teams_finalized = False
@@ -371,32 +396,33 @@ class Game:
             teams_finalized = True
         
         if teams_finalized:
+            await self._show_info_message(embed)
             self.reset_players()
             self.get_new_captains_from_teams()
             await self.update_player_perms()
             await self.update_game_info()
             await self._notify(Strings.ONGOING_GS)
+        else:
+            self._render_info_message(self._get_spt_embed)
 
     async def process_team_select_vote(self, emoji, member, added=True):
         if member not in self.players:
             return
 
-        if self._hex_i_from_emoji(emoji) not in SELECTION_MODES:
+        react_hex_i = self._hex_i_from_emoji(emoji)
+        if react_hex_i not in SELECTION_MODES:
             return
 
-        # RECORD VOTES
-        votes = {}
-        self.info_message = await self.textChannel.fetch_message(self.info_message.id) # this is needed to get the up to date reactions for a message
-        for this_react in self.info_message.reactions:
-            this_react:discord.Reaction
-            react_hex_i = self._hex_i_from_emoji(this_react.emoji)
-            if react_hex_i in SELECTION_MODES:
-                reacted_members = await this_react.users().flatten()
-                reacted_players = [player for player in reacted_members if player in self.players]  # Intersection of reacted_members and self.players
-                if added and this_react.emoji != emoji and member in reacted_players:
-                    await this_react.remove(member)
-                    reacted_players.remove(member)
-                votes[react_hex_i] = len(reacted_players)
+        # RECORD VOTES - each player's vote is kept in memory so the message's reactions don't need to be fetched
+        message = self.info_message
+        previous_vote = self.votes.get(member)
+        if added:
+            self.votes[member] = react_hex_i
+        elif previous_vote == react_hex_i:
+            del self.votes[member]
+        else:
+            return  # The player's vote had already moved to another option
+        votes = self._count_votes()
 
         # COUNT VOTES - Check if complete
         total_votes = 0
@@ -421,90 +447,36 @@ class Game:
             if self.teamSelection.lower() == Strings.VOTE_TS.lower():
                 self.teamSelection = SELECTION_MODES[running_vote[0]]
                 embed = self._get_vote_embed(vote=votes, winning_vote=running_vote[0])
-                await self.info_message.edit(embed=embed)
+                await self._show_info_message(embed)
                 await self.process_team_selection_method()
         else:
             # Update embed
-            embed = self._get_vote_embed(votes)
-            await self.info_message.edit(embed=embed)
+            self._render_info_message(lambda: self._get_vote_embed(self._count_votes()))
+
+        # Players get one vote, so take down the reaction for their previous one
+        if added and previous_vote is not None and previous_vote != react_hex_i:
+            try:
+                await self._request(PRIORITY_REACTION, functools.partial(message.remove_reaction, self._get_pick_reaction(previous_vote), member))
+            except:
+                pass
+
+    def _count_votes(self):
+        votes = {react_hex: 0 for react_hex in SELECTION_MODES}
+        for react_hex in self.votes.values():
+            votes[react_hex] += 1
+        return votes
 
     def get_balanced_teams(self):
-        # Get relevent info from helpers
+        """Returns the most balanced blue team (picked at random between equally balanced teams) and its balance score"""
         player_scores = self.get_player_scores()
-        team_combos = list(combinations(list(self.players), len(self.players)//2))
-
-        # Calc perfectly balanced team based on scores
-        score_total = 0
-        for player, p_data in player_scores.items():
-            score_total += p_data['Score']
-        avg_team_score = score_total/2
-
-        # Determine balanced teams
-        balanced_teams = []
-        balance_diff = None
-        for a_team in team_combos:
-            team_score = 0
-            for player in a_team:
-                team_score += player_scores[player]['Score']
-            
-            team_diff = abs(avg_team_score - team_score)
-            if balance_diff:
-                if team_diff < balance_diff:
-                    balance_diff = team_diff
-                    balanced_teams = [a_team]
-                elif team_diff == balance_diff:
-                    balanced_teams.append(a_team)
-            else:
-                balance_diff = team_diff
-                balanced_teams = [a_team]
-        
-        # return balanced team
-        self._notify(Strings.ONGOING_GS)
-        return balanced_teams, team_diff
+        return balance_teams({player: p_data['Score'] for player, p_data in player_scores.items()})
 
     def get_player_scores(self):
-        # Get Player Stats
+        # Each player's score is their smoothed queue win rate, which the queue caches between games
         scores = {}
-        ranked_players = 0
-        rank_total = 0
-        wp_players = 0
-        wp_total = 0
-        # Get each player's "rank" and QWP
         for player in self.players:
-            player_stats = self.queue.get_player_summary(player)
-
-            rank = 1  # get_player_rank
-            if player_stats:
-                p_wins = player_stats['Wins']
-                p_losses = player_stats['GamesPlayed'] - p_wins
-                qwp = round(self._get_wp(p_wins, p_losses), 2)
-            else:
-                qwp = None
-
-            scores[player] = {"Rank": rank, "QWP": qwp}
-            if rank: 
-                ranked_players += 1
-                rank_total += rank 
-            if qwp:
-                wp_players += 1
-                wp_total += qwp
-        
-        rank_avg = rank_total/ranked_players if ranked_players else 1
-        
-        # Score Players, Avg
-        score_total = 0
-        for player, p_data in scores.items():
-            p_rank = p_data['Rank'] if ('Rank' in p_data and p_data['Rank']) else rank_avg
-            p_wp = p_data['QWP'] if ('QWP' in p_data and p_data['QWP']) else 0.5
-            score_adj = (p_wp * 2) - 1  # +/- 1
-            
-            score = p_rank + score_adj
-            p_data['Score'] = score
-            score_total += score
-        
-        # p_data['AvgPlayerScore'] = score_total/len(self.players)
-
-        return scores 
+            scores[player] = {"Score": self.queue.get_player_rating(player)}
+        return scores
 
     async def report_winner(self, winner):
         self.winner = winner
@@ -521,6 +493,31 @@ class Game:
         except:
             return None
     
+    def reaction_emojis(self):
+        """Returns the emojis on the info message that the current team selection method responds to."""
+        team_selection = self.teamSelection.lower()
+        if team_selection == Strings.VOTE_TS.lower():
+            react_hex_codes = SELECTION_MODES.keys()
+        elif team_selection == Strings.CAPTAINS_TS.lower():
+            react_hex_codes = getattr(self, 'react_player_picks', {}).keys()
+        elif team_selection == Strings.SELF_PICKING_TS.lower():
+            react_hex_codes = [Strings.ORANGE_REACT, Strings.BLUE_REACT]
+        elif team_selection == Strings.SHUFFLE_TS.lower():
+            return {Strings.SHUFFLE_REACT}
+        else:
+            return set()
+        return set(self._get_pick_reaction(react_hex) for react_hex in react_hex_codes)
+
+    def tracks_reaction(self, message_id: int, emoji: str):
+        info_message_id = self.info_message.id if self.info_message else self.saved_info_message_id
+        return info_message_id == message_id and emoji in self.reaction_emojis()
+
+    def _captains_pick(self):
+        """Returns the team whose captain picks next."""
+        pick_i = len(self.blue)+len(self.orange)-2
+        pick_order = ['blue', 'orange', 'orange', 'blue']
+        return pick_order[pick_i%len(pick_order)]
+
     def _get_pickable_players_str(self):
         players = ""
         for react_hex, player in self.react_player_picks.items():
@@ -549,7 +546,7 @@ class Game:
             embed.add_field(name="Help", value=Strings.more_sixmans_info_helper.format(helper=self.helper_role.mention), inline=False)
 
         embed.set_footer(text="Game ID: {}".format(self.id))
-        self.info_message = await self.textChannel.send(embed=embed)
+        self.info_message = await self._send(embed=embed)
 
     async def post_more_lobby_info(self, helper_role=None, invalid=False):
         if not helper_role:
@@ -601,7 +598,7 @@ class Game:
         #     player_scores_str += f"{player}: {player_scores.get(player)}: {new_player_stats}"
         
         # embed.description = player_scores_str
-        self.info_message = await self.textChannel.send(embed=embed)
+        self.info_message = await self._send(embed=embed)
 
     async def post_lobby_info(self):
         embed = discord.Embed(
@@ -614,7 +611,7 @@ class Game:
 
         embed.add_field(name="Lobby Info", value="```{} // {}```".format(self.roomName, self.roomPass), inline=False)
         embed.set_footer(text="Game ID: {}".format(self.id))
-        await self.textChannel.send(embed=embed)
+        await self._send(embed=embed)
 
     def _hex_i_from_emoji(self, emoji):
         return ord(emoji)
@@ -633,7 +630,7 @@ class Game:
             embed_dict = embed.to_dict()
             embed_dict['color'] = color.value
             embed = discord.Embed.from_dict(embed_dict)
-            await self.info_message.edit(embed=embed)
+            await self._edit_info_message(embed, PRIORITY_COSMETIC)
 
     def _get_vote_embed(self, vote: dict={}, winning_vote=None):
         # Count Votes, prep embed fields
@@ -782,10 +779,63 @@ class Game:
         for react_hex_i in react_hex_codes:
             if type(react_hex_i) == int:
                 react = struct.pack('<I', react_hex_i).decode('utf-32le')
-                await message.add_reaction(react)
+                await self._request(PRIORITY_REACTION, functools.partial(message.add_reaction, react))
             elif type(react_hex_i) == str:
                 react = struct.pack('<I', int(react_hex_i, base=16)).decode('utf-32le')
-                await message.add_reaction(react)
+                await self._request(PRIORITY_REACTION, functools.partial(message.add_reaction, react))
+
+    async def _request(self, priority, request, key=None):
+        """Runs a Discord API request through the scheduler, or right away if the game doesn't have one."""
+        if self.scheduler:
+            return await self.scheduler.submit(self.queue.guild, priority, request, key=key)
+        count_api_call()
+        return await request()
+
+    async def _send(self, content=None, embed=None):
+        return await self._request(PRIORITY_MESSAGE, functools.partial(self.textChannel.send, content, embed=embed))
+
+    async def _edit_info_message(self, embed, priority=PRIORITY_REACTION):
+        """Edits the info message. An edit that is still waiting to be sent is replaced by the newest one."""
+        message = self.info_message
+        await self._request(priority, functools.partial(message.edit, embed=embed), key=("edit", message.id))
+
+    async def _remove_reaction(self, emoji, member):
+        await self._request(PRIORITY_REACTION, functools.partial(self.info_message.remove_reaction, emoji, member))
+
+    def _render_info_message(self, get_embed):
+        """Edits the info message with the embed from `get_embed` after `EMBED_DEBOUNCE` seconds. Changes made before
+        then are shown by the same edit, since the embed is built from the game's state when the edit is made."""
+        self._render_embed = get_embed
+        if not self._render_task or self._render_task.done():
+            self._render_task = asyncio.create_task(self._render_after_debounce())
+
+    async def _render_after_debounce(self):
+        while self._render_embed:
+            await asyncio.sleep(EMBED_DEBOUNCE)
+            get_embed, self._render_embed = self._render_embed, None
+            self._rendering = True
+            try:
+                await self._edit_info_message(get_embed())
+            except discord.HTTPException:
+                pass    # The next change or state update edits the message again
+            except Exception:
+                log.exception("Failed to update the info message for game %s", self.id)
+            finally:
+                self._rendering = False
+
+    async def _show_info_message(self, embed):
+        """Edits the info message right away, replacing any debounced edit."""
+        await self._cancel_render()
+        await self._edit_info_message(embed)
+
+    async def _cancel_render(self):
+        self._render_embed = None
+        if self._render_task and not self._render_task.done():
+            if self._rendering:
+                await asyncio.shield(self._render_task)  # Let the edit that was already sent finish first
+            else:
+                self._render_task.cancel()
+        self._render_task = None
 
     def _get_wp(self, wins, losses):
         try:
@@ -821,6 +871,11 @@ class Game:
             red_scale = 255 - round(255*wp_adj)
             return discord.Color.from_rgb(red_scale, green_scale, blue_scale)
             
+    def age(self, now: datetime.datetime):
+        """Seconds since the game started. Games saved before start times were recorded fall back to their text channel's age."""
+        started_at = self.started_at if self.started_at else self.textChannel.created_at
+        return (now - started_at).total_seconds()
+
     def __contains__(self, item):
         return item in self.players or item in self.orange or item in self.blue
 
@@ -845,8 +900,14 @@ class Game:
             "State": self.state,
             "Prefix": self.prefix
         }
+        if self.started_at:
+            game_dict["StartedAt"] = self.started_at.replace(tzinfo=datetime.timezone.utc).timestamp()
+        if self.votes:
+            game_dict["Votes"] = {str(player.id): vote for player, vote in self.votes.items()}
         if self.info_message:
             game_dict["InfoMessage"] = self.info_message.id
+        elif self.saved_info_message_id:
+            game_dict["InfoMessage"] = self.saved_info_message_id
         if self.textChannel:
             game_dict["TextChannel"] = self.textChannel.id
         if self.helper_role:
@@ -0,0 +1,56 @@
+from bisect import bisect_left, insort
+
+from .strings import Strings
+
+# Stats compared (in order) when ranking players by each leaderboard stat
+RANK_ORDERS = {
+    Strings.PLAYER_POINTS_KEY: (Strings.PLAYER_POINTS_KEY, Strings.PLAYER_WINS_KEY),
+    Strings.PLAYER_WINS_KEY: (Strings.PLAYER_WINS_KEY, Strings.PLAYER_POINTS_KEY),
+    Strings.PLAYER_GP_KEY: (Strings.PLAYER_GP_KEY, Strings.PLAYER_POINTS_KEY, Strings.PLAYER_WINS_KEY)
+}
+
+class Leaderboard:
+    """Keeps player stats sorted by points, wins and games played.
+
+    Each ranking is a sorted list of `(-stat, ..., player_id)` keys, so finding a player's
+    rank is a binary search and an update only moves that player's key."""
+
+    def __init__(self, players: dict = None):
+        self.players = {}
+        self._keys = {stat: {} for stat in RANK_ORDERS}
+        self._rankings = {stat: [] for stat in RANK_ORDERS}
+        for player_id, stats in (players or {}).items():
+            self.update(player_id, stats)
+
+    def update(self, player_id, stats: dict):
+        """Adds the player or moves them to the position matching their new stats."""
+        player_id = str(player_id)
+        self.players[player_id] = dict(stats)
+        for stat, order in RANK_ORDERS.items():
+            ranking = self._rankings[stat]
+            old_key = self._keys[stat].get(player_id)
+            if old_key is not None:
+                del ranking[bisect_left(ranking, old_key)]
+            new_key = tuple(-stats.get(key, 0) for key in order) + (player_id,)
+            self._keys[stat][player_id] = new_key
+            insort(ranking, new_key)
+
+    def rank(self, player_id, stat=Strings.PLAYER_POINTS_KEY):
+        """Returns the player's 1-based rank for the stat, or None if they have no stats."""
+        key = self._keys[stat].get(str(player_id))
+        if key is None:
+            return None
+        return bisect_left(self._rankings[stat], key) + 1
+
+    def get(self, player_id):
+        return self.players.get(str(player_id))
+
+    def top(self, count, stat=Strings.PLAYER_POINTS_KEY):
+        return [(key[-1], self.players[key[-1]]) for key in self._rankings[stat][:count]]
+
+    def __iter__(self):
+        for key in self._rankings[Strings.PLAYER_POINTS_KEY]:
+            yield key[-1], self.players[key[-1]]
+
+    def __len__(self):
+        return len(self.players)
@@ -0,0 +1,139 @@
+import asyncio
+from typing import List
+
+import discord
+from redbot.core import Config
+
+from .metrics import count_api_call
+
+POOLED_TEXT_NAME = "pooled-lobby"
+POOLED_VOICE_NAME = "Pooled Lobby"
+
+class LobbyPool:
+    """Pre-created, hidden sets of game channels for each six mans category.
+
+    A lobby set is `[text_channel, blue_vc, orange_vc, general_vc]`. Popped queues claim a set and
+    only need to rename it and grant the players access, and finished games hand their channels back
+    instead of deleting them. Pools are saved under the guild's `LobbyPool` group by category id."""
+
+    def __init__(self, config: Config):
+        self.config = config
+        self.pools = {}
+        self.sizes = {}
+        self._save_lock = asyncio.Lock()
+
+    async def load(self, guild: discord.Guild, guild_data=None):
+        if not guild_data:
+            guild_data = await self.config.guild(guild).all()
+        self.sizes[guild] = (guild_data["LobbyPoolMin"], guild_data["LobbyPoolMax"])
+        saved_pools = guild_data["LobbyPool"]
+        for category_id, lobbies in saved_pools.items():
+            pool = self.pools.setdefault(int(category_id), [])
+            for channel_ids in lobbies:
+                lobby = [guild.get_channel(channel_id) for channel_id in channel_ids]
+                if all(lobby):
+                    pool.append(lobby)
+        await self._save(guild)
+
+    async def set_sizes(self, guild: discord.Guild, min_size: int, max_size: int):
+        self.sizes[guild] = (min_size, max_size)
+        await self.config.guild(guild).LobbyPoolMin.set(min_size)
+        await self.config.guild(guild).LobbyPoolMax.set(max_size)
+
+    async def claim(self, guild: discord.Guild, category: discord.CategoryChannel):
+        """Takes an idle lobby set for the category if one is available."""
+        pool = self.pools.get(category.id, []) if category else []
+        while pool:
+            lobby = pool.pop()
+            if all(guild.get_channel(channel.id) for channel in lobby):
+                await self._save(guild)
+                return lobby
+        return None
+
+    async def discard(self, channel: discord.abc.GuildChannel):
+        """Drops any pooled lobby set that contains a deleted channel."""
+        pool = self.pools.get(channel.category_id, [])
+        lobbies = [lobby for lobby in pool if channel in lobby]
+        for lobby in lobbies:
+            pool.remove(lobby)
+        if lobbies:
+            await self._save(channel.guild)
+
+    async def release(self, guild: discord.Guild, category: discord.CategoryChannel, lobby: List[discord.abc.GuildChannel]):
+        """Hides a finished game's channels and returns them to the pool. Returns False if the caller should delete them instead."""
+        min_size, max_size = self.sizes.get(guild, (0, 0))
+        pool = self.pools.setdefault(category.id, []) if category else None
+        if pool is None or len(pool) >= max_size:
+            return False
+        text_channel, blue_vc, orange_vc, general_vc = lobby
+        if any(vc.members for vc in [blue_vc, orange_vc, general_vc]):
+            return False
+
+        try:
+            count_api_call(1 + len(lobby))  # Purge, then an edit per channel
+            await text_channel.purge(limit=None)
+            await self._hide(guild, category, lobby)
+        except discord.HTTPException:
+            return False
+        pool.append(lobby)
+        await self._save(guild)
+        return True
+
+    async def refill(self, guild: discord.Guild, category: discord.CategoryChannel):
+        """Creates hidden lobby sets until the category's pool reaches the guild's minimum size,
+        and deletes sets above its maximum size after the sizes are lowered."""
+        min_size, max_size = self.sizes.get(guild, (0, 0))
+        pool = self.pools.setdefault(category.id, [])
+        changed = False
+        try:
+            while len(pool) > max_size:
+                await self._delete(pool.pop())
+                changed = True
+            while len(pool) < min_size:
+                text_overwrites, voice_overwrites = self._hidden_overwrites(guild, category)
+                results = await asyncio.gather(
+                    category.create_text_channel(POOLED_TEXT_NAME, overwrites=text_overwrites),
+                    category.create_voice_channel(POOLED_VOICE_NAME, overwrites=voice_overwrites),
+                    category.create_voice_channel(POOLED_VOICE_NAME, overwrites=voice_overwrites),
+                    category.create_voice_channel(POOLED_VOICE_NAME, overwrites=voice_overwrites),
+                    return_exceptions=True
+                )
+                errors = [result for result in results if isinstance(result, BaseException)]
+                if errors:
+                    # Don't leave the channels of an incomplete set behind
+                    await self._delete([result for result in results if not isinstance(result, BaseException)])
+                    raise errors[0]
+                pool.append(list(results))
+                changed = True
+        finally:
+            if changed:
+                await self._save(guild)
+
+    async def _delete(self, lobby: List[discord.abc.GuildChannel]):
+        await asyncio.gather(*[channel.delete() for channel in lobby], return_exceptions=True)
+
+    async def _hide(self, guild: discord.Guild, category: discord.CategoryChannel, lobby):
+        text_overwrites, voice_overwrites = self._hidden_overwrites(guild, category)
+        text_channel, blue_vc, orange_vc, general_vc = lobby
+        await asyncio.gather(
+            text_channel.edit(name=POOLED_TEXT_NAME, overwrites=text_overwrites),
+            blue_vc.edit(name=POOLED_VOICE_NAME, overwrites=voice_overwrites),
+            orange_vc.edit(name=POOLED_VOICE_NAME, overwrites=voice_overwrites),
+            general_vc.edit(name=POOLED_VOICE_NAME, overwrites=voice_overwrites)
+        )
+
+    def _hidden_overwrites(self, guild: discord.Guild, category: discord.CategoryChannel):
+        text_overwrites = dict(category.overwrites)
+        text_overwrites[guild.default_role] = discord.PermissionOverwrite(view_channel=False, read_messages=False)
+        voice_overwrites = dict(category.overwrites)
+        voice_overwrites[guild.default_role] = discord.PermissionOverwrite(view_channel=False, connect=False)
+        return text_overwrites, voice_overwrites
+
+    async def _save(self, guild: discord.Guild):
+        # Saves are serialized so an older snapshot of the pools is never written after a newer one
+        async with self._save_lock:
+            saved_pools = {}
+            for category in guild.categories:
+                if self.pools.get(category.id):
+                    saved_pools[str(category.id)] = [[channel.id for channel in lobby] for lobby in self.pools[category.id]]
+            await self.config.guild(guild).LobbyPool.set(saved_pools)
@@ -0,0 +1,98 @@
+import collections
+import contextlib
+import contextvars
+import functools
+import json
+import math
+import time
+
+import discord
+
+MAX_SAMPLES = 1000  # Samples kept per stage per guild
+PERCENTILES = (50, 95, 99)
+
+_active_counters = contextvars.ContextVar("sixmans_api_counters", default=())
+
+class PipelineMetrics:
+    """Per-guild latency and Discord API call samples for the stages of the queue pop pipeline.
+
+    Each stage keeps a rolling window of its most recent `MAX_SAMPLES` runs as
+    `(timestamp, duration in ms, api calls)`. API calls are counted where the cog makes them (see
+    `count_api_call`), and a call made inside nested stages counts towards each of them."""
+
+    def __init__(self, max_samples=MAX_SAMPLES):
+        self.max_samples = max_samples
+        self.samples = {}   # Guild id -> {stage: deque of samples}
+
+    @contextlib.contextmanager
+    def stage(self, guild: discord.Guild, stage: str):
+        counter = [0]
+        token = _active_counters.set(_active_counters.get() + (counter,))
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            duration = (time.perf_counter() - start) * 1000
+            _active_counters.reset(token)
+            self.record(guild, stage, duration, counter[0])
+
+    def record(self, guild: discord.Guild, stage: str, duration: float, api_calls: int):
+        stages = self.samples.setdefault(guild.id, {})
+        if stage not in stages:
+            stages[stage] = collections.deque(maxlen=self.max_samples)
+        stages[stage].append((int(time.time()), round(duration, 3), api_calls))
+
+    def summary(self, guild: discord.Guild):
+        """Returns `{stage: {"Count": n, "p50": ms, "p95": ms, "p99": ms, "API Calls": mean}}` for the guild."""
+        summary = {}
+        for stage, samples in self.samples.get(guild.id, {}).items():
+            durations = sorted(sample[1] for sample in samples)
+            stats = {"Count": len(durations)}
+            for percentile in PERCENTILES:
+                stats["p{}".format(percentile)] = self._percentile(durations, percentile)
+            stats["API Calls"] = sum(sample[2] for sample in samples) / len(samples)
+            summary[stage] = stats
+        return summary
+
+    def to_json_lines(self, guild: discord.Guild):
+        records = []
+        for stage, samples in self.samples.get(guild.id, {}).items():
+            for timestamp, duration, api_calls in samples:
+                records.append({
+                    "Guild": guild.id,
+                    "Stage": stage,
+                    "Timestamp": timestamp,
+                    "Duration": duration,
+                    "APICalls": api_calls
+                })
+        records.sort(key=lambda record: record["Timestamp"])
+        return "\n".join(json.dumps(record) for record in records)
+
+    def clear(self, guild: discord.Guild):
+        self.samples.pop(guild.id, None)
+
+    def _percentile(self, sorted_values, percentile):
+        # Nearest-rank percentile
+        if not sorted_values:
+            return None
+        rank = max(1, math.ceil(percentile / 100 * len(sorted_values)))
+        return sorted_values[rank - 1]
+
+
+def count_api_call(calls=1):
+    """Counts Discord API calls about to be made towards every stage that is running."""
+    for counter in _active_counters.get():
+        counter[0] += calls
+
+
+def timed_stage(stage: str):
+    """Records each call of the decorated cog method as a run of `stage`.
+    The method's first argument is the guild, or a context for it."""
+    def decorator(method):
+        @functools.wraps(method)
+        async def wrapper(cog, guild_or_ctx, *args, **kwargs):
+            guild = getattr(guild_or_ctx, "guild", guild_or_ctx)
+            with cog.metrics.stage(guild, stage):
+                return await method(cog, guild_or_ctx, *args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,108 @@
+import asyncio
+
+import discord
+from redbot.core import Config
+
+FLUSH_INTERVAL = 5  # How often pending game and queue changes are written to Config (seconds)
+STOP_FLUSH_TASK = "sixMans-stop-flush"  # Name of the final flush task started when an instance is stopped
+
+class WriteBehind:
+    """Buffers changes to six mans games and queues and writes them to Config in the background.
+
+    Games and queues are marked as changed or removed while commands run, and each flush only writes
+    those entries under the guild's `Games` and `Queues` groups. Queues can be marked with the keys of
+    `SixMansQueue._to_dict` that changed so unchanged data such as the players' stats is not rewritten."""
+
+    def __init__(self, config: Config, interval=FLUSH_INTERVAL):
+        self.config = config
+        self.interval = interval
+        self._games = {}    # Guild -> {game id: game, or None if removed}
+        self._queues = {}   # Guild -> {queue id: [queue or None if removed, changed keys or None for all keys]}
+        self._lock = asyncio.Lock()
+        self._task = asyncio.create_task(self._run())
+
+    def game_changed(self, guild: discord.Guild, game):
+        self._games.setdefault(guild, {})[game.id] = game
+
+    def game_removed(self, guild: discord.Guild, game):
+        self._games.setdefault(guild, {})[game.id] = None
+
+    def queue_changed(self, guild: discord.Guild, six_mans_queue, *keys):
+        pending = self._queues.setdefault(guild, {}).get(six_mans_queue.id)
+        if pending is None or pending[0] is None:
+            self._queues[guild][six_mans_queue.id] = [six_mans_queue, set(keys) if keys else None]
+        elif pending[1] is not None:
+            pending[1] = pending[1].union(keys) if keys else None
+
+    def queue_removed(self, guild: discord.Guild, six_mans_queue):
+        self._queues.setdefault(guild, {})[six_mans_queue.id] = [None, None]
+
+    def discard(self, guild: discord.Guild):
+        """Drops pending changes for the guild, used when its data is being replaced."""
+        self._games.pop(guild, None)
+        self._queues.pop(guild, None)
+
+    def stop(self):
+        """Stops flushing in the background and starts a final flush. The final flush is found by its task name
+        so an instance created after a cog reload can wait for it with `wait_for_stopped`."""
+        self._task.cancel()
+        return asyncio.create_task(self.flush(), name=STOP_FLUSH_TASK)
+
+    @staticmethod
+    async def wait_for_stopped():
+        """Waits for the final flushes of stopped instances, so Config is not read before their changes are written."""
+        stop_flushes = [task for task in asyncio.all_tasks() if task.get_name() == STOP_FLUSH_TASK]
+        if stop_flushes:
+            await asyncio.gather(*stop_flushes, return_exceptions=True)
+
+    async def flush(self):
+        async with self._lock:
+            games, self._games = self._games, {}
+            queues, self._queues = self._queues, {}
+            for guild, changed_games in games.items():
+                for game_id, game in changed_games.items():
+                    try:
+                        await self._write_game(guild, game_id, game)
+                    except Exception:
+                        # Keep the change for the next flush unless a newer one is already pending
+                        self._games.setdefault(guild, {}).setdefault(game_id, game)
+
+            for guild, changed_queues in queues.items():
+                for queue_id, (six_mans_queue, keys) in changed_queues.items():
+                    try:
+                        await self._write_queue(guild, queue_id, six_mans_queue, keys)
+                    except Exception:
+                        if six_mans_queue is None:
+                            self._queues.setdefault(guild, {}).setdefault(queue_id, [None, None])
+                        else:
+                            self.queue_changed(guild, six_mans_queue, *(keys or []))
+
+    async def _write_game(self, guild: discord.Guild, game_id, game):
+        group = self.config.guild(guild).Games
+        if game:
+            await group.set_raw(str(game_id), value=game._to_dict())
+        else:
+            await group.clear_raw(str(game_id))
+
+    async def _write_queue(self, guild: discord.Guild, queue_id, six_mans_queue, keys):
+        group = self.config.guild(guild).Queues
+        if six_mans_queue is None:
+            await group.clear_raw(str(queue_id))
+            return
+        q_data = six_mans_queue._to_dict()
+        if keys is None:
+            await group.set_raw(str(queue_id), value=q_data)
+            return
+        for key in keys:
+            if key in q_data:
+                await group.set_raw(str(queue_id), key, value=q_data[key])
+            else:
+                await group.clear_raw(str(queue_id), key)
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.flush()
+            except Exception:
+                pass
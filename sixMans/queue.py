@@ -1,13 +1,17 @@
 import collections
-import datetime
+import time
 import uuid
 import struct
 from queue import Queue
 from typing import List
+from .leaderboard import Leaderboard
+from .metrics import count_api_call
 from .strings import Strings
 
 import discord
 
+RATING_PRIOR_GAMES = 10     # Player ratings are smoothed towards a 50% win rate over this many games
+
 SELECTION_MODES = {
     0x1F3B2: Strings.RANDOM_TS,         # game_die
     0x1F1E8: Strings.CAPTAINS_TS,       # C
@@ -26,17 +30,18 @@ class SixMansQueue:
         self.channels = channels
         self.points = points
         self.players = players
+        self.leaderboard = Leaderboard(players)
+        self.ratings = {}
         self.gamesPlayed = gamesPlayed
         self.maxSize = maxSize
         self.teamSelection = teamSelection
         self.category = category
         self.lobby_vc = lobby_vc
-        self.activeJoinLog = {}
-        # TODO: active join log could maintain queue during downtime
+        self.activeJoinLog = {}     # Player id -> time they joined the queue (epoch seconds), saved so the queue survives downtime
 
-    def _put(self, player):
+    def _put(self, player, joined_at=None):
         self.queue.put(player)
-        # self.activeJoinLog[player.id] = datetime.datetime.now()
+        self.activeJoinLog[player.id] = int(joined_at if joined_at else time.time())
 
     def _get(self):
         player = self.queue.get()
@@ -52,6 +57,22 @@ class SixMansQueue:
         except:
             return None
 
+    def get_player_rating(self, player: discord.User):
+        """Returns the player's queue win rate smoothed towards 50% (new players start at 0.5).
+        Ratings are cached until the player's stats change."""
+        player_id = str(player.id)
+        rating = self.ratings.get(player_id)
+        if rating is None:
+            player_stats = self.players.get(player_id, {})
+            wins = player_stats.get(Strings.PLAYER_WINS_KEY, 0)
+            games_played = player_stats.get(Strings.PLAYER_GP_KEY, 0)
+            rating = (wins + RATING_PRIOR_GAMES/2) / (games_played + RATING_PRIOR_GAMES)
+            self.ratings[player_id] = rating
+        return rating
+
+    def invalidate_player_rating(self, player_id):
+        self.ratings.pop(str(player_id), None)
+
     def _remove(self, player):
         self.queue._remove(player)
         try:
@@ -65,6 +86,7 @@ class SixMansQueue:
     async def send_message(self, message='', embed=None):
         messages = []
         for channel in self.channels:
+            count_api_call()
             messages.append(await channel.send(message, embed=embed))
         return messages
 
@@ -98,7 +120,8 @@ class SixMansQueue:
             "Players": self.players,
             "GamesPlayed": self.gamesPlayed,
             "TeamSelection": self.teamSelection,
-            "MaxSize": self.maxSize
+            "MaxSize": self.maxSize,
+            "ActiveJoinLog": self._join_log_dict()
         }
         if self.category:
             q_data['Category'] = self.category.id
@@ -107,6 +130,9 @@ class SixMansQueue:
         
         return q_data
 
+    def _join_log_dict(self):
+        return {str(player_id): joined_at for player_id, joined_at in self.activeJoinLog.items()}
+
 class PlayerQueue(Queue):
     def _init(self, maxsize):
         self.queue = OrderedSet()
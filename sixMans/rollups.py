@@ -0,0 +1,108 @@
+import datetime
+
+import discord
+from redbot.core import Config
+
+from .scores import ScoreJournal
+from .strings import Strings
+
+BUCKET_SECONDS = 3600                  # Scores are aggregated into hourly buckets
+RETENTION = datetime.timedelta(days=31) # Longest leaderboard window is 30 days
+
+class ScoreRollups:
+    """Hourly aggregates of points, wins and games played per queue and player.
+
+    Buckets are kept under the guild's `ScoreRollups` group as
+    `{"<epoch hour>": {"<queue_id>": {"Games": 1, "Players": {"<player_id>": {...}}}}}`
+    so time windowed leaderboards merge a handful of buckets instead of re-reading every score."""
+
+    def __init__(self, config: Config):
+        self.config = config
+        self.buckets = {}
+
+    def is_loaded(self, guild: discord.Guild):
+        return guild in self.buckets
+
+    async def load(self, guild: discord.Guild, journal: ScoreJournal, guild_data=None):
+        """Loads recent buckets for the guild, building them from the score journal the first time.
+
+        `guild_data` may be the guild's already loaded Config data to avoid reading it again."""
+        built = guild_data["ScoreRollupsBuilt"] if guild_data else await self.config.guild(guild).ScoreRollupsBuilt()
+        if not built:
+            self.buckets[guild] = {}
+            since = datetime.datetime.now() - RETENTION
+            games = {}
+            since_timestamp = since.timestamp()
+            for score in await journal.scores(guild, since=since):
+                if score["Timestamp"] > since_timestamp:
+                    games.setdefault(score["Game"], []).append(score)
+            for game_scores in games.values():
+                self._add_game(guild, game_scores)
+            await self.config.guild(guild).ScoreRollups.set(self.buckets[guild])
+            await self.config.guild(guild).ScoreRollupsBuilt.set(True)
+            return
+
+        buckets = guild_data["ScoreRollups"] if guild_data else await self.config.guild(guild).ScoreRollups()
+        if self._expire(buckets):
+            await self.config.guild(guild).ScoreRollups.set(buckets)
+        self.buckets[guild] = buckets
+
+    async def add(self, guild: discord.Guild, scores):
+        """Adds the scores for a finished game to the guild's buckets, and drops buckets that have expired since."""
+        if not self.is_loaded(guild):
+            return
+        for hour, queue_id in self._add_game(guild, scores):
+            queue_bucket = self.buckets[guild][hour][queue_id]
+            await self.config.guild(guild).ScoreRollups.set_raw(hour, queue_id, value=queue_bucket)
+        for hour in self._expire(self.buckets[guild]):
+            await self.config.guild(guild).ScoreRollups.clear_raw(hour)
+
+    def players(self, guild: discord.Guild, since: datetime.datetime, queue_id=None):
+        """Merges all buckets since the given time into a players dict and a games played count."""
+        players = {}
+        games_played = 0
+        oldest = self._bucket(since.timestamp())
+        for hour, queues in self.buckets.get(guild, {}).items():
+            if int(hour) < oldest:
+                continue
+            for bucket_queue_id, queue_bucket in queues.items():
+                if queue_id is not None and bucket_queue_id != str(queue_id):
+                    continue
+                games_played += queue_bucket["Games"]
+                for player_id, stats in queue_bucket["Players"].items():
+                    player_dict = players.setdefault(player_id, {})
+                    for key in [Strings.PLAYER_POINTS_KEY, Strings.PLAYER_GP_KEY, Strings.PLAYER_WINS_KEY]:
+                        player_dict[key] = player_dict.get(key, 0) + stats[key]
+        return players, games_played
+
+    async def clear(self, guild: discord.Guild):
+        self.buckets[guild] = {}
+        await self.config.guild(guild).ScoreRollups.set({})
+
+    def _add_game(self, guild: discord.Guild, game_scores):
+        """Adds all player scores from a single game, returning the (hour, queue) buckets that changed."""
+        changed = set()
+        for score in game_scores:
+            hour = str(self._bucket(score["Timestamp"]))
+            queue_id = str(score["Queue"])
+            queue_bucket = self.buckets[guild].setdefault(hour, {}).setdefault(queue_id, {"Games": 0, "Players": {}})
+            if (hour, queue_id) not in changed:
+                queue_bucket["Games"] += 1
+                changed.add((hour, queue_id))
+
+            player_dict = queue_bucket["Players"].setdefault(str(score["Player"]), {})
+            player_dict[Strings.PLAYER_POINTS_KEY] = player_dict.get(Strings.PLAYER_POINTS_KEY, 0) + score["Points"]
+            player_dict[Strings.PLAYER_GP_KEY] = player_dict.get(Strings.PLAYER_GP_KEY, 0) + 1
+            player_dict[Strings.PLAYER_WINS_KEY] = player_dict.get(Strings.PLAYER_WINS_KEY, 0) + score["Win"]
+        return changed
+
+    def _expire(self, buckets):
+        """Removes buckets older than `RETENTION`, returning their hours."""
+        oldest = self._bucket((datetime.datetime.now() - RETENTION).timestamp())
+        expired = [hour for hour in buckets if int(hour) < oldest]
+        for hour in expired:
+            del buckets[hour]
+        return expired
+
+    def _bucket(self, timestamp):
+        return int(timestamp) // BUCKET_SECONDS
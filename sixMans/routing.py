@@ -0,0 +1,118 @@
+import discord
+
+class SixMansIndex:
+    """Lookup tables that route channels, names and players to their six mans queue or game.
+
+    Queue entries are keyed by the channel ids and name they were indexed under, so a queue that is
+    edited only needs to be re-indexed. Player tables are kept per guild id."""
+
+    def __init__(self):
+        self.queues_by_channel = {}     # Queue text channel id -> queue
+        self.queues_by_name = {}        # Guild id -> {queue name: queue}
+        self.queues_by_id = {}          # Queue id -> queue
+        self.games_by_channel = {}      # Game text channel id -> game
+        self.games_by_player = {}       # Guild id -> {player id: game}
+        self.player_queues = {}         # Guild id -> {player id: set of queues}
+        self._queue_keys = {}           # Queue -> (channel ids, name) it was indexed under
+
+    def clear(self):
+        self.__init__()
+
+    def clear_guild(self, guild: discord.Guild):
+        """Drops the guild's queues, games and players, used before the guild's data is loaded again."""
+        for six_mans_queue in [q for q in self._queue_keys if q.guild.id == guild.id]:
+            self.remove_queue(six_mans_queue)
+        self.queues_by_name.pop(guild.id, None)
+        self.games_by_channel = {channel_id: game for channel_id, game in self.games_by_channel.items()
+            if game.textChannel.guild.id != guild.id}
+        self.games_by_player.pop(guild.id, None)
+        self.player_queues.pop(guild.id, None)
+
+    #region queues
+    def add_queue(self, six_mans_queue):
+        channel_ids = [channel.id for channel in six_mans_queue.channels if channel]
+        for channel_id in channel_ids:
+            self.queues_by_channel[channel_id] = six_mans_queue
+        self.queues_by_name.setdefault(six_mans_queue.guild.id, {})[six_mans_queue.name] = six_mans_queue
+        self.queues_by_id[six_mans_queue.id] = six_mans_queue
+        self._queue_keys[six_mans_queue] = (channel_ids, six_mans_queue.name)
+
+    def remove_queue(self, six_mans_queue):
+        channel_ids, name = self._queue_keys.pop(six_mans_queue, ([], None))
+        for channel_id in channel_ids:
+            if self.queues_by_channel.get(channel_id) is six_mans_queue:
+                del self.queues_by_channel[channel_id]
+        names = self.queues_by_name.get(six_mans_queue.guild.id, {})
+        if names.get(name) is six_mans_queue:
+            del names[name]
+        if self.queues_by_id.get(six_mans_queue.id) is six_mans_queue:
+            del self.queues_by_id[six_mans_queue.id]
+        for queues in self.player_queues.get(six_mans_queue.guild.id, {}).values():
+            queues.discard(six_mans_queue)
+
+    def reindex_queue(self, six_mans_queue):
+        """Updates the channel and name entries after a queue's channels or name have changed."""
+        player_queues = self.player_queues.get(six_mans_queue.guild.id, {})
+        queued = [player_id for player_id, queues in player_queues.items() if six_mans_queue in queues]
+        self.remove_queue(six_mans_queue)
+        self.add_queue(six_mans_queue)
+        for player_id in queued:
+            player_queues[player_id].add(six_mans_queue)
+
+    def get_queue(self, channel: discord.abc.GuildChannel):
+        return self.queues_by_channel.get(channel.id)
+
+    def get_queue_by_name(self, guild: discord.Guild, queue_name):
+        return self.queues_by_name.get(guild.id, {}).get(queue_name)
+    #endregion
+
+    #region players
+    def add_queued_player(self, player: discord.Member, six_mans_queue):
+        self.player_queues.setdefault(six_mans_queue.guild.id, {}).setdefault(player.id, set()).add(six_mans_queue)
+
+    def remove_queued_player(self, player: discord.Member, six_mans_queue):
+        player_queues = self.player_queues.get(six_mans_queue.guild.id, {})
+        queues = player_queues.get(player.id)
+        if queues is not None:
+            queues.discard(six_mans_queue)
+            if not queues:
+                del player_queues[player.id]
+
+    def get_player_queues(self, player: discord.Member):
+        return list(self.player_queues.get(player.guild.id, {}).get(player.id, []))
+    #endregion
+
+    #region games
+    def add_game(self, guild: discord.Guild, game):
+        if game.textChannel:
+            self.games_by_channel[game.textChannel.id] = game
+        guild_games = self.games_by_player.setdefault(guild.id, {})
+        for player in self._game_players(game):
+            if player:
+                guild_games[player.id] = game
+
+    def remove_game(self, guild: discord.Guild, game):
+        if game.textChannel and self.games_by_channel.get(game.textChannel.id) is game:
+            del self.games_by_channel[game.textChannel.id]
+        guild_games = self.games_by_player.get(guild.id, {})
+        for player in self._game_players(game):
+            if player and guild_games.get(player.id) is game:
+                del guild_games[player.id]
+
+    def _game_players(self, game):
+        # Players move from `players` to `blue`/`orange` as they are picked during team selection
+        return game.players | game.blue | game.orange
+
+    def get_game(self, channel: discord.abc.GuildChannel):
+        return self.games_by_channel.get(channel.id)
+
+    def get_player_game(self, player: discord.Member):
+        return self.games_by_player.get(player.guild.id, {}).get(player.id)
+
+    def get_reaction_game(self, payload: discord.RawReactionActionEvent):
+        """Returns the game whose info message the reaction was made on, if the game responds to that emoji."""
+        game = self.games_by_channel.get(payload.channel_id)
+        if game and game.tracks_reaction(payload.message_id, payload.emoji.name):
+            return game
+        return None
+    #endregion
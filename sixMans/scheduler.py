@@ -0,0 +1,135 @@
+import asyncio
+import itertools
+
+import discord
+
+from .metrics import count_api_call
+
+# Request priorities, lower values run first
+PRIORITY_MESSAGE = 0    # Messages players are waiting on
+PRIORITY_CHANNEL = 1    # Creating game channels and updating their permissions
+PRIORITY_REACTION = 2   # Reactions and edits to team selection messages
+PRIORITY_COSMETIC = 3   # Edits that only change how a message looks (e.g. recoloring an embed)
+
+GUILD_CONCURRENCY = 3   # Requests in flight per guild
+MAX_PENDING = 25        # Requests waiting per guild before new callers are held back
+MAX_RETRIES = 3         # Retries for a request that was still rate limited after discord.py's own retries
+RETRY_BACKOFF = 1       # Seconds to pause a guild's requests after a rate limit, doubled on each retry
+
+class _Request:
+    __slots__ = ("request", "key", "future", "started", "attempts")
+
+    def __init__(self, request, key):
+        self.request = request
+        self.key = key
+        self.future = asyncio.get_event_loop().create_future()
+        self.started = False
+        self.attempts = 0
+
+
+class _GuildRequests:
+    def __init__(self, max_pending):
+        self.queue = asyncio.PriorityQueue()
+        self.pending = {}       # Coalescing key -> request that hasn't started yet
+        self.slots = asyncio.Semaphore(max_pending)
+        self.workers = []
+
+
+class APIScheduler:
+    """Runs the Discord API requests made for six mans games through a priority queue per guild.
+
+    Each guild has `GUILD_CONCURRENCY` requests in flight at most, so a burst of queue pops waits here,
+    where messages players are waiting on can jump ahead of cosmetic edits, rather than piling up on
+    discord.py's route locks. Requests submitted with a key that is already waiting replace the waiting
+    request instead of adding another one (e.g. repeated edits to a game's info message), and callers
+    wait for a slot once `MAX_PENDING` requests are waiting for their guild."""
+
+    def __init__(self, concurrency=GUILD_CONCURRENCY, max_pending=MAX_PENDING):
+        self.concurrency = concurrency
+        self.max_pending = max_pending
+        self._guilds = {}   # Guild id -> _GuildRequests
+        self._order = itertools.count()
+
+    async def submit(self, guild: discord.Guild, priority, request, key=None):
+        """Schedules `request`, a callable returning the API coroutine, and returns its result.
+
+        If a request with the same `key` hasn't started yet, it is replaced by this one and both callers get
+        the result of the newest request."""
+        requests = self._guild_requests(guild)
+        scheduled = requests.pending.get(key) if key is not None else None
+        if scheduled:
+            scheduled.request = request
+            requests.queue.put_nowait((priority, next(self._order), scheduled))  # Runs at the most urgent priority it was given
+            return await asyncio.shield(scheduled.future)
+
+        await requests.slots.acquire()
+        count_api_call()
+        scheduled = _Request(request, key)
+        if key is not None:
+            requests.pending[key] = scheduled
+        requests.queue.put_nowait((priority, next(self._order), scheduled))
+        return await asyncio.shield(scheduled.future)
+
+    def discard(self, guild: discord.Guild):
+        requests = self._guilds.pop(guild.id, None)
+        if requests:
+            self._stop(requests)
+
+    def stop(self):
+        for requests in self._guilds.values():
+            self._stop(requests)
+        self._guilds = {}
+
+    def _stop(self, requests: _GuildRequests):
+        for worker in requests.workers:
+            worker.cancel()
+        while not requests.queue.empty():
+            scheduled = requests.queue.get_nowait()[2]
+            if not scheduled.future.done():
+                scheduled.future.cancel()
+
+    def _guild_requests(self, guild: discord.Guild):
+        requests = self._guilds.get(guild.id)
+        if not requests:
+            requests = _GuildRequests(self.max_pending)
+            requests.workers = [asyncio.create_task(self._run(requests)) for _ in range(self.concurrency)]
+            self._guilds[guild.id] = requests
+        return requests
+
+    async def _run(self, requests: _GuildRequests):
+        while True:
+            priority, order, scheduled = await requests.queue.get()
+            if scheduled.started:
+                continue    # Already run from a more urgent entry
+            scheduled.started = True
+            if requests.pending.get(scheduled.key) is scheduled:
+                del requests.pending[scheduled.key]
+
+            try:
+                result = await scheduled.request()
+            except discord.HTTPException as e:
+                if e.status == 429 and scheduled.attempts < MAX_RETRIES:
+                    # Hold this worker back so the guild's other requests slow down too
+                    await asyncio.sleep(RETRY_BACKOFF * 2 ** scheduled.attempts)
+                    scheduled.attempts += 1
+                    scheduled.started = False
+                    requests.queue.put_nowait((priority, order, scheduled))
+                    continue
+                self._finish(requests, scheduled, exception=e)
+            except asyncio.CancelledError:
+                requests.slots.release()
+                scheduled.future.cancel()
+                raise
+            except Exception as e:
+                self._finish(requests, scheduled, exception=e)
+            else:
+                self._finish(requests, scheduled, result=result)
+
+    def _finish(self, requests: _GuildRequests, scheduled: _Request, result=None, exception=None):
+        requests.slots.release()
+        if scheduled.future.done():
+            return
+        if exception:
+            scheduled.future.set_exception(exception)
+        else:
+            scheduled.future.set_result(result)
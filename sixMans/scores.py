@@ -0,0 +1,110 @@
+import datetime
+
+import discord
+from redbot.core import Config
+
+DATE_TIME_FORMAT = "%d-%b-%Y (%H:%M:%S.%f)"  # Legacy score date format
+SEGMENT_FORMAT = "%Y-%m"
+SCORE_SCHEMA = 2                             # 1: "DateTime" strings, 2: integer "Timestamp" epochs
+
+# Compact row layout used for journal entries
+SCORE_ROW_KEYS = ("Game", "Queue", "Player", "Win", "Points", "Timestamp")
+
+class ScoreJournal:
+    """Append-only store for six mans player scores.
+
+    Scores are split into monthly segments and keyed by game inside each segment:
+    `{"2021-03": {"<game_id>": [[game, queue, player, win, points, timestamp], ...]}}`.
+    Reporting a game only writes that game's rows instead of the guild's whole score history."""
+
+    def __init__(self, config: Config):
+        self.config = config
+
+    async def append(self, guild: discord.Guild, scores):
+        """Adds the scores for one or more games to the journal."""
+        games = {}
+        for score in scores:
+            key = (self._segment(score["Timestamp"]), str(score["Game"]))
+            games.setdefault(key, []).append(self._to_row(score))
+
+        segments = await self._segments(guild)
+        new_segments = [segment for segment, game_id in games.keys() if segment not in segments]
+        if new_segments:
+            await self._save_segments(guild, segments + sorted(set(new_segments)))
+
+        for (segment, game_id), rows in games.items():
+            await self.config.guild(guild).ScoreJournal.set_raw(segment, game_id, value=rows)
+
+    async def scores(self, guild: discord.Guild, since: datetime.datetime = None):
+        """Returns scores sorted from oldest to newest. If `since` is given, only the segments that can hold newer scores are read."""
+        segments = sorted(set(await self._segments(guild)))
+        if since:
+            first_segment = since.strftime(SEGMENT_FORMAT)
+            segments = [segment for segment in segments if segment >= first_segment]
+
+        scores = []
+        for segment in segments:
+            games = await self.config.guild(guild).ScoreJournal.get_raw(segment, default={})
+            for rows in games.values():
+                scores.extend(self._from_row(row) for row in rows)
+        scores.sort(key=lambda score: score["Timestamp"])  # Already (nearly) in order, so this is a linear pass
+        return scores
+
+    async def migrate(self, guild: discord.Guild, legacy_scores):
+        """Moves scores from the legacy `Scores` list (newest first) into the journal."""
+        journal = await self.config.guild(guild).ScoreJournal()
+        segments = await self._segments(guild)
+        for score in reversed(legacy_scores):
+            score = self.upgrade_score(score)
+            segment = self._segment(score["Timestamp"])
+            journal.setdefault(segment, {}).setdefault(str(score["Game"]), []).append(self._to_row(score))
+            if segment not in segments:
+                segments.append(segment)
+
+        await self.config.guild(guild).ScoreJournal.set(journal)
+        await self._save_segments(guild, segments)
+        await self.config.guild(guild).Scores.set([])
+
+    async def upgrade(self, guild: discord.Guild):
+        """One-shot conversion of journal rows saved with "DateTime" strings to the integer schema."""
+        if await self.config.guild(guild).ScoreSchema() >= SCORE_SCHEMA:
+            return
+        journal = await self.config.guild(guild).ScoreJournal()
+        for games in journal.values():
+            for game_id, rows in games.items():
+                games[game_id] = [self._to_row(self.upgrade_score(self._from_row(row))) for row in rows]
+        await self.config.guild(guild).ScoreJournal.set(journal)
+        await self.config.guild(guild).ScoreSchema.set(SCORE_SCHEMA)
+
+    async def clear(self, guild: discord.Guild):
+        await self.config.guild(guild).ScoreJournal.set({})
+        await self._save_segments(guild, [])
+
+    def upgrade_score(self, score):
+        """Returns the score using integer ids and an epoch "Timestamp" in place of a "DateTime" string."""
+        timestamp = score.get("Timestamp", score.get("DateTime"))
+        if isinstance(timestamp, str):
+            timestamp = datetime.datetime.strptime(timestamp, DATE_TIME_FORMAT).timestamp()
+        return {
+            "Game": int(score["Game"]),
+            "Queue": int(score["Queue"]),
+            "Player": int(score["Player"]),
+            "Win": score["Win"],
+            "Points": score["Points"],
+            "Timestamp": int(timestamp)
+        }
+
+    def _segment(self, timestamp: int):
+        return datetime.datetime.fromtimestamp(timestamp).strftime(SEGMENT_FORMAT)
+
+    def _to_row(self, score):
+        return [score[key] for key in SCORE_ROW_KEYS]
+
+    def _from_row(self, row):
+        return dict(zip(SCORE_ROW_KEYS, row))
+
+    async def _segments(self, guild: discord.Guild):
+        return await self.config.guild(guild).ScoreSegments()
+
+    async def _save_segments(self, guild: discord.Guild, segments):
+        await self.config.guild(guild).ScoreSegments.set(segments)
@@ -1,5 +1,7 @@
 import asyncio
 import datetime
+import io
+import logging
 import random
 from sys import exc_info, maxsize
 from typing import Dict, List
@@ -11,8 +13,20 @@ from redbot.core.utils.menus import start_adding_reactions
 from redbot.core.utils.predicates import ReactionPredicate
 
 from .game import Game
+from .leaderboard import Leaderboard
+from .lobby_pool import LobbyPool
+from .metrics import PERCENTILES, PipelineMetrics, count_api_call, timed_stage
+from .persistence import WriteBehind
 from .queue import SixMansQueue
+from .rollups import ScoreRollups
+from .routing import SixMansIndex
+from .scheduler import APIScheduler
+from .scores import SCORE_SCHEMA, ScoreJournal
 from .strings import Strings
+from .timeouts import QueueTimeouts
+from .voice import move_members
+
+log = logging.getLogger("red.sixMans")
 
 DEBUG = False
 MINIMUM_GAME_TIME = 600                         # Seconds (10 Minutes)
@@ -20,6 +34,10 @@ PLAYER_TIMEOUT_TIME = 10 if DEBUG else 14400    # How long players can be in a q
 LOOP_TIME = 5                                   # How often to check the queues in seconds
 VERIFY_TIMEOUT = 15                             # How long someone has to react to a prompt (seconds)
 CHANNEL_SLEEP_TIME = 5 if DEBUG else 30         # How long channels will persist after a game's score has been reported (seconds)
+LOBBY_POOL_REFILL_TIME = 60                     # How often to top up the pre-created lobby channel pools (seconds)
+PRELOAD_CONCURRENCY = 5                         # How many guilds are loaded at once when the cog starts
+PRELOAD_RETRIES = 2                             # Retries for guilds whose data failed to load
+PRELOAD_RETRY_TIME = 5                          # Seconds before the first retry, doubled for each retry after it
 
 QTS_METHODS = [
     Strings.VOTE_TS,
@@ -42,7 +60,15 @@ defaults = {
     "GamesPlayed": 0,
     "Players": {},
     "Scores": [],
-    "QueuesEnabled": True
+    "ScoreJournal": {},
+    "ScoreSegments": [],
+    "ScoreSchema": 1,
+    "ScoreRollups": {},
+    "ScoreRollupsBuilt": False,
+    "QueuesEnabled": True,
+    "LobbyPool": {},
+    "LobbyPoolMin": 0,
+    "LobbyPoolMax": 0
 }
 
 class SixMans(commands.Cog):
@@ -51,21 +77,54 @@ class SixMans(commands.Cog):
         self.bot = bot
         self.config = Config.get_conf(self, identifier=1234567896, force_registration=True)
         self.config.register_guild(**defaults)
+        self.score_journal = ScoreJournal(self.config)
+        self.score_rollups = ScoreRollups(self.config)
         self.queues: dict[list[SixMansQueue]] = {}
         self.games: dict[list[Game]] = {}
+        self.index = SixMansIndex()
+        self.persistence = WriteBehind(self.config)
+        self.api_scheduler = APIScheduler()
+        self.metrics = PipelineMetrics()
+        self.leaderboards: dict[Leaderboard] = {}
+        self.lobby_pool = LobbyPool(self.config)
         self.queueMaxSize: dict[int] = {}
         self.player_timeout_time: dict[int] = {}
         self.queues_enabled: dict[bool] = {}
+        self.ready_guilds = set()
+        self.failed_guilds = set()  # Guilds whose data could not be loaded, until an admin reloads it
 
         asyncio.create_task(self._pre_load_data())
-        self.timeout_tasks = {}
+        self.lobby_pool_task = asyncio.create_task(self._refill_lobby_pools())
+        self.queue_timeouts = QueueTimeouts(self._auto_remove_from_queue)
         self.observers = set()
         
+    def is_ready(self, guild: discord.Guild):
+        """Whether the guild's queues and games have been loaded."""
+        return guild.id in self.ready_guilds
+
+    async def cog_check(self, ctx: Context):
+        if ctx.guild and not self.is_ready(ctx.guild):
+            if ctx.guild.id in self.failed_guilds:
+                if ctx.command.qualified_name == "preLoadData":
+                    return True
+                await ctx.send(":x: {} Mans data failed to load. An admin can try again with `{}preLoadData`.".format(
+                    self.queueMaxSize.get(ctx.guild, 6), ctx.prefix))
+                return False
+            await ctx.send(":x: {} Mans is still loading, please try again in a moment.".format(self.queueMaxSize.get(ctx.guild, 6)))
+            return False
+        return True
+
+    async def cog_before_invoke(self, ctx: Context):
+        game = self._get_game_by_text_channel(ctx.channel) if ctx.guild else None
+        if game:
+            await self._restore_game(game)
+
     def cog_unload(self):
         """Clean up when cog shuts down."""
-        for player, tasks in self.timeout_tasks.items():
-            for queue, timeout_task in tasks.items():
-                timeout_task.cancel()
+        self.lobby_pool_task.cancel()
+        self.queue_timeouts.stop()
+        self.persistence.stop()    # Writes any pending game and queue changes
+        self.api_scheduler.stop()
 
 #region commmands
 
@@ -101,32 +160,28 @@ class SixMans(commands.Cog):
         queue_channels = []
         for channel in channels:
             queue_channels.append(await commands.TextChannelConverter().convert(ctx, channel))
-        for queue in self.queues[ctx.guild]:
-            if queue.name == name:
-                await ctx.send(":x: There is already a queue set up with the name: {0}".format(name))
+        if self._get_queue_by_name(ctx.guild, name):
+            await ctx.send(":x: There is already a queue set up with the name: {0}".format(name))
+            return
+        for channel in queue_channels:
+            queue = self._get_queue_by_text_channel(channel)
+            if queue:
+                await ctx.send(":x: {0} is already being used for queue: {1}".format(channel.mention, queue.name))
                 return
-            for channel in queue_channels:
-                if channel in queue.channels:
-                    await ctx.send(":x: {0} is already being used for queue: {1}".format(channel.mention, queue.name))
-                    return
         queue_max_size = await self._get_queue_max_size(ctx.guild)
         points = {Strings.PP_PLAY_KEY: points_per_play, Strings.PP_WIN_KEY: points_per_win}
         team_selection = await self._team_selection(ctx.guild)
         six_mans_queue = SixMansQueue(name, ctx.guild, queue_channels, points, {}, 0, queue_max_size, teamSelection=team_selection, category=await self._category(ctx.guild))
         self.queues[ctx.guild].append(six_mans_queue)
-        await self._save_queues(ctx.guild, self.queues[ctx.guild])
+        self.index.add_queue(six_mans_queue)
+        self._queue_changed(six_mans_queue)
         await ctx.send("Done")
 
     @commands.guild_only()
     @commands.command()
     @checks.admin_or_permissions(manage_guild=True)
     async def editQueue(self, ctx: Context, current_name, new_name, points_per_play: int, points_per_win: int, *channels):
-        six_mans_queue = None
-        for queue in self.queues[ctx.guild]:
-            if queue.name == current_name:
-                six_mans_queue = queue
-                break
-
+        six_mans_queue = self._get_queue_by_name(ctx.guild, current_name)
         if six_mans_queue is None:
             await ctx.send(":x: No queue found with name: {0}".format(current_name))
             return
@@ -134,21 +189,20 @@ class SixMans(commands.Cog):
         queue_channels = []
         for channel in channels:
             queue_channels.append(await commands.TextChannelConverter().convert(ctx, channel))
-        for queue in self.queues[ctx.guild]:
-            if queue.name != current_name:
-                if queue.name == new_name:
-                    await ctx.send(":x: There is already a queue set up with the name: {0}".format(new_name))
-                    return
-                
-                for channel in queue_channels:
-                    if channel in queue.channels:
-                        await ctx.send(":x: {0} is already being used for queue: {1}".format(channel.mention, queue.name))
-                        return
+        if new_name != current_name and self._get_queue_by_name(ctx.guild, new_name):
+            await ctx.send(":x: There is already a queue set up with the name: {0}".format(new_name))
+            return
+        for channel in queue_channels:
+            queue = self._get_queue_by_text_channel(channel)
+            if queue and queue != six_mans_queue:
+                await ctx.send(":x: {0} is already being used for queue: {1}".format(channel.mention, queue.name))
+                return
 
         six_mans_queue.name = new_name
         six_mans_queue.points = {Strings.PP_PLAY_KEY: points_per_play, Strings.PP_WIN_KEY: points_per_win}
         six_mans_queue.channels = queue_channels
-        await self._save_queues(ctx.guild, self.queues[ctx.guild])
+        self.index.reindex_queue(six_mans_queue)
+        self._queue_changed(six_mans_queue, "Name", "Points", "Channels")
         await ctx.send("Done")
 
     @commands.guild_only()
@@ -159,12 +213,7 @@ class SixMans(commands.Cog):
         if not await self.has_perms(ctx.author):
             return
 
-        six_mans_queue = None
-        for queue in self.queues[ctx.guild]:
-            if queue.name == queue_name:
-                six_mans_queue = queue
-                break
-
+        six_mans_queue = self._get_queue_by_name(ctx.guild, queue_name)
         if six_mans_queue is None:
             await ctx.send(":x: No queue found with name: {0}".format(queue_name))
             return
@@ -172,7 +221,7 @@ class SixMans(commands.Cog):
         valid_ts = self.is_valid_ts(team_selection)
         if valid_ts:
             await six_mans_queue.set_team_selection(valid_ts)
-            await self._save_queues(ctx.guild, self.queues[ctx.guild])
+            self._queue_changed(six_mans_queue, "TeamSelection")
             await ctx.send("Done")
         else:
             await ctx.send(":x: **{}** is not a valid team selection method.".format(team_selection))
@@ -209,8 +258,8 @@ class SixMans(commands.Cog):
         
         for queue in self.queues[ctx.guild]:
             queue.maxSize = max_size
+            self._queue_changed(queue, "MaxSize")
         
-        await self._save_queues(ctx.guild, self.queues[ctx.guild])
         await self._save_queue_max_size(ctx.guild, max_size)
         await ctx.send("Done")
     
@@ -222,16 +271,38 @@ class SixMans(commands.Cog):
         guild_queue_size = await self._get_queue_max_size(ctx.guild)
         await ctx.send("Default Queue Size: {}".format(guild_queue_size))
 
+    @commands.guild_only()
+    @commands.command(aliases=['setLobbyPool', 'slps'])
+    @checks.admin_or_permissions(manage_guild=True)
+    async def setLobbyPoolSize(self, ctx: Context, min_size: int, max_size: int):
+        """Sets how many hidden game channel sets are kept ready in each 6 Mans category (Default: 0 0)
+
+        `min_size` sets are pre-created in the background, and finished games return their channels to the pool until it holds `max_size` sets."""
+        if min_size < 0 or max_size < min_size:
+            return await ctx.send(":x: The pool sizes must satisfy 0 <= min_size <= max_size.")
+
+        await self.lobby_pool.set_sizes(ctx.guild, min_size, max_size)
+        await ctx.send("Done")
+
+    @commands.guild_only()
+    @commands.command(aliases=['getLobbyPool', 'glps'])
+    @checks.admin_or_permissions(manage_guild=True)
+    async def getLobbyPoolSize(self, ctx: Context):
+        """Gets the min and max number of hidden game channel sets kept in each 6 Mans category"""
+        min_size, max_size = self.lobby_pool.sizes.get(ctx.guild, (0, 0))
+        await ctx.send("Lobby Pool Size: **{}** min, **{}** max".format(min_size, max_size))
+
     @commands.guild_only()
     @commands.command()
     @checks.admin_or_permissions(manage_guild=True)
     async def removeQueue(self, ctx: Context, *, queue_name):
-        for queue in self.queues[ctx.guild]:
-            if queue.name == queue_name:
-                self.queues[ctx.guild].remove(queue)
-                await self._save_queues(ctx.guild, self.queues[ctx.guild])
-                await ctx.send("Done")
-                return
+        queue = self._get_queue_by_name(ctx.guild, queue_name)
+        if queue:
+            self.queues[ctx.guild].remove(queue)
+            self.index.remove_queue(queue)
+            self.persistence.queue_removed(ctx.guild, queue)
+            await ctx.send("Done")
+            return
         await ctx.send(":x: No queue set up with name: {0}".format(queue_name))
 
     @commands.guild_only()
@@ -312,6 +383,7 @@ class SixMans(commands.Cog):
             for active_game in self.games[ctx.guild]:
                 if active_game.id == game_id:
                     game = active_game
+                    break
         else:
             game = self._get_game_by_text_channel(ctx.channel)
         
@@ -326,6 +398,7 @@ class SixMans(commands.Cog):
         await game.textChannel.send("Processing Forced Team Selection: {}".format(valid_ts))
         game.teamSelection = valid_ts
         await game.process_team_selection_method(team_selection=valid_ts)
+        self._game_changed(ctx.guild, game)
 
     @commands.guild_only()
     @commands.command(aliases=["fcg"])
@@ -457,10 +530,9 @@ class SixMans(commands.Cog):
         if player in six_mans_queue.queue.queue:
             await ctx.send(":x: You are already in the {0} queue".format(six_mans_queue.name))
             return
-        for game in self.games[ctx.guild]:
-            if player in game:
-                await ctx.send(":x: You are already in a game")
-                return
+        if self.index.get_player_game(player):
+            await ctx.send(":x: You are already in a game")
+            return
 
         await self._add_to_queue(player, six_mans_queue)
         if six_mans_queue._queue_full():
@@ -516,20 +588,20 @@ class SixMans(commands.Cog):
         Only valid after 10 minutes have passed since the game started. Both teams will need to verify the results.
 
         `winning_team` must be either `Blue` or `Orange`"""
-        game_time = ctx.message.created_at - ctx.channel.created_at
-        if game_time.seconds < MINIMUM_GAME_TIME:
+        game, six_mans_queue = await self._get_info(ctx)
+        if game is None or six_mans_queue is None:
+            return
+
+        game_time = game.age(ctx.message.created_at)
+        if game_time < MINIMUM_GAME_TIME:
             await ctx.send(":x: You can't report a game outcome until at least **10 minutes** have passed since the game was created."
-                "\nCurrent time that's passed = **{0} minute(s)**".format(game_time.seconds // 60))
+                "\nCurrent time that's passed = **{0} minute(s)**".format(int(game_time // 60)))
             return
 
         if winning_team.lower() != "blue" and winning_team.lower() != "orange":
             await ctx.send(":x: {0} is an invalid input for `winning_team`. Must be either `Blue` or `Orange`".format(winning_team))
             return
 
-        game, six_mans_queue = await self._get_info(ctx)
-        if game is None or six_mans_queue is None:
-            return
-
         if game.scoreReported == True:
             await ctx.send(":x: Someone has already reported the results or is waiting for verification")
             return
@@ -633,17 +705,17 @@ class SixMans(commands.Cog):
 
     @commands.Cog.listener("on_raw_reaction_add")
     async def on_raw_reaction_add(self, payload: discord.RawReactionActionEvent):
-        channel = self.bot.get_channel(payload.channel_id)
-        if type(channel) == discord.DMChannel:
+        # Drop reactions that aren't a tracked emoji on a game's info message before making any API calls
+        game = self.index.get_reaction_game(payload)
+        if not game:
             return
 
-        message = await channel.fetch_message(payload.message_id)
-        user = self.bot.get_user(payload.user_id)
+        user = payload.member if payload.member else self._get_reaction_member(payload)
         if not user:
-            user = await self.bot.fetch_user(payload.user_id)
-        
-        
-        await self.process_six_mans_reaction_add(message, channel, user, payload.emoji)
+            return
+        await self._restore_game(game)
+        await self.process_six_mans_reaction_add(game.info_message, game.textChannel, user, payload.emoji)
+        self._game_changed(user.guild, game)
 
     @commands.Cog.listener("on_reaction_remove")
     async def on_reaction_remove(self, reaction, user):
@@ -655,28 +727,35 @@ class SixMans(commands.Cog):
 
     @commands.Cog.listener("on_raw_reaction_remove")
     async def on_raw_reaction_remove(self, payload: discord.RawReactionActionEvent):
-        channel = self.bot.get_channel(payload.channel_id)
-        if type(channel) == discord.DMChannel:
+        game = self.index.get_reaction_game(payload)
+        if not game:
             return
 
-        user = self.bot.get_user(payload.user_id)
+        user = self._get_reaction_member(payload)
         if not user:
-            user = await self.bot.fetch_user(payload.user_id)
+            return
+        await self._restore_game(game)
+        await self.process_six_mans_reaction_removed(game.textChannel, user, payload.emoji)
+        self._game_changed(user.guild, game)
 
-        await self.process_six_mans_reaction_removed(channel, user, payload.emoji)
+    @commands.Cog.listener("on_guild_join")
+    async def on_guild_join(self, guild: discord.Guild):
+        await self._load_guilds([guild])
 
     @commands.Cog.listener("on_guild_channel_delete")
     async def on_guild_channel_delete(self, channel):
         """If a queue channel is deleted, removes it from the queue class instance. If the last queue channel is deleted, the channel is replaced."""
         #TODO: Error catch if Q Lobby VC is deleted
+        await self.lobby_pool.discard(channel)
         if type(channel) != discord.TextChannel:
             return
-        queue = None
-        for queue in self.queues[channel.guild]:
-            if channel in queue.channels:
-                queue.channels.remove(channel)
-                break
+        queue = self._get_queue_by_text_channel(channel)
+        if not queue:
+            return
+        queue.channels.remove(channel)
+        self.index.reindex_queue(queue)
         if queue.channels:
+            self._queue_changed(queue, "Channels")
             return
         
         clone = await channel.clone()
@@ -684,7 +763,8 @@ class SixMans(commands.Cog):
         helper_ping = " {}".format(helper_role.mention) if helper_role else ""
         await clone.send(":grey_exclamation:{0} This channel has been created because the last textChannel for the **{1}** queue has been deleted.".format(helper_ping, queue.name))
         queue.channels.append(clone)
-        await self._save_queues(channel.guild, self.queues[ctx.guild])
+        self.index.reindex_queue(queue)
+        self._queue_changed(queue, "Channels")
 
     #endregion
 
@@ -700,79 +780,71 @@ class SixMans(commands.Cog):
     @queueLeaderBoard.command(aliases=["all-time", "alltime"])
     async def overall(self, ctx: Context, *, queue_name: str = None):
         """All-time leader board"""
-        players = None
-        queue = await self._get_queue_by_name(ctx.guild, queue_name) if queue_name else None
+        queue = self._get_queue_by_name(ctx.guild, queue_name) if queue_name else None
         queue_name = queue.name if queue else ctx.guild.name
 
         if queue:
-            players = queue.players
+            sorted_players = queue.leaderboard
             games_played = queue.gamesPlayed
         else:
-            players = await self._players(ctx.guild)
+            sorted_players = self.leaderboards[ctx.guild]
             games_played = await self._games_played(ctx.guild)
 
-        if not players:
+        if not sorted_players:
             await ctx.send(":x: Queue leaderboard not available for {0}".format(queue_name))
             return
 
-        sorted_players = self._sort_player_dict(players)
         await ctx.send(embed=await self.embed_leaderboard(ctx, sorted_players, queue_name, games_played, "All-time"))
 
     @commands.guild_only()
     @queueLeaderBoard.command(aliases=["daily"])
     async def day(self, ctx: Context, *, queue_name: str = None):
         """Daily leader board. All games from the last 24 hours will count"""
-        scores = await self._scores(ctx.guild)
-
-        queue = await self._get_queue_by_name(ctx.guild, queue_name) if queue_name else None
+        queue = self._get_queue_by_name(ctx.guild, queue_name) if queue_name else None
         queue_id = queue.id if queue else None
         queue_name = queue.name if queue else ctx.guild.name
         day_ago = datetime.datetime.now() - datetime.timedelta(days=1)
-        players, games_played = self._filter_scores(ctx.guild, scores, day_ago, queue_id)
+        players, games_played = await self._players_since(ctx.guild, day_ago, queue_id)
 
         if not players:
             await ctx.send(":x: Queue leaderboard not available for {0}".format(queue_name))
             return
 
-        sorted_players = self._sort_player_dict(players)
+        sorted_players = Leaderboard(players)
         await ctx.send(embed=await self.embed_leaderboard(ctx, sorted_players, queue_name, games_played, "Daily"))
 
     @commands.guild_only()
     @queueLeaderBoard.command(aliases=["weekly", "wk"])
     async def week(self, ctx: Context, *, queue_name: str = None):
         """Weekly leader board. All games from the last week will count"""
-        scores = await self._scores(ctx.guild)
-
-        queue = await self._get_queue_by_name(ctx.guild, queue_name) if queue_name else None
+        queue = self._get_queue_by_name(ctx.guild, queue_name) if queue_name else None
         queue_id = queue.id if queue else None
         week_ago = datetime.datetime.now() - datetime.timedelta(weeks=1)
-        players, games_played = self._filter_scores(ctx.guild, scores, week_ago, queue_id)
+        players, games_played = await self._players_since(ctx.guild, week_ago, queue_id)
 
         if not players:
             await ctx.send(":x: Queue leaderboard not available for {0}".format(queue_name))
             return
 
         queue_name = queue.name if queue else ctx.guild.name
-        sorted_players = self._sort_player_dict(players)
+        sorted_players = Leaderboard(players)
         await ctx.send(embed=await self.embed_leaderboard(ctx, sorted_players, queue_name, games_played, "Weekly"))
 
     @commands.guild_only()
     @queueLeaderBoard.command(aliases=["monthly", "mnth"])
     async def month(self, ctx: Context, *, queue_name: str = None):
         """Monthly leader board. All games from the last 30 days will count"""
-        scores = await self._scores(ctx.guild)
-
-        queue = await self._get_queue_by_name(ctx.guild, queue_name) if queue_name else None
+        queue = self._get_queue_by_name(ctx.guild, queue_name) if queue_name else None
         queue_id = queue.id if queue else None
         month_ago = datetime.datetime.now() - datetime.timedelta(days=30)
-        players, games_played = self._filter_scores(ctx.guild, scores, month_ago, queue_id)
+        players, games_played = await self._players_since(ctx.guild, month_ago, queue_id)
 
         if not players:
             await ctx.send(":x: Queue leaderboard not available for {0}".format(queue_name))
             return
 
         queue_name = queue.name if queue else ctx.guild.name
-        sorted_players = self._sort_player_dict(players)
+        sorted_players = Leaderboard(players)
         await ctx.send(embed=await self.embed_leaderboard(ctx, sorted_players, queue_name, games_played, "Monthly"))
 
     #endregion
@@ -790,18 +862,17 @@ class SixMans(commands.Cog):
         """All-time ranks"""
         queue = None
         if queue_name:
-            queue = await self._get_queue_by_name(ctx.guild, queue_name)
-            players = queue.players
+            queue = self._get_queue_by_name(ctx.guild, queue_name)
+            sorted_players = queue.leaderboard
         else:
-            players = await self._players(ctx.guild)
+            sorted_players = self.leaderboards[ctx.guild]
             queue_name = ctx.guild.name
 
-        if not players:
+        if not sorted_players:
             await ctx.send(":x: Player ranks not available for {0}".format(queue_name))
             return
 
         queue_max_size = queue.maxSize if queue else self.queueMaxSize[ctx.guild]
-        sorted_players = self._sort_player_dict(players)
         player = player if player else ctx.author
         await ctx.send(embed=self.embed_rank(player, sorted_players, queue_name, queue_max_size, "All-time"))
 
@@ -809,12 +880,10 @@ class SixMans(commands.Cog):
     @rank.command(aliases=["day"])
     async def daily(self, ctx: Context, player: discord.Member = None, *, queue_name: str = None):
         """Daily ranks. All games from the last 24 hours will count"""
-        scores = await self._scores(ctx.guild)
-
-        queue = await self._get_queue_by_name(ctx.guild, queue_name) if queue_name else None
+        queue = self._get_queue_by_name(ctx.guild, queue_name) if queue_name else None
         queue_id = queue.id if queue else None
         day_ago = datetime.datetime.now() - datetime.timedelta(days=1)
-        players = self._filter_scores(ctx.guild, scores, day_ago, queue_id)[0]
+        players = (await self._players_since(ctx.guild, day_ago, queue_id))[0]
         queue_name = queue.name if queue else ctx.guild.name
         
         if not players:
@@ -822,7 +891,7 @@ class SixMans(commands.Cog):
             return
 
         queue_max_size = queue.maxSize if queue else self.queueMaxSize[ctx.guild]
-        sorted_players = self._sort_player_dict(players)
+        sorted_players = Leaderboard(players)
         player = player if player else ctx.author
         await ctx.send(embed=self.embed_rank(player, sorted_players, queue_name, queue_max_size, "Daily"))
 
@@ -830,12 +899,10 @@ class SixMans(commands.Cog):
     @rank.command(aliases=["week", "wk"])
     async def weekly(self, ctx: Context, player: discord.Member = None, *, queue_name: str = None):
         """Weekly ranks. All games from the last week will count"""
-        scores = await self._scores(ctx.guild)
-
-        queue = await self._get_queue_by_name(ctx.guild, queue_name) if queue_name else None
+        queue = self._get_queue_by_name(ctx.guild, queue_name) if queue_name else None
         queue_id = queue.id if queue else None
         week_ago = datetime.datetime.now() - datetime.timedelta(weeks=1)
-        players = self._filter_scores(ctx.guild, scores, week_ago, queue_id)[0]
+        players = (await self._players_since(ctx.guild, week_ago, queue_id))[0]
         queue_name = queue.name if queue else ctx.guild.name
 
         if not players:
@@ -843,7 +910,7 @@ class SixMans(commands.Cog):
             return
 
         queue_max_size = queue.maxSize if queue else self.queueMaxSize[ctx.guild]
-        sorted_players = self._sort_player_dict(players)
+        sorted_players = Leaderboard(players)
         player = player if player else ctx.author
         await ctx.send(embed=self.embed_rank(player, sorted_players, queue_name, queue_max_size, "Weekly"))
 
@@ -851,12 +918,10 @@ class SixMans(commands.Cog):
     @rank.command(aliases=["month", "mnth"])
     async def monthly(self, ctx: Context, player: discord.Member = None, *, queue_name: str = None):
         """Monthly ranks. All games from the last 30 days will count"""
-        scores = await self._scores(ctx.guild)
-
-        queue = await self._get_queue_by_name(ctx.guild, queue_name) if queue_name else None
+        queue = self._get_queue_by_name(ctx.guild, queue_name) if queue_name else None
         queue_id = queue.id if queue else None
         month_ago = datetime.datetime.now() - datetime.timedelta(days=30)
-        players = self._filter_scores(ctx.guild, scores, month_ago, queue_id)[0]
+        players = (await self._players_since(ctx.guild, month_ago, queue_id))[0]
         queue_name = queue.name if queue else ctx.guild.name
 
         if not players:
@@ -864,7 +929,7 @@ class SixMans(commands.Cog):
             return
 
         queue_max_size = queue.maxSize if queue else self.queueMaxSize[ctx.guild]
-        sorted_players = self._sort_player_dict(players)
+        sorted_players = Leaderboard(players)
         player = player if player else ctx.author
         await ctx.send(embed=self.embed_rank(player, sorted_players, queue_name, queue_max_size, "Monthly"))
 
@@ -888,8 +953,8 @@ class SixMans(commands.Cog):
         #TODO: Consider having the queues save the Queue Lobby VC
         for queue in self.queues[ctx.guild]:
             queue.lobby_vc = lobby_voice
+            self._queue_changed(queue, "LobbyVC")
         await self._save_q_lobby_vc(ctx.guild, lobby_voice.id)
-        await self._save_queues(ctx.guild, self.queues[ctx.guild])
         await ctx.send("Done")
     
     @commands.guild_only()
@@ -987,8 +1052,8 @@ class SixMans(commands.Cog):
         """Sets the category channel where all game channels will be created under"""
         for queue in self.queues[ctx.guild]:
             queue.category = category_channel
+            self._queue_changed(queue, "Category")
         await self._save_category(ctx.guild, category_channel.id)
-        await self._save_queues(ctx.guild, self.queues[ctx.guild])
         await ctx.send("Done")
 
     @commands.guild_only()
@@ -1045,6 +1110,35 @@ class SixMans(commands.Cog):
         await self._save_helper_role(ctx.guild, None)
         await ctx.send("Done")
 
+    @commands.guild_only()
+    @commands.command(aliases=["smStats", "sms"])
+    @checks.admin_or_permissions(manage_guild=True)
+    async def sixMansStats(self, ctx: Context):
+        """Shows how long each stage of popping a queue and finishing a game has taken (in ms) since the cog was loaded"""
+        summary = self.metrics.summary(ctx.guild)
+        if not summary:
+            await ctx.send(":x: No {} Mans stats have been recorded yet.".format(self.queueMaxSize[ctx.guild]))
+            return
+
+        header = ["Stage", "Count"] + ["p{}".format(percentile) for percentile in PERCENTILES] + ["API Calls"]
+        rows = [header]
+        for stage, stats in summary.items():
+            rows.append([stage, str(stats["Count"])] + ["{:.0f}".format(stats["p{}".format(percentile)]) for percentile in PERCENTILES] + ["{:.1f}".format(stats["API Calls"])])
+        widths = [max(len(row[i]) for row in rows) for i in range(len(header))]
+        lines = ["  ".join(value.ljust(widths[i]) for i, value in enumerate(row)) for row in rows]
+        await ctx.send("```{}```".format("\n".join(lines)))
+
+    @commands.guild_only()
+    @commands.command(aliases=["exportSMStats"])
+    @checks.admin_or_permissions(manage_guild=True)
+    async def exportSixMansStats(self, ctx: Context):
+        """Sends the recorded stage timings as a JSON lines file"""
+        json_lines = self.metrics.to_json_lines(ctx.guild)
+        if not json_lines:
+            await ctx.send(":x: No {} Mans stats have been recorded yet.".format(self.queueMaxSize[ctx.guild]))
+            return
+        await ctx.send(file=discord.File(io.BytesIO(json_lines.encode()), filename="sixmans_stats_{}.jsonl".format(ctx.guild.id)))
+
     @commands.guild_only()
     @commands.command(aliases=["cag"])
     async def checkActiveGames(self, ctx: Context):
@@ -1079,15 +1173,20 @@ class SixMans(commands.Cog):
 
     async def _add_to_queue(self, player: discord.Member, six_mans_queue: SixMansQueue):
         six_mans_queue._put(player)
+        self.index.add_queued_player(player, six_mans_queue)
+        expires_at = six_mans_queue.activeJoinLog[player.id] + self.player_timeout_time[six_mans_queue.guild]
+        self.queue_timeouts.schedule(player, six_mans_queue, expires_at)
+        self._queue_changed(six_mans_queue, "ActiveJoinLog")
         embed = self.embed_player_added(player, six_mans_queue)
         await six_mans_queue.send_message(embed=embed)
-        await self.create_timeout_task(player, six_mans_queue, self.player_timeout_time[six_mans_queue.guild])
 
     async def _remove_from_queue(self, player: discord.Member, six_mans_queue: SixMansQueue):
         six_mans_queue._remove(player)
+        self.index.remove_queued_player(player, six_mans_queue)
+        self.queue_timeouts.cancel(player, six_mans_queue)
+        self._queue_changed(six_mans_queue, "ActiveJoinLog")
         embed = self.embed_player_removed(player, six_mans_queue)
         await six_mans_queue.send_message(embed=embed)
-        await self.remove_timeout_task(player, six_mans_queue)
 
     async def get_visble_queue_channel(self, six_mans_queue: SixMansQueue, player: discord.Member):
         for channel in six_mans_queue.channels:
@@ -1097,6 +1196,8 @@ class SixMans(commands.Cog):
 
     async def _auto_remove_from_queue(self, player: discord.Member, six_mans_queue: SixMansQueue):
         # Remove player from queue
+        if player not in six_mans_queue.queue:
+            return
         await self._remove_from_queue(player, six_mans_queue)
         
         # Send Player Message
@@ -1122,36 +1223,12 @@ class SixMans(commands.Cog):
             except:
                 pass
     
-    async def create_timeout_task(self, player: discord.Member, six_mans_queue: SixMansQueue, time=None):
-        self.timeout_tasks.setdefault(player, {})
-        self.timeout_tasks[player][six_mans_queue] = asyncio.create_task(self.player_queue_timeout(player, six_mans_queue, time))
-
-    async def player_queue_timeout(self, player: discord.Member, six_mans_queue: SixMansQueue, time=None):
-        if not time:
-            time = self.player_queue_timeout[six_mans_queue.guild]
-
-        await asyncio.sleep(time)
-        try:
-            await self._auto_remove_from_queue(player, six_mans_queue)
-        except:
-            pass
-
-    async def cancel_timeout_task(self, player: discord.Member, six_mans_queue: SixMansQueue):
-        try:
-            self.timeout_tasks[player][six_mans_queue].cancel()
-            await self.remove_timeout_task(player, six_mans_queue)
-        except:
-            pass
-    
-    async def remove_timeout_task(self, player: discord.Member, six_mans_queue: SixMansQueue):
-        try:
-            del self.timeout_tasks[player][six_mans_queue]
-            if not self.timeout_tasks[player]:
-                del self.timeout_tasks[player]
-        except:
-            pass
-            
     async def _finish_game(self, guild: discord.Guild, game: Game, six_mans_queue: SixMansQueue, winning_team):
+        await self._score_game(guild, game, six_mans_queue, winning_team)
+        await self._remove_game(guild, game)
+
+    @timed_stage("finish_game")
+    async def _score_game(self, guild: discord.Guild, game: Game, six_mans_queue: SixMansQueue, winning_team):
         winning_players = []
         losing_players = []
         if winning_team.lower() == "blue":
@@ -1161,67 +1238,94 @@ class SixMans(commands.Cog):
             winning_players = game.orange
             losing_players = game.blue
 
-        _scores = await self._scores(guild)
+        _scores = []
         _players = await self._players(guild)
         _games_played = await self._games_played(guild)
-        date_time = datetime.datetime.now().strftime("%d-%b-%Y (%H:%M:%S.%f)")
+        timestamp = int(datetime.datetime.now().timestamp())
         for player in winning_players:
-            score = self._create_player_score(six_mans_queue, game, player, 1, date_time)
-            self._give_points(six_mans_queue.players, score)
-            self._give_points(_players, score)
-            _scores.insert(0, score)
+            score = self._create_player_score(six_mans_queue, game, player, 1, timestamp)
+            self._give_points(six_mans_queue.players, score, six_mans_queue.leaderboard)
+            six_mans_queue.invalidate_player_rating(player.id)
+            self._give_points(_players, score, self.leaderboards[guild])
+            _scores.append(score)
         for player in losing_players:
-            score = self._create_player_score(six_mans_queue, game, player, 0, date_time)
-            self._give_points(six_mans_queue.players, score)
-            self._give_points(_players, score)
-            _scores.insert(0, score)
+            score = self._create_player_score(six_mans_queue, game, player, 0, timestamp)
+            self._give_points(six_mans_queue.players, score, six_mans_queue.leaderboard)
+            six_mans_queue.invalidate_player_rating(player.id)
+            self._give_points(_players, score, self.leaderboards[guild])
+            _scores.append(score)
 
         _games_played += 1
         six_mans_queue.gamesPlayed += 1
 
-        await self._save_scores(guild, _scores)
-        await self._save_queues(guild, self.queues[guild])
+        await self.score_journal.append(guild, _scores)
+        await self.score_rollups.add(guild, _scores)
+        self._queue_changed(six_mans_queue, "Players", "GamesPlayed")
         await self._save_players(guild, _players)
         await self._save_games_played(guild, _games_played)
 
         if await self._get_automove(guild): # game.automove not working?
             qlobby_vc = await self._get_q_lobby_vc(guild)
             if qlobby_vc:
-                await self._move_to_voice(qlobby_vc, game.voiceChannels[0].members)
-                await self._move_to_voice(qlobby_vc, game.voiceChannels[1].members)
-
-        await self._remove_game(guild, game)
+                await self._move_to_voice(qlobby_vc, game.voiceChannels[0].members + game.voiceChannels[1].members)
 
     async def _move_to_voice(self, vc: discord.VoiceChannel, members: List[discord.Member]):
-        for member in members:
-            try:
-                await member.move_to(vc)
-            except:
-                pass
+        """Moves all members to the voice channel concurrently, returning the moves that failed."""
+        return await move_members([(member, vc) for member in members])
 
     async def _remove_game(self, guild: discord.Guild, game: Game):
         self.games[guild].remove(game)
-        await self._save_games(guild, self.games[guild])
+        self.index.remove_game(guild, game)
+        self.persistence.game_removed(guild, game)
         await asyncio.sleep(CHANNEL_SLEEP_TIME)
+        await self._close_game_channels(guild, game)
+
+    @timed_stage("remove_game")
+    async def _close_game_channels(self, guild: discord.Guild, game: Game):
         q_lobby_vc = await self._get_q_lobby_vc(guild)
         if not game.scoreReported:
             await game._notify(new_state=Strings.CANCELED_GS)
+        if q_lobby_vc:
+            await self._move_to_voice(q_lobby_vc, [player for vc in game.voiceChannels if vc for player in vc.members])
+
+        # Return the channels to the lobby pool if it has room, otherwise delete them
+        if game.textChannel and len(game.voiceChannels) == 3:
+            lobby = [game.textChannel] + list(game.voiceChannels)
+            if await self.lobby_pool.release(guild, game.textChannel.category, lobby):
+                return
+        count_api_call(1 + len(game.voiceChannels))
         try:
             await game.textChannel.delete()
         except:
             pass
         for vc in game.voiceChannels:
             try:
-                try:
-                    if q_lobby_vc:
-                        for player in vc.members:
-                            await player.move_to(q_lobby_vc)
-                except:
-                    pass
                 await vc.delete()
             except:
                 pass
 
+    async def _refill_lobby_pools(self):
+        await self.bot.wait_until_ready()
+        while True:
+            # Copied since guilds can be (re)loaded while a pool is refilling
+            for guild, queues in list(self.queues.items()):
+                categories = set([await self._game_category(queue) for queue in queues])
+                categories.discard(None)
+                for category in categories:
+                    try:
+                        await self.lobby_pool.refill(guild, category)
+                    except discord.HTTPException:
+                        pass
+                    except Exception:
+                        log.exception("Failed to refill the lobby pool for category %s in guild %s", category.id, guild.id)
+            await asyncio.sleep(LOBBY_POOL_REFILL_TIME)
+
+    async def _game_category(self, six_mans_queue: SixMansQueue):
+        """The category a queue's games are created in, which is also the category its lobby pool is kept for."""
+        if isinstance(six_mans_queue.category, discord.CategoryChannel):
+            return six_mans_queue.category
+        return await self._category(six_mans_queue.guild)
+
     def _get_opposing_captain(self, player: discord.Member, game: Game):
         opposing_captain = None
         if game.state == Strings.TEAM_SELECTION_GS:
@@ -1241,7 +1345,7 @@ class SixMans(commands.Cog):
         elif opposing_captain in game.orange:
             game.captains[1] = random.sample(list(game.orange), 1)[0] #Swap Orange team captain
 
-    def _give_points(self, players_dict, score):
+    def _give_points(self, players_dict, score, leaderboard: Leaderboard = None):
         player_id = score["Player"]
         points_earned = score["Points"]
         win = score["Win"]
@@ -1250,8 +1354,10 @@ class SixMans(commands.Cog):
         player_dict[Strings.PLAYER_POINTS_KEY] = player_dict.get(Strings.PLAYER_POINTS_KEY, 0) + points_earned
         player_dict[Strings.PLAYER_GP_KEY] = player_dict.get(Strings.PLAYER_GP_KEY, 0) + 1
         player_dict[Strings.PLAYER_WINS_KEY] = player_dict.get(Strings.PLAYER_WINS_KEY, 0) + win
+        if leaderboard is not None:
+            leaderboard.update(player_id, player_dict)
 
-    def _create_player_score(self, six_mans_queue: SixMansQueue, game: Game, player: discord.Member, win, date_time):
+    def _create_player_score(self, six_mans_queue: SixMansQueue, game: Game, player: discord.Member, win, timestamp: int):
         points_dict = six_mans_queue.points
         if win:
             points_earned = points_dict[Strings.PP_PLAY_KEY] + points_dict[Strings.PP_WIN_KEY]
@@ -1263,26 +1369,36 @@ class SixMans(commands.Cog):
             "Player": player.id,
             "Win": win,
             "Points": points_earned,
-            "DateTime": date_time
+            "Timestamp": timestamp
         }
 
+    async def _players_since(self, guild: discord.Guild, start_date: datetime.datetime, queue_id=None):
+        if self.score_rollups.is_loaded(guild):
+            return self.score_rollups.players(guild, start_date, queue_id)
+        scores = await self._scores(guild, since=start_date)
+        return self._filter_scores(guild, scores, start_date, queue_id)
+
     def _filter_scores(self, guild, scores, start_date, queue_id):
+        # Scores are sorted from oldest to newest, so binary search for the first score after the start date
+        start = int(start_date.timestamp())
+        low, high = 0, len(scores)
+        while low < high:
+            mid = (low + high) // 2
+            if scores[mid]["Timestamp"] <= start:
+                low = mid + 1
+            else:
+                high = mid
+
         players = {}
         valid_scores = 0
-        for score in scores:
-            date_time = datetime.datetime.strptime(score["DateTime"], "%d-%b-%Y (%H:%M:%S.%f)")
-            if  date_time > start_date and (queue_id is None or score["Queue"] == queue_id):
+        for score in scores[low:]:
+            if queue_id is None or score["Queue"] == queue_id:
                 self._give_points(players, score)
                 valid_scores +=1
-            else:
-                break
         games_played = (valid_scores // self.queueMaxSize[guild])
         return players, games_played
 
-    def _sort_player_dict(self, player_dict):
-        sorted_players = sorted(player_dict.items(), key=lambda x: x[1][Strings.PLAYER_WINS_KEY], reverse=True)
-        return sorted(sorted_players, key=lambda x: x[1][Strings.PLAYER_POINTS_KEY], reverse=True)
-
+    @timed_stage("pop_queue")
     async def _pop_queue(self, ctx: Context, six_mans_queue: SixMansQueue):
         game = await self._create_game(ctx.guild, six_mans_queue, prefix=ctx.prefix)
         if game is None:
@@ -1290,21 +1406,26 @@ class SixMans(commands.Cog):
         
         #Remove players from any other queue they were in
         for player in game.players:
-            for queue in self.queues[ctx.guild]:
-                if player in queue.queue:
-                    await self._remove_from_queue(player, queue)
+            for queue in self.index.get_player_queues(player):
+                await self._remove_from_queue(player, queue)
         
         # Notify all players that queue has popped
         # await game.textChannel.send("{}\n".format(", ".join([player.mention for player in game.players])))
 
         self.games[ctx.guild].append(game)
-        await self._save_games(ctx.guild, self.games[ctx.guild])
+        self.index.add_game(ctx.guild, game)
+        self.persistence.game_changed(ctx.guild, game)
         return True
 
+    @timed_stage("create_game")
     async def _create_game(self, guild: discord.Guild, six_mans_queue: SixMansQueue, prefix="?"):
         if not six_mans_queue._queue_full():
             return None
         players = [six_mans_queue._get() for _ in range(six_mans_queue.maxSize)]
+        for player in players:
+            self.index.remove_queued_player(player, six_mans_queue)
+            self.queue_timeouts.cancel(player, six_mans_queue)
+        self._queue_changed(six_mans_queue, "ActiveJoinLog")
 
         await six_mans_queue.send_message(message="**Queue is full! Game is being created.**")
 
@@ -1315,10 +1436,14 @@ class SixMans(commands.Cog):
             automove=await self._get_automove(guild),
             use_reactions=await self._is_react_to_vote(guild),
             observers=self.observers,
-            prefix=prefix
+            prefix=prefix,
+            scheduler=self.api_scheduler
         )
-        await game.create_game_channels(await self._category(guild))
-        await game.process_team_selection_method()
+        category = await self._game_category(six_mans_queue)
+        with self.metrics.stage(guild, "create_game_channels"):
+            await game.create_game_channels(category, lobby=await self.lobby_pool.claim(guild, category))
+        with self.metrics.stage(guild, "team_selection"):
+            await game.process_team_selection_method()
         return game
 
     async def _get_info(self, ctx: Context):
@@ -1327,9 +1452,9 @@ class SixMans(commands.Cog):
             await ctx.send(":x: This command can only be used in a {} Mans game channel.".format(self.queueMaxSize[ctx.guild]))
             return None
 
-        for queue in self.queues[ctx.guild]:
-            if queue.id == game.queue.id:
-                return game, queue
+        queue = self.index.queues_by_id.get(game.queue.id)
+        if queue:
+            return game, queue
 
         await ctx.send(":x: Queue not found for this channel, please message an Admin if you think this is a mistake.")
         return None
@@ -1357,23 +1482,17 @@ class SixMans(commands.Cog):
             return None, None
 
     def _get_game_by_text_channel(self, channel: discord.TextChannel):
-        for game in self.games.get(channel.guild, []):
-            if game.textChannel == channel:
-                return game
-        return None
+        return self.index.get_game(channel)
 
     def _get_queue_by_text_channel(self, channel: discord.TextChannel):
-        for six_mans_queue in self.queues[channel.guild]:
-            for queuechannel in six_mans_queue.channels:
-                if queuechannel == channel:
-                    return six_mans_queue
-        return None
+        return self.index.get_queue(channel)
 
     def _get_queue_by_name(self, guild: discord.Guild, queue_name):
-        for queue in self.queues[guild]:
-            if queue.name == queue_name:
-                return queue
-        return None
+        return self.index.get_queue_by_name(guild, queue_name)
+
+    def _get_reaction_member(self, payload: discord.RawReactionActionEvent):
+        guild = self.bot.get_guild(payload.guild_id) if payload.guild_id else None
+        return guild.get_member(payload.user_id) if guild else None
 
     async def process_six_mans_reaction_add(self, message: discord.Message, channel: discord.TextChannel, user: discord.User, emoji):
         # Note: This may be called TWICE both by on_reaction and/or on_raw_reaction
@@ -1408,10 +1527,10 @@ class SixMans(commands.Cog):
                 return
             
             # Check if Shuffle is enabled
-            message = self.info_message
+            message = await channel.fetch_message(game.info_message.id)
             now = datetime.datetime.utcnow()
-            time_since_last_team = (now - message.created_at).seconds
-            time_since_q_pop = (now - message.channel.created_at).seconds
+            time_since_last_team = (now - message.created_at).total_seconds()
+            time_since_q_pop = game.age(now)
             if time_since_q_pop > 300:
                 return await channel.send(":x: Reshuffling teams is no longer permitted after 5 minutes of the initial team selection.")
             if time_since_last_team > 180:
@@ -1498,7 +1617,7 @@ class SixMans(commands.Cog):
             embed.add_field(name="{}:".format(queueName), value="{}".format("\n".join(["{0}\n{1}".format(str(game.id), ", ".join([player.mention for player in game.players])) for game in games])), inline=False)
         return embed
 
-    async def embed_leaderboard(self, ctx: Context, sorted_players, queue_name, games_played, lb_format):
+    async def embed_leaderboard(self, ctx: Context, sorted_players: Leaderboard, queue_name, games_played, lb_format):
         embed = discord.Embed(title="{0} {1} Mans {2} Leaderboard".format(queue_name, self.queueMaxSize[ctx.guild], lb_format), color=discord.Colour.blue())
         embed.add_field(name="Games Played", value="{}\n".format(games_played), inline=True)
         embed.add_field(name="Unique Players", value="{}\n".format(len(sorted_players)), inline=True)
@@ -1538,10 +1657,10 @@ class SixMans(commands.Cog):
         
         author = ctx.author
         try:
-            author_index = [y[0] for y in sorted_players].index("{0}".format(author.id))
-            if author_index is not None and author_index > 9:
-                author_info = sorted_players[author_index][1]
-                playerStrings.append("\n`{0}` **{1:25s}:**".format(author_index + 1, author.display_name))
+            author_rank = sorted_players.rank(author.id)
+            if author_rank is not None and author_rank > 10:
+                author_info = sorted_players.get(author.id)
+                playerStrings.append("\n`{0}` **{1:25s}:**".format(author_rank, author.display_name))
                 try:
                     author_wins = author_info[Strings.PLAYER_WINS_KEY]
                     author_gp = author_info[Strings.PLAYER_GP_KEY]
@@ -1563,14 +1682,14 @@ class SixMans(commands.Cog):
         embed.add_field(name="Stats", value="{}\n".format("\n".join(statStrings)), inline=True)
         return embed
 
-    def embed_rank(self, player, sorted_players, queue_name, queue_max_size, rank_format):
+    def embed_rank(self, player, sorted_players: Leaderboard, queue_name, queue_max_size, rank_format):
         try:
             num_players = len(sorted_players)
-            points_index = [y[0] for y in sorted_players].index("{0}".format(player.id))
-            player_info = sorted_players[points_index][1]
+            player_info = sorted_players.get(player.id)
             points, wins, games_played = player_info[Strings.PLAYER_POINTS_KEY], player_info[Strings.PLAYER_WINS_KEY], player_info[Strings.PLAYER_GP_KEY]
-            wins_index = [y[0] for y in sorted(sorted_players, key=lambda x: x[1][Strings.PLAYER_WINS_KEY], reverse=True)].index("{0}".format(player.id))
-            games_played_index = [y[0] for y in sorted(sorted_players, key=lambda x: x[1][Strings.PLAYER_GP_KEY], reverse=True)].index("{0}".format(player.id))
+            points_index = sorted_players.rank(player.id) - 1
+            wins_index = sorted_players.rank(player.id, Strings.PLAYER_WINS_KEY) - 1
+            games_played_index = sorted_players.rank(player.id, Strings.PLAYER_GP_KEY) - 1
             embed = discord.Embed(title="{0} {1} {2} Mans {3} Rank".format(player.display_name, queue_name, queue_max_size, rank_format), color=discord.Colour.blue())
             embed.set_thumbnail(url=player.avatar_url)
             embed.add_field(name="Points:", value="**Value:** {2} | **Rank:** {0}/{1}".format(points_index + 1, num_players, points), inline=True)
@@ -1593,97 +1712,155 @@ class SixMans(commands.Cog):
 #region load/save methods
     async def _pre_load_data(self):
         await self.bot.wait_until_ready()
+        await WriteBehind.wait_for_stopped()   # Changes left by the instance this one replaced on a reload
+        await self.persistence.flush()
+        self.ready_guilds = set()
+        self.failed_guilds = set()
         self.queues = {}
         self.games = {}
+        self.index.clear()
+        self.queue_timeouts.clear()
+        await self._load_guilds(self.bot.guilds)
+
+    async def _load_guilds(self, guilds: List[discord.Guild]):
+        """Loads the guilds' data a few at a time, retrying guilds that fail. Guilds that still fail are left unavailable until reloaded."""
+        semaphore = asyncio.Semaphore(PRELOAD_CONCURRENCY)
+
+        async def pre_load_guild(guild: discord.Guild):
+            async with semaphore:
+                await self._pre_load_guild(guild)
+            self.ready_guilds.add(guild.id)
+            self.failed_guilds.discard(guild.id)
+
+        guilds = list(guilds)
+        for attempt in range(PRELOAD_RETRIES + 1):
+            if attempt:
+                await asyncio.sleep(PRELOAD_RETRY_TIME * 2 ** (attempt - 1))
+            results = await asyncio.gather(*[pre_load_guild(guild) for guild in guilds], return_exceptions=True)
+            failed = []
+            for guild, result in zip(guilds, results):
+                if isinstance(result, Exception):
+                    log.error("Failed to load data for guild %s (attempt %s of %s)", guild.id, attempt + 1, PRELOAD_RETRIES + 1, exc_info=result)
+                    failed.append(guild)
+            guilds = failed
+            if not guilds:
+                break
 
-        for guild in self.bot.guilds:
-            self.queues[guild] = []
-            self.games[guild] = []
-
-            # Preload General Data
-            saved_queues_enabled = await self._get_queues_enabled(guild)
-            self.queues_enabled[guild] = saved_queues_enabled if (saved_queues_enabled is not None) else True
-            self.queueMaxSize[guild] = await self._get_queue_max_size(guild)
-            self.player_timeout_time[guild] = await self._player_timeout(guild) ## if not DEBUG else PLAYER_TIMEOUT_TIME
-
-            # Pre-load Queues
-            queues = await self._queues(guild)
-            default_team_selection = await self._team_selection(guild)
-            default_queue_size = self.queueMaxSize[guild]
-            default_category = await self._category(guild)
-            default_lobby_vc = await self._get_q_lobby_vc(guild)
-            for key, value in queues.items():
-                queue_channels = [guild.get_channel(x) for x in value["Channels"]]
-                queue_name = value["Name"]
-                team_selection = value.setdefault("TeamSelection", default_team_selection)
-                queue_size = value.setdefault("MaxSize", default_queue_size)
-                if default_category:
-                    category = guild.get_channel(value.setdefault("Category", default_category.id))
-                elif "Category" in value and value["Category"]:
-                    category = value["Category"]
-                else:
-                    category = None
-                
-                if default_lobby_vc:
-                    lobby_vc = guild.get_channel(value.setdefault("LobbyVC", default_lobby_vc.id))
-                elif "LobbyVC" in value and value["LobbyVC"]:
-                    lobby_vc = value["LobbyVC"]
-                else:
-                    lobby_vc = None
-                six_mans_queue = SixMansQueue(queue_name, guild, queue_channels, 
-                    value["Points"], 
-                    value["Players"], 
-                    value["GamesPlayed"], 
-                    queue_size, 
-                    teamSelection=team_selection,
-                    category=category,
-                    lobby_vc=lobby_vc
-                )
-                
-                six_mans_queue.id = int(key)
-                self.queues[guild].append(six_mans_queue)
+        for guild in guilds:
+            self.failed_guilds.add(guild.id)
+
+    async def _pre_load_guild(self, guild: discord.Guild):
+        # Drop anything a failed earlier attempt already loaded
+        self.index.clear_guild(guild)
+        self.queue_timeouts.clear_guild(guild)
+        self.queues[guild] = []
+        self.games[guild] = []
+        guild_data = await self.config.guild(guild).all()
+
+        # Preload General Data
+        saved_queues_enabled = guild_data["QueuesEnabled"]
+        self.queues_enabled[guild] = saved_queues_enabled if (saved_queues_enabled is not None) else True
+        self.queueMaxSize[guild] = guild_data["DefaultQueueMaxSize"]
+        self.player_timeout_time[guild] = guild_data["PlayerTimeout"] ## if not DEBUG else PLAYER_TIMEOUT_TIME
+        self.leaderboards[guild] = Leaderboard(guild_data["Players"])
+        await self.lobby_pool.load(guild, guild_data)
+
+        # Move scores saved in the legacy list format into the score journal, converting them to the integer schema
+        if guild_data["ScoreSchema"] < SCORE_SCHEMA:
+            await self.score_journal.upgrade(guild)
+        legacy_scores = guild_data["Scores"]
+        if legacy_scores:
+            await self.score_journal.migrate(guild, legacy_scores)
+        await self.score_rollups.load(guild, self.score_journal, guild_data)
+
+        # Pre-load Queues
+        queues = guild_data["Queues"]
+        default_team_selection = guild_data["DefaultTeamSelection"]
+        default_queue_size = self.queueMaxSize[guild]
+        default_category = guild.get_channel(guild_data["CategoryChannel"]) if guild_data["CategoryChannel"] else None
+        default_lobby_vc = guild.get_channel(guild_data["QLobby"]) if guild_data["QLobby"] else None
+        for key, value in queues.items():
+            queue_channels = [guild.get_channel(x) for x in value["Channels"]]
+            queue_name = value["Name"]
+            team_selection = value.setdefault("TeamSelection", default_team_selection)
+            queue_size = value.setdefault("MaxSize", default_queue_size)
+            if default_category:
+                category = guild.get_channel(value.setdefault("Category", default_category.id))
+            elif "Category" in value and value["Category"]:
+                category = guild.get_channel(value["Category"])
+            else:
+                category = None
             
-            # Pre-load Games
-            games = await self._games(guild)
-            game_list = []
-            for key, value in games.items():
-                players = [guild.get_member(x) for x in value["Players"]]
-                text_channel = guild.get_channel(value["TextChannel"])
-                voice_channels = [guild.get_channel(x) for x in value["VoiceChannels"]]
-                queueId = value["QueueId"]
-
-                queue = None
-                for q in self.queues[guild]:
-                    if q.id == queueId:
-                        queue = q
-                        
-                game = Game(players, queue, text_channel=text_channel, voice_channels=voice_channels, observers=self.observers)
-                game.id = int(key)
-                game.captains = [guild.get_member(x) for x in value["Captains"]]
-                game.blue = set([guild.get_member(x) for x in value["Blue"]])
-                game.orange = set([guild.get_member(x) for x in value["Orange"]])
-                game.roomName = value["RoomName"]
-                game.roomPass = value["RoomPass"]
-                game.use_reactions = value["UseReactions"]
-                game.prefix = value["Prefix"]
-
-                try:
-                    game.info_message = await game.textChannel.fetch_message(value["InfoMessage"])
-                    game.teamSelection = value["TeamSelection"]
-                except:
-                    game.teamSelection = game.queue.teamSelection
-                    await game.process_team_selection_method()
-                game.scoreReported = value["ScoreReported"]
-                game_list.append(game)
+            if default_lobby_vc:
+                lobby_vc = guild.get_channel(value.setdefault("LobbyVC", default_lobby_vc.id))
+            elif "LobbyVC" in value and value["LobbyVC"]:
+                lobby_vc = guild.get_channel(value["LobbyVC"])
+            else:
+                lobby_vc = None
+            six_mans_queue = SixMansQueue(queue_name, guild, queue_channels, 
+                value["Points"], 
+                value["Players"], 
+                value["GamesPlayed"], 
+                queue_size, 
+                teamSelection=team_selection,
+                category=category,
+                lobby_vc=lobby_vc
+            )
             
-            self.games[guild] = game_list
+            six_mans_queue.id = int(key)
+            self.queues[guild].append(six_mans_queue)
+            self.index.add_queue(six_mans_queue)
+
+            # Restore players who were in the queue before the cog was reloaded, keeping their original timeouts
+            join_log = value.get("ActiveJoinLog", {})
+            for player_id, joined_at in sorted(join_log.items(), key=lambda entry: entry[1]):
+                player = guild.get_member(int(player_id))
+                if player:
+                    six_mans_queue._put(player, joined_at)
+                    self.index.add_queued_player(player, six_mans_queue)
+                    self.queue_timeouts.schedule(player, six_mans_queue, joined_at + self.player_timeout_time[guild])
+        
+        # Pre-load Games. Info messages are fetched when the game's channel is first used
+        games = guild_data["Games"]
+        game_list = []
+        for key, value in games.items():
+            players = [guild.get_member(x) for x in value["Players"]]
+            text_channel = guild.get_channel(value["TextChannel"])
+            voice_channels = [guild.get_channel(x) for x in value["VoiceChannels"]]
+            queueId = value["QueueId"]
+
+            queue = self.index.queues_by_id.get(queueId)
+            game = Game(players, queue, text_channel=text_channel, voice_channels=voice_channels, observers=self.observers, scheduler=self.api_scheduler)
+            game.id = int(key)
+            game.captains = [guild.get_member(x) for x in value["Captains"]]
+            game.blue = set([guild.get_member(x) for x in value["Blue"]])
+            game.orange = set([guild.get_member(x) for x in value["Orange"]])
+            game.roomName = value["RoomName"]
+            game.roomPass = value["RoomPass"]
+            game.use_reactions = value["UseReactions"]
+            game.prefix = value["Prefix"]
+            game.teamSelection = value["TeamSelection"]
+            game.saved_info_message_id = value.get("InfoMessage")
+            votes = {guild.get_member(int(player_id)): vote for player_id, vote in value.get("Votes", {}).items()}
+            game.votes = {player: vote for player, vote in votes.items() if player}
+            game.needs_restore = True
+            game.scoreReported = value["ScoreReported"]
+            if value.get("StartedAt"):
+                game.started_at = datetime.datetime.utcfromtimestamp(value["StartedAt"])
+            game_list.append(game)
+            self.index.add_game(guild, game)
+        
+        self.games[guild] = game_list
 
     async def _clear_all_data(self, guild: discord.Guild):
+        self.persistence.discard(guild)
         await self._save_games(guild, [])
         await self._save_queues(guild, [])
-        await self._save_scores(guild, [])
+        await self.score_journal.clear(guild)
+        await self.score_rollups.clear(guild)
         await self._save_games_played(guild, 0)
         await self._save_players(guild, {})
+        self.leaderboards[guild] = Leaderboard()
         await self._save_category(guild, None)
         await self._save_q_lobby_vc(guild, None)
         await self._save_queue_max_size(guild, 6)
@@ -1712,11 +1889,38 @@ class SixMans(commands.Cog):
                 queue_dict[queue.id] = queue._to_dict()
         await self.config.guild(guild).Queues.set(queue_dict)
 
-    async def _scores(self, guild: discord.Guild):
-        return await self.config.guild(guild).Scores()
+    async def _restore_game(self, game: Game):
+        """Finishes restoring a game loaded from Config the first time its channel is used."""
+        if not game.needs_restore:
+            return
+        if not game.restore_task:
+            game.restore_task = asyncio.create_task(self._load_info_message(game))
+        await asyncio.shield(game.restore_task)
+
+    async def _load_info_message(self, game: Game):
+        try:
+            game.info_message = await game.textChannel.fetch_message(game.saved_info_message_id)
+        except:
+            game.teamSelection = game.queue.teamSelection
+            await game.process_team_selection_method()
+            self._game_changed(game.textChannel.guild, game)
+        finally:
+            game.needs_restore = False
 
-    async def _save_scores(self, guild: discord.Guild, scores):
-        await self.config.guild(guild).Scores.set(scores)
+    def _game_changed(self, guild: discord.Guild, game: Game):
+        if game in self.games.get(guild, []):
+            self.persistence.game_changed(guild, game)
+
+    def _queue_changed(self, six_mans_queue: SixMansQueue, *keys):
+        """Marks a queue to be saved on the next flush. Only the given `_to_dict` keys are written if any are given."""
+        if six_mans_queue in self.queues.get(six_mans_queue.guild, []):
+            self.persistence.queue_changed(six_mans_queue.guild, six_mans_queue, *keys)
+
+    async def _scores(self, guild: discord.Guild, since: datetime.datetime = None):
+        return await self.score_journal.scores(guild, since=since)
+
+    async def _legacy_scores(self, guild: discord.Guild):
+        return await self.config.guild(guild).Scores()
 
     async def _games_played(self, guild: discord.Guild):
         return await self.config.guild(guild).GamesPlayed()
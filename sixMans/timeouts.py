@@ -0,0 +1,70 @@
+import asyncio
+import heapq
+import logging
+import time
+
+import discord
+
+log = logging.getLogger("red.sixMans")
+
+class QueueTimeouts:
+    """Schedules queue timeouts for every queued player with a single task.
+
+    Expiry times (epoch seconds) are kept in a heap and the task only wakes up for the earliest one,
+    or when an earlier expiry is scheduled. Canceled timeouts are dropped lazily when they reach the top."""
+
+    def __init__(self, on_timeout):
+        self.on_timeout = on_timeout    # coroutine called with (player, six_mans_queue) when a player times out
+        self._heap = []
+        self._entries = {}
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+
+    def schedule(self, player: discord.Member, six_mans_queue, expires_at: float):
+        key = (player.id, six_mans_queue.id)
+        self._entries[key] = (expires_at, player, six_mans_queue)
+        heapq.heappush(self._heap, (expires_at, key))
+        if self._heap[0][0] == expires_at:
+            self._wakeup.set()
+
+    def cancel(self, player: discord.Member, six_mans_queue):
+        self._entries.pop((player.id, six_mans_queue.id), None)
+        # Rebuild the heap once canceled timeouts make up most of it
+        if len(self._heap) > 2 * len(self._entries) + 16:
+            self._heap = [(entry[0], key) for key, entry in self._entries.items()]
+            heapq.heapify(self._heap)
+
+    def clear(self):
+        self._entries = {}
+        self._heap = []
+
+    def clear_guild(self, guild: discord.Guild):
+        self._entries = {key: entry for key, entry in self._entries.items() if entry[2].guild.id != guild.id}
+        self._heap = [(entry[0], key) for key, entry in self._entries.items()]
+        heapq.heapify(self._heap)
+
+    def stop(self):
+        self._task.cancel()
+
+    async def _run(self):
+        while True:
+            self._wakeup.clear()
+            now = time.time()
+            while self._heap and self._heap[0][0] <= now:
+                expires_at, key = heapq.heappop(self._heap)
+                entry = self._entries.get(key)
+                if entry and entry[0] == expires_at:
+                    del self._entries[key]
+                    asyncio.create_task(self._time_out(entry[1], entry[2]))
+
+            next_expiry = self._heap[0][0] - time.time() if self._heap else None
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=next_expiry)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _time_out(self, player: discord.Member, six_mans_queue):
+        try:
+            await self.on_timeout(player, six_mans_queue)
+        except Exception:
+            log.exception("Failed to time out player %s from queue %s", player.id, six_mans_queue.id)
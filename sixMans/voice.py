@@ -0,0 +1,26 @@
+import asyncio
+from typing import List, Tuple
+
+import discord
+
+from .metrics import count_api_call
+
+MOVE_CONCURRENCY = 4    # How many voice moves may be in flight at once
+
+async def move_members(moves: List[Tuple[discord.Member, discord.VoiceChannel]], concurrency=MOVE_CONCURRENCY):
+    """Moves each member to their voice channel concurrently, with at most `concurrency` moves in flight.
+
+    Returns a list of `(member, channel, error)` for every move that failed."""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def move(member: discord.Member, channel: discord.VoiceChannel):
+        async with semaphore:
+            count_api_call()
+            try:
+                await member.move_to(channel)
+            except discord.HTTPException as error:
+                return member, channel, error
+        return None
+
+    results = await asyncio.gather(*[move(member, channel) for member, channel in moves])
+    return [result for result in results if result]